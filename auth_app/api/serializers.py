@@ -26,6 +26,7 @@ class RegistrationSerializer(serializers.Serializer):
         validate_password(attrs["password"])
         return attrs
     def create(self, validated_data):
+        """Pass `password_hash` to save() to skip hashing in the request thread."""
         validated_data.pop("repeated_password")
         password = validated_data.pop("password")
 
@@ -34,21 +35,9 @@ class RegistrationSerializer(serializers.Serializer):
         return user, token
     
 class LoginSerializer(serializers.Serializer):
-    """Validates credentials (email + password)."""
+    """
+    Validates the shape of the credentials (email + password).
+    LoginView checks them against the database and the password hash.
+    """
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
-    def validate(self, attrs):
-        try:
-            user = User.objects.get(email=attrs["email"])
-        except User.DoesNotExist:
-            raise serializers.ValidationError({"detail": "Invalid credentials."})
-
-        if not user.check_password(attrs["password"]):
-            raise serializers.ValidationError({"detail": "Invalid credentials."})
-
-        attrs["user"] = user
-        return attrs
-    def create(self, validated_data):
-        user = validated_data["user"]
-        token, _ = Token.objects.get_or_create(user=user)
-        return user, token
@@ -1,23 +1,29 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from rest_framework import status
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.authtoken.models import Token
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from auth_app.hashing import hasher_pool
+from core.async_views import AsyncAPIView
 from .serializers import LoginSerializer, RegistrationSerializer
 
 User = get_user_model()
 
-class RegistrationView(APIView):
+class RegistrationView(AsyncAPIView):
     """
     POST /api/registration/
     Creates a new user and returns an auth token + basic user info.
+    The password is hashed on auth_app.hashing.hasher_pool (503 when saturated).
     Permissions: AllowAny
     """
-    permission_classes = [AllowAny]
-    def post(self, request):
-        serializer = RegistrationSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        user, token = serializer.save()
+    async def post(self, request):
+        serializer = RegistrationSerializer(data=self.get_data(request))
+        if not await sync_to_async(serializer.is_valid)():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        password_hash = await hasher_pool.make_password(serializer.validated_data["password"])
+        user, token = await sync_to_async(serializer.save)(password_hash=password_hash)
 
         return Response(
             {
@@ -29,17 +35,29 @@ class RegistrationView(APIView):
             status=status.HTTP_201_CREATED,
         )
 
-class LoginView(APIView):
+class LoginView(AsyncAPIView):
     """
     POST /api/login/
     Authenticates user by email/password and returns an auth token + user info.
+    The password is checked on auth_app.hashing.hasher_pool (503 when saturated).
     Permissions: AllowAny
     """
-    permission_classes = [AllowAny]
-    def post(self, request):
-        serializer = LoginSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        user, token = serializer.save()
+    async def post(self, request):
+        serializer = LoginSerializer(data=self.get_data(request))
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        credentials = serializer.validated_data
+
+        user = await User.objects.filter(email=credentials["email"]).afirst()
+        matches, upgraded_hash = (
+            await hasher_pool.verify(credentials["password"], user.password) if user else (False, None)
+        )
+        if not matches:
+            return Response({"detail": ["Invalid credentials."]}, status=status.HTTP_400_BAD_REQUEST)
+        if upgraded_hash:
+            user.password = upgraded_hash
+            await user.asave(update_fields=["password"])
+        token, _ = await Token.objects.aget_or_create(user=user)
 
         return Response(
             {
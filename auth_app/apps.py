@@ -3,3 +3,5 @@ from django.apps import AppConfig
 class AuthAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auth_app'
+    def ready(self):
+        from . import signals  # noqa: F401
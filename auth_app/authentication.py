@@ -0,0 +1,111 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from core import metrics
+
+HIT = "auth.token_cache.hit"
+MISS = "auth.token_cache.miss"
+metrics.register_ratio("auth.token_cache.hit_ratio", HIT, MISS)
+
+
+def token_cache_key(key):
+    """Cache key for a token; the raw token never ends up in the cache backend."""
+    return "kanmind:auth-token:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def forget_token(key):
+    caches[settings.TOKEN_AUTH_CACHE_ALIAS].delete(token_cache_key(key))
+
+
+def _user_fields():
+    # the password hash never goes to the cache; it stays deferred on cached users
+    return [field.attname for field in get_user_model()._meta.concrete_fields if field.name != "password"]
+
+
+def _cache_entry(token):
+    """(token fields, user fields) of a resolved token, as plain values."""
+    return (
+        (token.key, token.user_id, token.created),
+        tuple(getattr(token.user, name) for name in _user_fields()),
+    )
+
+
+def _from_cache_entry(model, entry):
+    """Token and user rebuilt from _cache_entry() without a query."""
+    (key, user_id, created), user_values = entry
+    token = model.from_db(DEFAULT_DB_ALIAS, ["key", "user_id", "created"], [key, user_id, created])
+    token.user = get_user_model().from_db(DEFAULT_DB_ALIAS, _user_fields(), list(user_values))
+    return token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for DRF TokenAuthentication.
+    Caches the token (with its user, minus the password hash) for
+    TOKEN_AUTH_CACHE_TTL seconds in the TOKEN_AUTH_CACHE_ALIAS cache, so an
+    authenticated request usually costs no query. Entries are dropped when the token is deleted or the user
+    is saved (e.g. deactivated), see auth_app.signals - in this process's
+    cache only, unless the alias is a shared backend.
+    """
+    def authenticate_credentials(self, key):
+        cache = caches[settings.TOKEN_AUTH_CACHE_ALIAS]
+        cache_key = token_cache_key(key)
+        entry = cache.get(cache_key)
+        if entry is None:
+            metrics.incr(MISS)
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, _cache_entry(token), settings.TOKEN_AUTH_CACHE_TTL)
+            return user, token
+
+        metrics.incr(HIT)
+        token = _from_cache_entry(self.get_model(), entry)
+        if not token.user.is_active:
+            raise AuthenticationFailed("User inactive or deleted.")
+        return token.user, token
+
+    async def aauthenticate(self, request):
+        """Async variant of authenticate() for core.async_views; same header rules."""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed("Invalid token header.")
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed("Invalid token header. Token string should not contain invalid characters.")
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        cache = caches[settings.TOKEN_AUTH_CACHE_ALIAS]
+        cache_key = token_cache_key(key)
+        entry = await cache.aget(cache_key)
+        model = self.get_model()
+        if entry is None:
+            metrics.incr(MISS)
+            try:
+                token = await model.objects.select_related("user").aget(key=key)
+            except model.DoesNotExist:
+                raise AuthenticationFailed("Invalid token.")
+            if token.user.is_active:
+                await cache.aset(cache_key, _cache_entry(token), settings.TOKEN_AUTH_CACHE_TTL)
+        else:
+            metrics.incr(HIT)
+            token = _from_cache_entry(model, entry)
+        if not token.user.is_active:
+            raise AuthenticationFailed("User inactive or deleted.")
+        return token.user, token
+
+    @staticmethod
+    def stats():
+        return {
+            "hits": metrics.get(HIT),
+            "misses": metrics.get(MISS),
+            "hit_ratio": metrics.ratio(HIT, MISS),
+        }
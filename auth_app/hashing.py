@@ -0,0 +1,92 @@
+"""
+Password hashing off the request path for the async login/registration views.
+
+PBKDF2 costs tens of milliseconds of CPU per call. hasher_pool runs it on a
+small dedicated thread pool (hashlib releases the GIL while hashing, so the
+threads use separate cores) and never lets more than
+AUTH_HASHER_MAX_PENDING jobs run or wait: beyond that HasherBusy is raised
+and the client gets 503 with Retry-After instead of queueing behind a
+login storm. Board and task requests never wait for these threads.
+
+Metrics: auth.hasher.in_flight / auth.hasher.queued (gauges),
+auth.hasher.completed / auth.hasher.rejected (counters).
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core import metrics
+
+IN_FLIGHT = "auth.hasher.in_flight"
+QUEUED = "auth.hasher.queued"
+COMPLETED = "auth.hasher.completed"
+REJECTED = "auth.hasher.rejected"
+
+
+class HasherBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many concurrent sign-ins, please retry shortly."
+    default_code = "hasher_busy"
+    wait = 1  # becomes the Retry-After header
+
+
+def _verify(raw_password, encoded):
+    """Returns (matches, new hash if the stored one uses outdated parameters)."""
+    upgraded = []
+    matches = check_password(raw_password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return matches, upgraded[0] if upgraded else None
+
+
+class PasswordHasherPool:
+    def __init__(self):
+        self._executor = None
+        self._workers = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+    def _get_executor(self):
+        if self._executor is None or self._workers != settings.AUTH_HASHER_WORKERS:
+            if self._executor is not None:
+                # jobs already submitted still finish, then its threads exit
+                self._executor.shutdown(wait=False)
+            self._workers = settings.AUTH_HASHER_WORKERS
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="password-hasher")
+        return self._executor
+    def _publish(self):
+        metrics.set_gauge(IN_FLIGHT, self._in_flight)
+        metrics.set_gauge(QUEUED, max(0, self._in_flight - self._workers))
+    def _done(self, future):
+        with self._lock:
+            self._in_flight -= 1
+            self._publish()
+        metrics.incr(COMPLETED)
+    def submit(self, fn, *args):
+        """Schedules fn(*args) and returns a concurrent.futures.Future; raises HasherBusy when full."""
+        with self._lock:
+            if self._in_flight >= settings.AUTH_HASHER_MAX_PENDING:
+                metrics.incr(REJECTED)
+                raise HasherBusy()
+            executor = self._get_executor()
+            self._in_flight += 1
+            self._publish()
+        future = executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return future
+    async def make_password(self, raw_password):
+        return await asyncio.wrap_future(self.submit(make_password, raw_password))
+    async def verify(self, raw_password, encoded):
+        return await asyncio.wrap_future(self.submit(_verify, raw_password, encoded))
+    def stats(self):
+        return {
+            "in_flight": metrics.get(IN_FLIGHT),
+            "queued": metrics.get(QUEUED),
+            "completed": metrics.get(COMPLETED),
+            "rejected": metrics.get(REJECTED),
+        }
+
+
+hasher_pool = PasswordHasherPool()
@@ -6,7 +6,8 @@ class UserManager(BaseUserManager):
     Custom user manager for creating users with email as the unique identifier.
     Required by Django when using a custom User model (AbstractBaseUser).
     """
-    def create_user(self, email, fullname, password=None, **extra_fields):
+    def create_user(self, email, fullname, password=None, password_hash=None, **extra_fields):
+        """`password_hash` stores an already hashed password (see auth_app.hashing)."""
         if not email:
             raise ValueError("Email is required")
         if not fullname:
@@ -14,7 +15,10 @@ class UserManager(BaseUserManager):
 
         email = self.normalize_email(email)
         user = self.model(email=email, fullname=fullname, **extra_fields)
-        user.set_password(password)
+        if password_hash is None:
+            user.set_password(password)
+        else:
+            user.password = password_hash
         user.save(using=self._db)
         return user
     def create_superuser(self, email, fullname, password=None, **extra_fields):
@@ -1,8 +1,18 @@
+import asyncio
+import pickle
+import threading
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import AsyncClient, override_settings
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
+from auth_app.authentication import CachedTokenAuthentication, token_cache_key
+from auth_app.hashing import PasswordHasherPool, hasher_pool
+
 User = get_user_model()
 
 class AuthenticationTests(APITestCase):
@@ -81,6 +91,67 @@ class AuthenticationTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_login_unknown_email(self):
+        response = self.client.post(
+            self.login_url,
+            {"email": "nobody@example.com", "password": "ExistingPass123!"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"detail": ["Invalid credentials."]})
+
+    async def test_concurrent_logins_share_the_hasher_pool(self):
+        client = AsyncClient()
+        responses = await asyncio.gather(*(
+            client.post(
+                self.login_url,
+                {"email": "existing@example.com", "password": "ExistingPass123!"},
+                content_type="application/json",
+            )
+            for _ in range(4)
+        ))
+
+        self.assertEqual([r.status_code for r in responses], [status.HTTP_200_OK] * 4)
+        self.assertEqual(len({r.json()["token"] for r in responses}), 1)
+        self.assertEqual(hasher_pool.stats()["in_flight"], 0)
+
+    @override_settings(AUTH_HASHER_MAX_PENDING=1)
+    def test_login_rejected_while_hasher_pool_is_full(self):
+        release = threading.Event()
+        blocker = hasher_pool.submit(release.wait, 5)
+        rejected = hasher_pool.stats()["rejected"]
+        try:
+            response = self.client.post(
+                self.login_url,
+                {"email": "existing@example.com", "password": "ExistingPass123!"},
+            )
+        finally:
+            release.set()
+            blocker.result()
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(hasher_pool.stats()["rejected"], rejected + 1)
+        response = self.client.post(
+            self.login_url,
+            {"email": "existing@example.com", "password": "ExistingPass123!"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_hasher_pool_shuts_down_a_replaced_executor(self):
+        pool = PasswordHasherPool()
+        executors = []
+        for workers in (1, 2, 1):
+            with override_settings(AUTH_HASHER_WORKERS=workers):
+                self.assertEqual(pool.submit(sum, [1, 2]).result(), 3)
+                executors.append(pool._executor)
+
+        for executor in executors[:-1]:
+            with self.assertRaises(RuntimeError):
+                executor.submit(sum, [])
+        pool._executor.shutdown()
+
     # --------------------
     # EMAIL CHECK
     # --------------------
@@ -110,3 +181,44 @@ class AuthenticationTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    # --------------------
+    # CACHED TOKEN AUTHENTICATION
+    # --------------------
+    def test_cached_token_skips_token_query(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.client.get(self.email_check_url, {"email": "existing@example.com"})
+        hits = CachedTokenAuthentication.stats()["hits"]
+
+        # only the email lookup itself hits the database
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.email_check_url, {"email": "existing@example.com"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(CachedTokenAuthentication.stats()["hits"], hits + 1)
+
+    def test_cached_token_invalidated_on_delete_and_deactivation(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.client.get(self.email_check_url, {"email": "existing@example.com"})
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.email_check_url, {"email": "existing@example.com"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.is_active = True
+        self.user.save()
+        self.client.get(self.email_check_url, {"email": "existing@example.com"})
+        self.token.delete()
+        response = self.client.get(self.email_check_url, {"email": "existing@example.com"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_token_leaves_out_the_password_hash(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.client.get(self.email_check_url, {"email": "existing@example.com"})
+
+        entry = caches[settings.TOKEN_AUTH_CACHE_ALIAS].get(token_cache_key(self.token.key))
+        self.assertNotIn(self.user.password, pickle.dumps(entry).decode("latin-1"))
+        response = self.client.get(self.email_check_url, {"email": "existing@example.com"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db.models import Q, aprefetch_related_objects
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.response import Response
+
+from boards_app.list_cache import acached_board_list
+from boards_app.membership import aget_board_access, ais_board_member
+from boards_app.models import Board
+from core.async_views import AsyncReadView
+from core.conditional import etag_matches, make_etag, not_modified
+from core.renderers import StreamingJSONResponse
+from .serializers import BoardDetailSerializer
+from .views import BoardViewSet
+
+
+class AsyncBoardListView(AsyncReadView):
+    """
+    GET /api/boards/ under ASGI (async ORM).
+    POST and paginated requests are served by BoardViewSet.
+    """
+    sync_view = BoardViewSet.as_view({"get": "list", "post": "create"})
+    async def get(self, request):
+        memberships = Board.members.through.objects.filter(user_id=request.user.pk).values("board_id")
+        reader = BoardViewSet.values_reader
+        boards = Board.objects.filter(Q(owner_id=request.user.pk) | Q(id__in=memberships))
+        async def compute():
+            return reader.read([row async for row in reader.values(boards)])
+        access = await aget_board_access(request.user)
+        return Response(await acached_board_list(request.user.pk, access.board_ids, compute))
+
+
+class AsyncBoardDetailView(AsyncReadView):
+    """
+    GET /api/boards/{id}/ under ASGI, with the same ETag handling as BoardViewSet.retrieve.
+    """
+    sync_view = BoardViewSet.as_view({
+        "get": "retrieve",
+        "put": "update",
+        "patch": "partial_update",
+        "delete": "destroy",
+    })
+    async def get(self, request, pk):
+        board = await Board.objects.filter(pk=pk).afirst()
+        if board is None:
+            raise NotFound("No Board matches the given query.")
+        if not await ais_board_member(request.user, board.pk):
+            raise PermissionDenied()
+        etag = make_etag("board", board.pk, board.version, request=request)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        headers = {"ETag": etag, "X-Board-Version": str(board.version)}
+        if BoardViewSet.is_streamed(board):
+            await aprefetch_related_objects([board], *BoardViewSet.streamed_detail_prefetches)
+            tasks = BoardViewSet.streamed_tasks(board).aiterator(chunk_size=settings.JSON_STREAMING_CHUNK_SIZE)
+            data = BoardViewSet.streamed_detail(board, tasks)
+            return StreamingJSONResponse(data, asynchronous=True, headers=headers)
+
+        await aprefetch_related_objects([board], *BoardViewSet.detail_prefetches)
+        return Response(BoardDetailSerializer(board).data, headers=headers)
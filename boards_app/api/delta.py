@@ -0,0 +1,55 @@
+from boards_app.changes import DELETE, UPSERT
+
+from tasks_app.api.serializers import CommentSerializer, TaskSerializer, UserPublicSerializer
+from tasks_app.models import Comment, Task
+
+
+def build_board_delta(board, since):
+    """
+    Response body of GET /api/boards/{id}/changes/?since=<version>.
+
+    Collapses the change log entries newer than `since` to the last action
+    per object, then loads the current state of everything still present.
+    Objects that are gone (or moved to another board) become tombstones.
+    """
+    latest = {}
+    version = max(board.version, since)
+    for kind, object_id, action, entry_version in (
+        board.change_log.filter(version__gt=since).values_list("kind", "object_id", "action", "version")
+    ):
+        latest[(kind, object_id)] = action
+        version = max(version, entry_version)
+
+    def upserted(kind):
+        return {object_id for (k, object_id), action in latest.items() if k == kind and action == UPSERT}
+
+    def deleted(kind):
+        return {object_id for (k, object_id), action in latest.items() if k == kind and action == DELETE}
+
+    tasks = list(
+        Task.objects
+        .filter(board=board, pk__in=upserted("task"))
+        .select_related("assignee", "reviewer")
+    ) if upserted("task") else []
+    comments = list(
+        Comment.objects
+        .filter(task__board=board, pk__in=upserted("comment"))
+        .select_related("author")
+    ) if upserted("comment") else []
+    members = list(
+        board.members.filter(pk__in=upserted("member"))
+    ) if upserted("member") else []
+
+    return {
+        "version": version,
+        "board": {"id": board.id, "title": board.title, "owner_id": board.owner_id}
+        if ("board", board.id) in latest else None,
+        "tasks": TaskSerializer(tasks, many=True).data,
+        "deleted_tasks": sorted(deleted("task") | (upserted("task") - {t.pk for t in tasks})),
+        "comments": [
+            {"task": comment.task_id, **CommentSerializer(comment).data} for comment in comments
+        ],
+        "deleted_comments": sorted(deleted("comment") | (upserted("comment") - {c.pk for c in comments})),
+        "members": UserPublicSerializer(members, many=True).data,
+        "removed_members": sorted(deleted("member") | (upserted("member") - {m.pk for m in members})),
+    }
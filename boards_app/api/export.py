@@ -0,0 +1,160 @@
+"""
+Streaming board export: GET /api/boards/{id}/export/?format=ndjson|csv[&compress=gzip]
+
+One record per line: the board, its members, its tasks and their
+comments, in that order. NDJSON lines are objects with a "type" key; CSV
+has one header row with the union of all record columns and leaves the
+columns a record does not have empty.
+
+Tasks and comments are read with .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+and sent in chunks of about EXPORT_BUFFER_BYTES, so memory use does not
+depend on the board size. All records are read in one transaction, so the
+export is a consistent snapshot even while the board is being edited.
+That read transaction stays open until the download ends: on SQLite it
+only leaves writers alone in WAL mode, which core.settings turns on for
+the default database. Under ASGI the chunks are read one at a time in the
+request's sync thread (an async iterator), not collected into a list first.
+"""
+import csv
+import io
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.renderers import dumps
+from tasks_app.models import Comment, Task
+
+RECORDS = {
+    "board": ["id", "title", "owner_id", "version"],
+    "member": ["id", "email", "fullname"],
+    "task": [
+        "id", "title", "description", "status", "priority", "assignee_id", "reviewer_id",
+        "due_date", "created_by_id", "comments_count",
+    ],
+    "comment": ["id", "task_id", "author_id", "content", "created_at"],
+}
+_encode = JSONEncoder().default  # dates and datetimes as in the API
+CSV_COLUMNS = ["type"] + list(dict.fromkeys(column for columns in RECORDS.values() for column in columns))
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Lets DRF accept ?format=ndjson|csv on the export action. Exports are
+    streamed by the view; only error responses go through render().
+    """
+    charset = "utf-8"
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return dumps(data) + b"\n"
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+def board_records(board):
+    """(type, row tuple in RECORDS order) of everything on the board."""
+    yield "board", type(board).objects.filter(pk=board.pk).values_list(*RECORDS["board"]).get()
+    for row in board.members.order_by("pk").values_list(*RECORDS["member"]):
+        yield "member", row
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    # in column order, so an import puts the cards back in the same order
+    tasks = Task.objects.filter(board=board).in_column_order().values_list(*RECORDS["task"])
+    for row in tasks.iterator(chunk_size=chunk_size):
+        yield "task", row
+    comments = (
+        Comment.objects.filter(task__board=board)
+        .order_by("task_id", "created_at", "pk")
+        .values_list(*RECORDS["comment"])
+    )
+    for row in comments.iterator(chunk_size=chunk_size):
+        yield "comment", row
+
+
+def _ndjson_lines(records):
+    names = {kind: ["type"] + columns for kind, columns in RECORDS.items()}
+    for kind, row in records:
+        yield dumps(dict(zip(names[kind], (kind,) + row))) + b"\n"
+
+
+def _csv_lines(records):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    positions = {kind: [CSV_COLUMNS.index(column) for column in columns] for kind, columns in RECORDS.items()}
+    writer.writerow(CSV_COLUMNS)
+    for kind, row in records:
+        line = [""] * len(CSV_COLUMNS)
+        line[0] = kind
+        for position, value in zip(positions[kind], row):
+            line[position] = "" if value is None else _encode(value) if hasattr(value, "isoformat") else value
+        writer.writerow(line)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _buffered(lines):
+    """Joins lines into chunks of about EXPORT_BUFFER_BYTES."""
+    chunk, size = [], 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= settings.EXPORT_BUFFER_BYTES:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _snapshot(board, encode):
+    # one read transaction for the whole export; ends when the stream is closed
+    with transaction.atomic():
+        yield from _buffered(encode(board_records(board)))
+
+
+async def _aiterate(chunks):
+    """
+    Async iterator over a sync chunk generator. Every step runs in the same
+    thread (thread_sensitive), which holds the export's transaction.
+    """
+    read = sync_to_async(next)
+    try:
+        while (chunk := await read(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+def export_response(board, export_format, compress=False, asynchronous=False):
+    encode = _csv_lines if export_format == "csv" else _ndjson_lines
+    renderer = CSVRenderer if export_format == "csv" else NDJSONRenderer
+    chunks = _snapshot(board, encode)
+    filename = f"board-{board.pk}.{renderer.format}"
+    if compress:
+        chunks, content_type, filename = _gzipped(chunks), "application/gzip", filename + ".gz"
+    else:
+        content_type = f"{renderer.media_type}; charset=utf-8"
+    return StreamingHttpResponse(
+        _aiterate(chunks) if asynchronous else chunks,
+        content_type=content_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
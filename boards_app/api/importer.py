@@ -0,0 +1,387 @@
+"""
+Bulk board import: POST /api/boards/import/ and python manage.py import_boards
+
+Reads what the export writes (boards_app.api.export): NDJSON lines or CSV
+rows of type board, member, task and comment, optionally gzipped. Every
+board record starts a new board owned by the importing user; the records
+after it belong to that board:
+
+    {"type": "board", "title": "Website"}
+    {"type": "member", "id": 7, "email": "anna@example.com"}
+    {"type": "task", "id": 1, "title": "Login", "status": "to-do", "priority": "high", "assignee_id": 7}
+    {"type": "comment", "task_id": 1, "author_email": "anna@example.com", "content": "Done?"}
+
+Ids in the file are the file's own: tasks get new ones, and users are
+referenced either by `<field>_email` or by `<field>_id` naming a member
+record (or the board's owner_id) of the same board. Without either,
+created_by and author are the importing user.
+
+The file is parsed while it is read and handled IMPORT_CHUNK_SIZE records
+at a time: one query per IMPORT_EMAIL_BATCH new emails resolves the users,
+the rows are validated in Python with the rules of TaskSerializer, and the
+valid ones are written in one transaction per chunk. Tasks and comments go
+through core.inserts.insert_rows(): bulk_create() would spend most of the
+import building model instances and preparing values one by one. The
+search index triggers see the inserts, the denormalized counters are
+updated per chunk. Invalid rows are skipped and reported with their line
+number.
+"""
+import csv
+import gzip
+import io
+import zlib
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from boards_app import list_cache
+from boards_app.membership import invalidate_board_access
+from boards_app.models import Board
+from core.inserts import insert_rows
+from core.renderers import loads
+from tasks_app.models import Comment, Task
+from tasks_app.ranks import ranks_after
+
+User = get_user_model()
+
+FORMATS = ("ndjson", "csv")
+RECORD_TYPES = ("board", "member", "task", "comment")
+STATUSES = [status for status, _ in Task.STATUS_CHOICES]
+PRIORITIES = [priority for priority, _ in Task.PRIORITY_CHOICES]
+TITLE_MAX_LENGTH = Task._meta.get_field("title").max_length
+# columns written by insert_rows(), in the order _add_task (+ position from _flush) and _comment_row build them
+TASK_FIELDS = [
+    "board_id", "title", "description", "status", "priority", "assignee_id", "reviewer_id", "due_date",
+    "created_by_id", "position",
+]
+COMMENT_FIELDS = ["task_id", "author_id", "content", "created_at"]
+STATUS, PRIORITY = TASK_FIELDS.index("status"), TASK_FIELDS.index("priority")
+# errors of a truncated or corrupt file, raised while it is read
+READ_ERRORS = (OSError, EOFError, UnicodeDecodeError, csv.Error, zlib.error)
+
+
+def _binary_lines(file):
+    """`file` as an iterator of byte lines, decompressed if it is gzipped."""
+    head = file.read(2)
+    file.seek(0)
+    return gzip.GzipFile(fileobj=file) if head == b"\x1f\x8b" else file
+
+
+def ndjson_records(file):
+    """(line number, record) per non-empty line; the record is None for invalid JSON."""
+    for number, line in enumerate(_binary_lines(file), 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, loads(line)
+        except ValueError:
+            yield number, None
+
+
+def csv_records(file):
+    """(line number, record) per CSV row; empty columns are left out of the record."""
+    reader = csv.DictReader(io.TextIOWrapper(_binary_lines(file), encoding="utf-8-sig", newline=""))
+    for row in reader:
+        yield reader.line_num, {key: value for key, value in row.items() if key is not None and value != ""}
+
+
+def read_records(file, import_format):
+    return csv_records(file) if import_format == "csv" else ndjson_records(file)
+
+
+def guess_format(filename):
+    """"csv" or "ndjson" from a file name such as board-1.csv.gz; None if unknown."""
+    name = filename.lower().removesuffix(".gz")
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+# --------------------
+# field validation, with DRF's messages
+# --------------------
+def _text(record, field, errors, max_length=None, required=True):
+    value = record.get(field)
+    if value is None or value == "":
+        if required:
+            errors[field] = ["This field is required." if value is None else "This field may not be blank."]
+        return ""
+    value = str(value)
+    if max_length is not None and len(value) > max_length:
+        errors[field] = [f"Ensure this field has no more than {max_length} characters."]
+    return value
+
+
+def _choice(record, field, choices, errors):
+    value = record.get(field)
+    if value is None:
+        errors[field] = ["This field is required."]
+    elif value not in choices:
+        errors[field] = [f'"{value}" is not a valid choice.']
+    return value
+
+
+def _date(record, field, errors):
+    value = record.get(field)
+    if value is None:
+        return None
+    try:
+        parsed = parse_date(str(value))
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        errors[field] = ["Date has wrong format. Use one of these formats instead: YYYY-MM-DD."]
+    return parsed
+
+
+def _datetime(record, field, errors):
+    value = record.get(field)
+    if value is None:
+        return None
+    try:
+        parsed = parse_datetime(str(value))
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        errors[field] = [
+            "Datetime has wrong format. Use one of these formats instead: "
+            "YYYY-MM-DDThh:mm[:ss[.uuuuuu]][+HH:MM|-HH:MM|Z]."
+        ]
+        return None
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+class ImportedBoard:
+    """A board created by the import and how the file's ids map to it."""
+    def __init__(self, board):
+        self.board = board
+        self.people = {board.owner_id}  # users tasks may be assigned to
+        self.users = {}  # file user id -> user id
+        self.tasks = {}  # file task id -> task id
+        self.column_ends = {}  # status -> position of the last imported task
+    def place(self, rows):
+        """Task rows with positions appended: in file order at the end of their columns."""
+        counts = Counter(row[STATUS] for row in rows)
+        positions = {
+            status: iter(ranks_after(self.column_ends.get(status), count))
+            for status, count in counts.items()
+        }
+        placed = [row + (next(positions[row[STATUS]]),) for row in rows]
+        for row in placed:
+            self.column_ends[row[STATUS]] = row[-1]
+        return placed
+
+
+class BoardImport:
+    """
+    Imports the records of read_records() as boards owned by `owner`:
+
+        report = BoardImport(request.user).run(read_records(file, "ndjson"))
+
+    Each chunk of records is committed on its own, so rows imported before
+    an unreadable part of the file are kept; the report tells both apart.
+    """
+    def __init__(self, owner, chunk_size=None):
+        self.owner = owner
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        self.boards = []
+        self.created = dict.fromkeys(("boards", "members", "tasks", "comments"), 0)
+        self.errors = []
+        self.error_count = 0
+        self._current = None
+        self._emails = {}  # email -> user id, None if there is no such user
+        self._line = 0
+        self._reset_pending()
+    def _reset_pending(self):
+        self._members, self._tasks, self._comments = [], [], []
+    def run(self, records):
+        records = iter(records)
+        while True:
+            chunk, failure = [], None
+            try:
+                for record in records:
+                    chunk.append(record)
+                    if len(chunk) >= self.chunk_size:
+                        break
+            except READ_ERRORS as exc:
+                # the records read before the error are still imported
+                failure = exc
+            if chunk:
+                self._line = chunk[-1][0]
+                self._resolve_emails(chunk)
+                with transaction.atomic():
+                    self._import_chunk(chunk)
+            if failure is not None:
+                self._error(self._line + 1, None, {"file": [f"Unreadable from here on: {failure}"]})
+            if failure is not None or len(chunk) < self.chunk_size:
+                return self.report()
+    def report(self):
+        return {
+            "boards": [{"id": board.pk, "title": board.title} for board in self.boards],
+            "created": self.created,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+    def _error(self, line, record_type, errors):
+        self.error_count += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "type": record_type, "errors": errors})
+
+    # users
+    def _resolve_emails(self, chunk):
+        """Looks up the emails of the chunk not seen before, IMPORT_EMAIL_BATCH per query."""
+        fields = ["email", "assignee_email", "reviewer_email", "created_by_email", "author_email"]
+        new = {
+            str(record[field])
+            for _, record in chunk if isinstance(record, dict)
+            for field in fields if record.get(field) is not None
+        }.difference(self._emails)
+        new = sorted(new)
+        for start in range(0, len(new), settings.IMPORT_EMAIL_BATCH):
+            batch = new[start:start + settings.IMPORT_EMAIL_BATCH]
+            self._emails.update(dict.fromkeys(batch))
+            self._emails.update(User.objects.filter(email__in=batch).values_list("email", "pk"))
+    def _user(self, record, field, errors):
+        """User id referenced by `<field>_email` or `<field>_id`; None if the record has neither."""
+        if record.get(f"{field}_email") is not None:
+            key, user_id = f"{field}_email", self._emails.get(str(record[f"{field}_email"]))
+        elif record.get(f"{field}_id") is not None:
+            key, user_id = f"{field}_id", self._current.users.get(str(record[f"{field}_id"]))
+        else:
+            return None
+        if user_id is None:
+            errors[key] = ["User does not exist."]
+        return user_id
+    def _board_member(self, record, field, errors):
+        user_id = self._user(record, field, errors)
+        if user_id is not None and user_id not in self._current.people:
+            errors[f"{field}_id" if record.get(f"{field}_email") is None else f"{field}_email"] = [
+                "Assignee/Reviewer must be member of the board."
+            ]
+        return user_id
+
+    # records
+    def _import_chunk(self, chunk):
+        touched = {self._current.board.pk} if self._current else set()
+        for line, record in chunk:
+            record_type = record.get("type") if isinstance(record, dict) else None
+            if record is None:
+                self._error(line, None, {"non_field_errors": ["Invalid JSON."]})
+            elif record_type not in RECORD_TYPES:
+                errors = {"type": [f"Must be one of: {', '.join(RECORD_TYPES)}."]}
+                if not isinstance(record, dict):
+                    errors = {"non_field_errors": ["Expected an object."]}
+                self._error(line, None, errors)
+            elif record_type == "board":
+                self._flush()
+                self._start_board(line, record)
+                if self._current:
+                    touched.add(self._current.board.pk)
+            elif self._current is None:
+                self._error(line, record_type, {"non_field_errors": ["No imported board record before this row."]})
+            elif record_type == "member":
+                self._add_member(line, record)
+            elif record_type == "task":
+                self._add_task(line, record)
+            else:
+                self._comments.append((line, record))
+        self._flush()
+        # new boards have no change log to replay: clients reload them
+        boards = Board.objects.filter(pk__in=touched)
+        list_cache.bump_boards(touched)
+        boards.bump_version()
+        boards.update(log_floor=F("version"))
+    def _start_board(self, line, record):
+        errors = {}
+        title = _text(record, "title", errors, max_length=Board._meta.get_field("title").max_length)
+        if errors:
+            self._current = None
+            return self._error(line, "board", errors)
+        board = Board.objects.create(title=title, owner=self.owner)
+        self._current = ImportedBoard(board)
+        if record.get("owner_id") is not None:
+            self._current.users[str(record["owner_id"])] = board.owner_id
+        self.boards.append(board)
+        self.created["boards"] += 1
+    def _add_member(self, line, record):
+        errors = {}
+        email = _text(record, "email", errors)
+        user_id = self._emails.get(email) if email else None
+        if email and user_id is None:
+            errors["email"] = ["User does not exist."]
+        if errors:
+            return self._error(line, "member", errors)
+        if record.get("id") is not None:
+            self._current.users[str(record["id"])] = user_id
+        if user_id not in self._current.people:
+            self._current.people.add(user_id)
+            self._members.append(Board.members.through(board_id=self._current.board.pk, user_id=user_id))
+    def _add_task(self, line, record):
+        errors = {}
+        row = (
+            self._current.board.pk,
+            _text(record, "title", errors, max_length=TITLE_MAX_LENGTH),
+            _text(record, "description", errors, required=False),
+            _choice(record, "status", STATUSES, errors),
+            _choice(record, "priority", PRIORITIES, errors),
+            self._board_member(record, "assignee", errors),
+            self._board_member(record, "reviewer", errors),
+            _date(record, "due_date", errors),
+            self._user(record, "created_by", errors) or self.owner.pk,
+        )
+        if errors:
+            return self._error(line, "task", errors)
+        self._tasks.append((record.get("id"), row))
+    def _comment_row(self, line, record, now):
+        errors = {}
+        task_id = self._current.tasks.get(str(record.get("task_id")))
+        if task_id is None:
+            errors["task_id"] = [
+                "This field is required." if record.get("task_id") is None else "No imported task with this id."
+            ]
+        row = (
+            task_id,
+            self._user(record, "author", errors) or self.owner.pk,
+            _text(record, "content", errors),
+            _datetime(record, "created_at", errors) or now,
+        )
+        if errors:
+            return self._error(line, "comment", errors)
+        return row
+    def _flush(self):
+        """Writes the pending rows of the current board."""
+        if self._current is None:
+            return self._reset_pending()
+        tasks = self._current.place([row for _, row in self._tasks])
+        if self._members:
+            Board.members.through.objects.bulk_create(self._members)
+            invalidate_board_access([member.user_id for member in self._members])
+            self.created["members"] += len(self._members)
+        if tasks:
+            task_ids = insert_rows(Task, TASK_FIELDS, tasks)
+            for (file_id, _), task_id in zip(self._tasks, task_ids):
+                if file_id is not None:
+                    self._current.tasks[str(file_id)] = task_id
+            self.created["tasks"] += len(task_ids)
+        Board.objects.filter(pk=self._current.board.pk).shift_counters(
+            member_count=len(self._members),
+            ticket_count=len(tasks),
+            tasks_to_do_count=sum(row[STATUS] == "to-do" for row in tasks),
+            tasks_high_prio_count=sum(row[PRIORITY] == "high" for row in tasks),
+        )
+
+        now = timezone.now()
+        comments = [self._comment_row(line, record, now) for line, record in self._comments]
+        comments = [row for row in comments if row is not None]
+        if comments:
+            insert_rows(Comment, COMMENT_FIELDS, comments)
+            Task.objects.filter(pk__in={row[0] for row in comments}).refresh_comments_count()
+            self.created["comments"] += len(comments)
+        self._reset_pending()
@@ -1,11 +1,13 @@
 from rest_framework.permissions import BasePermission
 
+from boards_app.membership import is_board_member
+
 class IsBoardMemberOrOwner(BasePermission):
     """Allows access if the user is board owner or listed as a member."""
     def has_object_permission(self, request, view, obj):
-        return request.user == obj.owner or obj.members.filter(id=request.user.id).exists()
+        return obj.owner_id == request.user.id or is_board_member(request.user, obj.pk)
 
 class IsBoardOwner(BasePermission):
     """Allows access only to the board owner."""
     def has_object_permission(self, request, view, obj):
-        return request.user == obj.owner
+        return obj.owner_id == request.user.id
@@ -14,13 +14,13 @@ class UserPublicSerializer(serializers.ModelSerializer):
 class BoardListSerializer(serializers.ModelSerializer):
     """
     Serializer for listing boards.
-    Includes aggregated counters like members and tasks.
+    Counters are read from the denormalized columns on Board.
     """
     member_count = serializers.IntegerField(read_only=True)
     ticket_count = serializers.IntegerField(read_only=True)
     tasks_to_do_count = serializers.IntegerField(read_only=True)
     tasks_high_prio_count = serializers.IntegerField(read_only=True)
-    owner_id = serializers.IntegerField(source="owner.id", read_only=True)
+    owner_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Board
@@ -80,7 +80,12 @@ class BoardUpdateResponseSerializer(serializers.ModelSerializer):
         model = Board
         fields = ["id", "title", "owner_data", "members_data"]
 class BoardDetailSerializer(serializers.ModelSerializer):
-    owner_id = serializers.IntegerField(source="owner.id", read_only=True)
+    """
+    Board with members and tasks.
+    Expects members and tasks (with assignee and reviewer) to be
+    prefetched, see BoardViewSet.detail_prefetches (applied in retrieve).
+    """
+    owner_id = serializers.IntegerField(read_only=True)
     members = UserPublicSerializer(many=True, read_only=True)
     tasks = TaskSerializer(many=True, read_only=True)
 
@@ -0,0 +1,93 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed
+
+from auth_app.authentication import CachedTokenAuthentication
+from boards_app.events import RESYNC, SubscriberLimitReached, broker
+from boards_app.membership import is_board_member
+from boards_app.models import Board
+
+
+def format_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+class BoardEventStreamView(View):
+    """
+    GET /api/boards/{id}/events/
+    Server-sent event stream of task, comment and membership changes.
+    Authenticate with "Authorization: Token <key>" or ?token=<key>
+    (browsers' EventSource cannot send headers; a query string token ends
+    up in server and proxy access logs, so prefer the header where possible).
+    Needs an ASGI server (core.asgi:application).
+    Permissions: board owner or member, checked again on every membership
+    event and heartbeat; the stream ends once access is gone.
+    """
+    http_method_names = ["get"]
+
+    async def get(self, request, pk):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({"detail": "Event streams require the ASGI application."}, status=501)
+        key = self.token_key(request)
+        user = await self.authenticate(key)
+        if user is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        if not await Board.objects.filter(pk=pk).aexists():
+            return JsonResponse({"detail": "Not found."}, status=404)
+        if not await sync_to_async(is_board_member)(user, pk):
+            return JsonResponse({"detail": "You do not have permission to perform this action."}, status=403)
+
+        if broker.subscriber_count() >= settings.BOARD_EVENTS_MAX_SUBSCRIBERS:
+            return JsonResponse({"detail": "Too many open event streams."}, status=503)
+        response = StreamingHttpResponse(self.stream(pk, key), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def token_key(self, request):
+        header = request.headers.get("Authorization", "").split()
+        if len(header) == 2 and header[0].lower() == "token":
+            return header[1]
+        return request.GET.get("token")
+
+    async def authenticate(self, key):
+        if not key:
+            return None
+        try:
+            user, _ = await sync_to_async(CachedTokenAuthentication().authenticate_credentials)(key)
+        except AuthenticationFailed:
+            return None
+        return user
+
+    async def has_access(self, key, board_id):
+        """Token still valid and its user still on the board (both looked up in their caches)."""
+        user = await self.authenticate(key)
+        return user is not None and await sync_to_async(is_board_member)(user, board_id)
+
+    async def stream(self, board_id, key):
+        # Subscribing here (not in get()) guarantees the finally block runs
+        # for every registered subscription, even on early disconnects.
+        try:
+            subscription = broker.subscribe(board_id)
+        except SubscriberLimitReached:
+            yield format_event(RESYNC)
+            return
+        try:
+            yield format_event({"type": "ready", "board": board_id})
+            while True:
+                event = await subscription.get(timeout=settings.BOARD_EVENTS_HEARTBEAT)
+                if (event is None or event["type"] in ("member", "board")) and not await self.has_access(key, board_id):
+                    break
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event)
+                if subscription.overflowed:
+                    break
+        finally:
+            subscription.close()
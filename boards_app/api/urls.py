@@ -1,11 +1,13 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from .streams import BoardEventStreamView
 from .views import BoardViewSet
 
 router = DefaultRouter()
 router.register(r"boards", BoardViewSet, basename="boards")
 
 urlpatterns = [
+    path("boards/<int:pk>/events/", BoardEventStreamView.as_view(), name="board-events"),
     path("", include(router.urls)),
 ]
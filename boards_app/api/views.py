@@ -1,10 +1,25 @@
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count, Q
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch, Q, prefetch_related_objects
+from django.shortcuts import get_object_or_404
 
+from boards_app.list_cache import cached_board_list
+from boards_app.membership import get_board_access
 from boards_app.models import Board
+from tasks_app.models import Task
 from boards_app.api.permissions import IsBoardMemberOrOwner, IsBoardOwner
+from core.conditional import etag_matches, make_etag, not_modified
+from core.readers import ValuesListMixin, ValuesReader
+from core.renderers import StreamedRows, StreamingJSONResponse
+from tasks_app.api.serializers import TaskSerializer
+from .delta import build_board_delta
+from .export import CSVRenderer, NDJSONRenderer, export_response
+from .importer import FORMATS, BoardImport, guess_format, read_records
 from .serializers import (
     BoardDetailSerializer,
     BoardListSerializer,
@@ -14,14 +29,15 @@ from .serializers import (
 from rest_framework import status
 
 
-class BoardViewSet(ModelViewSet):
+class BoardViewSet(ValuesListMixin, ModelViewSet):
     queryset = Board.objects.all()
+    values_reader = ValuesReader(BoardListSerializer)
 
     # permissions
     def get_permissions(self):
-        if self.action in ["list", "create"]:
+        if self.action in ["list", "create", "import_boards"]:
             return [IsAuthenticated()]
-        if self.action in ["retrieve", "update", "partial_update"]:
+        if self.action in ["retrieve", "update", "partial_update", "changes", "export"]:
             return [IsAuthenticated(), IsBoardMemberOrOwner()]
         if self.action == "destroy":
             return [IsAuthenticated(), IsBoardOwner()]
@@ -97,35 +113,116 @@ class BoardViewSet(ModelViewSet):
     #     )
 
     # DLA retrieve / update / patch / delete
-    
         return Board.objects.all() 
 
+    # relations serialized by BoardDetailSerializer, one query each
+    detail_prefetches = (
+        "members",
+        Prefetch("tasks", queryset=Task.objects.select_related("assignee", "reviewer").in_column_order()),
+    )
+    # big boards: members only, the tasks are streamed (see streamed_detail)
+    streamed_detail_prefetches = ("members", Prefetch("tasks", queryset=Task.objects.none()))
+    task_reader = ValuesReader(TaskSerializer)
+
+    @classmethod
+    def is_streamed(cls, board):
+        return board.ticket_count >= settings.JSON_STREAMING_MIN_ROWS
+    @classmethod
+    def streamed_detail(cls, board, tasks):
+        """Detail data of a board loaded with streamed_detail_prefetches; tasks come from `tasks` rows."""
+        data = BoardDetailSerializer(board).data
+        data["tasks"] = StreamedRows(tasks, cls.task_reader.read)
+        return data
+    @classmethod
+    def streamed_tasks(cls, board):
+        return cls.task_reader.values(Task.objects.filter(board=board).in_column_order())
+
+    # GET /api/boards/{id}/
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Answers If-None-Match with 304 after a single board lookup;
+        members and tasks are only loaded when the board has changed.
+        """
+        board = get_object_or_404(Board, pk=kwargs["pk"])
+        self.check_object_permissions(request, board)
+        etag = make_etag("board", board.pk, board.version, request=request)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        headers = {"ETag": etag, "X-Board-Version": str(board.version)}
+        if self.is_streamed(board):
+            prefetch_related_objects([board], *self.streamed_detail_prefetches)
+            tasks = self.streamed_tasks(board).iterator(chunk_size=settings.JSON_STREAMING_CHUNK_SIZE)
+            return StreamingJSONResponse(self.streamed_detail(board, tasks), headers=headers)
+
+        prefetch_related_objects([board], *self.detail_prefetches)
+        serializer = self.get_serializer(board)
+        return Response(serializer.data, headers=headers)
+
+    # GET /api/boards/{id}/changes/?since=<version>
+    @action(detail=True, methods=["get"])
+    def changes(self, request, pk=None):
+        """
+        Tasks, comments and members changed since a board version, with
+        tombstones for deletions. Answers 410 when the log no longer
+        reaches back to `since`; the client then reloads the board.
+        """
+        try:
+            since = int(request.query_params["since"])
+        except (KeyError, ValueError):
+            return Response({"since": ["A valid integer is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        board = self.get_object()
+        if since < board.log_floor:
+            return Response(
+                {"detail": "Change log was compacted, reload the board.", "version": board.version},
+                status=status.HTTP_410_GONE,
+            )
+        return Response(build_board_delta(board, since))
+
+    @action(detail=True, methods=["get"], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request, pk=None):
+        """
+        GET /api/boards/{id}/export/?format=ndjson|csv[&compress=gzip]
+        Streams the board, its members, tasks and comments (see boards_app.api.export).
+        """
+        board = self.get_object()
+        compress = request.query_params.get("compress")
+        if compress not in (None, "gzip"):
+            return Response({"compress": ['Only "gzip" is supported.']}, status=status.HTTP_400_BAD_REQUEST)
+        return export_response(
+            board,
+            request.accepted_renderer.format,
+            compress=compress == "gzip",
+            asynchronous=isinstance(request._request, ASGIRequest),
+        )
+
+    @action(detail=False, methods=["post"], url_path="import", url_name="import", parser_classes=[MultiPartParser])
+    def import_boards(self, request):
+        """
+        POST /api/boards/import/ (multipart: file, optional format=ndjson|csv)
+        Creates the boards of an export-format file, owned by the requesting
+        user (see boards_app.api.importer), and answers with the import report.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"file": ["No file was submitted."]}, status=status.HTTP_400_BAD_REQUEST)
+        import_format = request.data.get("format") or guess_format(upload.name)
+        if import_format not in FORMATS:
+            return Response(
+                {"format": ['Must be "ndjson" or "csv" when the file name does not tell.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        report = BoardImport(request.user).run(read_records(upload, import_format))
+        return Response(report, status=status.HTTP_201_CREATED if report["boards"] else status.HTTP_400_BAD_REQUEST)
+
 
     # POST /api/boards/
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         board = serializer.save()
-
-        board = (
-            Board.objects
-            .filter(id=board.id)
-            .annotate(
-                member_count=Count("members", distinct=True),
-                ticket_count=Count("tasks", distinct=True),
-                tasks_to_do_count=Count(
-                    "tasks",
-                    filter=Q(tasks__status="to-do"),
-                    distinct=True,
-                ),
-                tasks_high_prio_count=Count(
-                    "tasks",
-                    filter=Q(tasks__priority="high"),
-                    distinct=True,
-                ),
-            )
-            .first()
-        )
+        # counters were updated in the database by the membership signals
+        board.refresh_from_db(fields=Board.COUNTER_FIELDS)
 
         return Response(
             BoardListSerializer(board, context={"request": request}).data,
@@ -156,24 +253,15 @@ class BoardViewSet(ModelViewSet):
         Board.objects
         .filter(
         Q(owner=request.user) |
-        Q(members=request.user)
-        )
-        .annotate(
-        member_count=Count("members", distinct=True),
-        ticket_count=Count("tasks", distinct=True),
-        tasks_to_do_count=Count(
-        "tasks",
-        filter=Q(tasks__status="to-do"),
-        distinct=True,
-        ),
-        tasks_high_prio_count=Count(
-        "tasks",
-        filter=Q(tasks__priority="high"),
-        distinct=True,
-        ),
+        Q(id__in=request.user.boards.values("id"))
         )
-        .distinct()
         )
 
-        serializer = BoardListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        if self.paginator is not None and self.paginator.is_requested(request):
+            return self.list_response(queryset)
+        reader = self.values_reader
+        return Response(cached_board_list(
+            request.user.pk,
+            get_board_access(request.user).board_ids,
+            lambda: reader.read(reader.values(queryset)),
+        ))
@@ -0,0 +1,65 @@
+"""
+Single entry point for "something on a board changed".
+
+Signal receivers in boards_app and tasks_app describe every write as
+BoardChange(board_id, kind, object_id, action) and hand it to
+record_board_changes(), which
+- bumps the version of the affected boards,
+- appends the changes to the board change log (delta sync), and
+- publishes them to live event streams once the transaction commits.
+"""
+from collections import namedtuple
+
+from django.db import transaction
+
+from .events import broker
+from .models import Board, ChangeLogEntry
+
+KINDS = ("board", "task", "comment", "member")
+UPSERT = "upsert"
+DELETE = "delete"
+
+BoardChange = namedtuple("BoardChange", ["board_id", "kind", "object_id", "action"])
+
+
+def change_event(entry):
+    return {
+        "type": entry.kind,
+        "action": entry.action,
+        "board": entry.board_id,
+        "id": entry.object_id,
+        "version": entry.version,
+    }
+
+
+def _publish(entries):
+    for entry in entries:
+        broker.publish(entry.board_id, change_event(entry))
+
+
+def record_board_changes(changes):
+    changes = [change for change in changes if change.board_id is not None]
+    if not changes:
+        return
+    board_ids = {change.board_id for change in changes}
+    with transaction.atomic():
+        boards = Board.objects.filter(pk__in=board_ids)
+        boards.bump_version()
+        # boards deleted in the same transaction simply drop out here
+        versions = dict(boards.values_list("pk", "version"))
+        entries = ChangeLogEntry.objects.bulk_create(
+            ChangeLogEntry(
+                board_id=change.board_id,
+                version=versions[change.board_id],
+                kind=change.kind,
+                object_id=change.object_id,
+                action=change.action,
+            )
+            for change in changes
+            if change.board_id in versions
+        )
+    transaction.on_commit(lambda: _publish(entries))
+
+
+def record_board_change(board_id, kind, object_id, action=UPSERT):
+    record_board_changes([BoardChange(board_id, kind, object_id, action)])
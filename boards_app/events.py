@@ -0,0 +1,95 @@
+"""
+In-process pub/sub for live board events (GET /api/boards/{id}/events/).
+
+record_board_changes() publishes every committed change to `broker`.
+Each subscriber (one open event stream) owns a bounded asyncio queue on
+its event loop. Publishing never blocks the writer: events are handed to
+the subscriber's loop with call_soon_threadsafe. A subscriber whose queue
+is full is dropped from the fan-out and receives a final "resync" event,
+after which the client reconnects and reloads the board.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+RESYNC = {"type": "resync"}
+
+
+class SubscriberLimitReached(Exception):
+    pass
+
+
+class Subscription:
+    """One stream's view of a board; must be created and consumed on one event loop."""
+    def __init__(self, broker, board_id, loop, maxsize):
+        self.broker = broker
+        self.board_id = board_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+    def offer(self, event):
+        """Runs on the subscriber's loop."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.broker.unsubscribe(self)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+    async def get(self, timeout=None):
+        """Next event, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class BoardEventBroker:
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._count = 0
+        self._lock = threading.Lock()
+    def subscribe(self, board_id):
+        """Registers a subscription for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._count >= settings.BOARD_EVENTS_MAX_SUBSCRIBERS:
+                raise SubscriberLimitReached()
+            subscription = Subscription(self, board_id, loop, settings.BOARD_EVENTS_QUEUE_SIZE)
+            self._subscriptions[board_id].add(subscription)
+            self._count += 1
+        return subscription
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.board_id)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.board_id]
+            self._count -= 1
+    def publish(self, board_id, event):
+        """Thread-safe; callable from sync code in any thread."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(board_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # the subscriber's loop is closed
+                self.unsubscribe(subscription)
+    def subscriber_count(self, board_id=None):
+        with self._lock:
+            if board_id is None:
+                return self._count
+            return len(self._subscriptions.get(board_id, ()))
+
+
+broker = BoardEventBroker()
@@ -0,0 +1,186 @@
+"""
+Response cache for the plain (unpaginated) GET /api/boards/ list.
+
+A list is cached per user and user generation, together with the
+generation of every board in it:
+
+    kanmind:board-list:<user id>:<user generation> -> (data, {board key: board generation})
+
+The user generation moves whenever the set of boards the user sees
+changes (invalidate_board_access() bumps it), a board generation whenever
+a value the list shows changes: title or owner, members, tasks created or
+deleted, status or priority (boards_app.signals, tasks_app.signals). An
+entry is only served if none of its generations moved, so a hit costs
+three cache lookups and no query, and a write to a board bumps one key
+whatever the number of its members.
+
+The generations live in the same cache (BOARD_LIST_CACHE_ALIAS), so it
+must be shared by every process that writes boards: locmem is only
+correct with a single worker. With several, a bump reaches only the
+process that made the change, and the others keep serving the old list
+(e.g. a board the user was removed from) for up to BOARD_LIST_CACHE_TTL
+seconds; use a shared backend such as FileBasedCache. A bump writes a
+new number (time.time_ns()) instead of incrementing, so no atomic incr is
+needed, and a generation that was evicted simply starts over with a new
+number.
+
+A miss is computed once (single flight): the first request takes a lock
+with cache.add(), concurrent requests for the same list poll for its
+result for up to BOARD_LIST_CACHE_LOCK_TIMEOUT seconds and compute it
+themselves only after that. Hits, misses and waits are counted in
+core.metrics; GET /api/metrics/ shows the hit ratio.
+"""
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from core import metrics
+
+HIT = "boards.list_cache.hit"
+MISS = "boards.list_cache.miss"
+WAIT = "boards.list_cache.wait"  # served from the result of a concurrent request
+metrics.register_ratio("boards.list_cache.hit_ratio", HIT, MISS)
+
+
+def _cache():
+    return caches[settings.BOARD_LIST_CACHE_ALIAS]
+
+
+def user_key(user_id):
+    return f"kanmind:board-list:user:{user_id}"
+
+
+def board_key(board_id):
+    return f"kanmind:board-list:board:{board_id}"
+
+
+def _bump(keys):
+    """New generations now and again after the surrounding transaction commits."""
+    keys = list(keys)
+    if not keys:
+        return
+    def bump():
+        _cache().set_many(dict.fromkeys(keys, time.time_ns()), None)
+    bump()
+    transaction.on_commit(bump)
+
+
+def bump_users(user_ids):
+    _bump(user_key(user_id) for user_id in set(user_ids) if user_id is not None)
+
+
+def bump_boards(board_ids):
+    _bump(board_key(board_id) for board_id in set(board_ids) if board_id is not None)
+
+
+def _missing_generations(keys, found):
+    return {key: time.time_ns() for key in keys if found.get(key) is None}
+
+
+def _generations(cache, keys):
+    """{key: generation}; generations that do not exist yet are created."""
+    found = cache.get_many(keys)
+    missing = _missing_generations(keys, found)
+    for key, generation in missing.items():
+        # add(): a concurrent bump wins
+        cache.add(key, generation, None)
+    if missing:
+        found.update(cache.get_many(list(missing)))
+    return found
+
+
+async def _agenerations(cache, keys):
+    found = await cache.aget_many(keys)
+    missing = _missing_generations(keys, found)
+    for key, generation in missing.items():
+        await cache.aadd(key, generation, None)
+    if missing:
+        found.update(await cache.aget_many(list(missing)))
+    return found
+
+
+def _entry_key(user_id, user_generation):
+    return f"kanmind:board-list:{user_id}:{user_generation}"
+
+
+def _unknown_board_keys(data, generations):
+    """Keys of boards in `data` whose generation was not read before computing it."""
+    return [key for key in (board_key(row["id"]) for row in data) if key not in generations]
+
+
+def _entry(data, generations):
+    return data, {board_key(row["id"]): generations.get(board_key(row["id"])) for row in data}
+
+
+class _Waiting:
+    """How long a request waits for a list computed by a concurrent one."""
+    def __init__(self):
+        self.deadline = None
+    @property
+    def started(self):
+        return self.deadline is not None
+    def keep_waiting(self):
+        if self.deadline is None:
+            self.deadline = time.monotonic() + settings.BOARD_LIST_CACHE_LOCK_TIMEOUT
+        return time.monotonic() < self.deadline
+
+
+def cached_board_list(user_id, board_ids, compute):
+    """
+    The rows of compute() (dicts with "id"), from the cache while current.
+    `board_ids` are the boards the user is known to see: their generations
+    are read before compute() runs, so a write during it is not missed.
+    """
+    cache = _cache()
+    key = _entry_key(user_id, _generations(cache, [user_key(user_id)])[user_key(user_id)])
+    lock_key, waiting = key + ":lock", _Waiting()
+    while True:
+        entry = cache.get(key)
+        if entry is not None and cache.get_many(list(entry[1])) == entry[1]:
+            metrics.incr(WAIT if waiting.started else HIT)
+            return entry[0]
+        locked = cache.add(lock_key, True, settings.BOARD_LIST_CACHE_LOCK_TIMEOUT)
+        if locked or not waiting.keep_waiting():
+            break
+        time.sleep(settings.BOARD_LIST_CACHE_POLL_INTERVAL)
+
+    metrics.incr(MISS)
+    try:
+        generations = _generations(cache, [board_key(board_id) for board_id in board_ids])
+        data = compute()
+        generations.update(_generations(cache, _unknown_board_keys(data, generations)))
+        cache.set(key, _entry(data, generations), settings.BOARD_LIST_CACHE_TTL)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return data
+
+
+async def acached_board_list(user_id, board_ids, acompute):
+    """cached_board_list() for async views; `acompute` is a coroutine function."""
+    cache = _cache()
+    key = _entry_key(user_id, (await _agenerations(cache, [user_key(user_id)]))[user_key(user_id)])
+    lock_key, waiting = key + ":lock", _Waiting()
+    while True:
+        entry = await cache.aget(key)
+        if entry is not None and await cache.aget_many(list(entry[1])) == entry[1]:
+            metrics.incr(WAIT if waiting.started else HIT)
+            return entry[0]
+        locked = await cache.aadd(lock_key, True, settings.BOARD_LIST_CACHE_LOCK_TIMEOUT)
+        if locked or not waiting.keep_waiting():
+            break
+        await asyncio.sleep(settings.BOARD_LIST_CACHE_POLL_INTERVAL)
+
+    metrics.incr(MISS)
+    try:
+        generations = await _agenerations(cache, [board_key(board_id) for board_id in board_ids])
+        data = await acompute()
+        generations.update(await _agenerations(cache, _unknown_board_keys(data, generations)))
+        await cache.aset(key, _entry(data, generations), settings.BOARD_LIST_CACHE_TTL)
+    finally:
+        if locked:
+            await cache.adelete(lock_key)
+    return data
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from boards_app.models import Board, ChangeLogEntry
+
+
+class Command(BaseCommand):
+    """
+    python manage.py compact_board_changes [--older-than-days N]
+    Drops change log entries superseded by a newer entry for the same object;
+    deltas only ever report the latest action per object, so this is lossless.
+    With --older-than-days, entries older than N days are dropped as well and
+    the log floor of their boards is raised, so clients syncing from before
+    it get 410 Gone and reload the board.
+    """
+    help = "Compact the board change log used by GET /api/boards/{id}/changes/."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            help="Also expire entries older than this many days.",
+        )
+
+    def handle(self, *args, **options):
+        newer = ChangeLogEntry.objects.filter(
+            board=OuterRef("board"),
+            kind=OuterRef("kind"),
+            object_id=OuterRef("object_id"),
+            pk__gt=OuterRef("pk"),
+        )
+        superseded, _ = ChangeLogEntry.objects.filter(Exists(newer)).delete()
+        self.stdout.write(f"Removed {superseded} superseded entries.")
+
+        days = options["older_than_days"]
+        if days is None:
+            return
+        expired = ChangeLogEntry.objects.filter(created_at__lt=timezone.now() - timedelta(days=days))
+        with transaction.atomic():
+            floors = expired.values("board").annotate(floor=Max("version")).values_list("board", "floor")
+            for board_id, floor in floors:
+                Board.objects.filter(pk=board_id).update(log_floor=Greatest("log_floor", floor))
+            count, _ = expired.delete()
+        self.stdout.write(self.style.SUCCESS(f"Expired {count} entries older than {days} days."))
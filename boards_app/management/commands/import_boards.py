@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from boards_app.api.importer import FORMATS, BoardImport, guess_format, read_records
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    python manage.py import_boards FILE --owner EMAIL [--format ndjson|csv] [--chunk-size N]
+    Creates the boards of an export-format file (see boards_app.api.importer)
+    owned by the given user and prints the created rows and every row error.
+    """
+    help = "Import boards, members, tasks and comments from an NDJSON or CSV file (optionally gzipped)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="Path of the file, e.g. board-1.ndjson or board-1.csv.gz.")
+        parser.add_argument("--owner", required=True, help="Email of the user who will own the boards.")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, help="Records per transaction (default IMPORT_CHUNK_SIZE).")
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(email=options["owner"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['owner']}.")
+        import_format = options["format"] or guess_format(options["file"])
+        if import_format is None:
+            raise CommandError("Cannot tell the format from the file name, use --format.")
+        try:
+            with open(options["file"], "rb") as file:
+                report = BoardImport(owner, chunk_size=options["chunk_size"]).run(read_records(file, import_format))
+        except OSError as exc:
+            raise CommandError(exc)
+
+        for error in report["errors"]:
+            self.stderr.write(f"line {error['line']} ({error['type'] or '-'}): {error['errors']}")
+        if report["error_count"] > len(report["errors"]):
+            self.stderr.write(f"... {report['error_count'] - len(report['errors'])} more errors")
+        created = ", ".join(f"{count} {kind}" for kind, count in report["created"].items())
+        boards = ", ".join(f"#{board['id']} {board['title']}" for board in report["boards"])
+        self.stdout.write(self.style.SUCCESS(f"Created {created} ({boards or 'no boards'})."))
+        if report["error_count"]:
+            raise CommandError(f"{report['error_count']} row(s) were not imported.")
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from boards_app import list_cache
+from boards_app.models import Board
+
+
+class Command(BaseCommand):
+    """
+    python manage.py rebuild_board_counters [--verify] [--board ID ...]
+    Recomputes the denormalized board counters from the task and membership tables.
+    With --verify nothing is written; the command fails if any board is out of sync.
+    """
+    help = "Rebuild or verify the denormalized counters stored on Board."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report boards whose counters are out of sync.",
+        )
+        parser.add_argument(
+            "--board",
+            type=int,
+            action="append",
+            dest="board_ids",
+            help="Restrict to the given board id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        boards = Board.objects.all()
+        if options["board_ids"]:
+            boards = boards.filter(pk__in=options["board_ids"])
+
+        if options["verify"]:
+            broken = list(boards.out_of_sync())
+            for board in broken:
+                stored = ", ".join(f"{f}={getattr(board, f)}" for f in Board.COUNTER_FIELDS)
+                counted = ", ".join(f"{f}={getattr(board, 'counted_' + f)}" for f in Board.COUNTER_FIELDS)
+                self.stdout.write(f"Board {board.pk}: stored {stored}; counted {counted}")
+            if broken:
+                raise CommandError(f"{len(broken)} board(s) have out-of-sync counters.")
+            self.stdout.write(self.style.SUCCESS("All board counters are in sync."))
+            return
+
+        updated = boards.refresh_counters()
+        # cached board lists show the counters
+        list_cache.bump_boards(boards.values_list("pk", flat=True))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {updated} board(s)."))
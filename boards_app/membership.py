@@ -0,0 +1,147 @@
+"""
+Board membership lookups shared by all permission checks.
+
+get_board_access(user) returns the ids of every board the user owns or
+is a member of. The result is kept in a per-process LRU cache keyed by
+user id, so repeated permission checks cost no query at all and a cold
+check costs one indexed lookup. Entries are invalidated by the signals
+in boards_app.signals (membership changes, owner changes, deletes) and
+expire after BOARD_ACCESS_CACHE_TTL seconds, which bounds staleness
+across worker processes.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+
+from . import list_cache
+from .models import Board
+
+
+class BoardAccess:
+    """Boards a single user can access; `owned_board_ids` is the owner flag per board."""
+    __slots__ = ("board_ids", "owned_board_ids")
+    def __init__(self, board_ids=(), owned_board_ids=()):
+        self.board_ids = frozenset(board_ids)
+        self.owned_board_ids = frozenset(owned_board_ids)
+    def has_board(self, board_id):
+        return board_id in self.board_ids
+    def owns(self, board_id):
+        return board_id in self.owned_board_ids
+
+
+class _LRUCache:
+    """Thread-safe LRU mapping with a time-to-live per entry."""
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + settings.BOARD_ACCESS_CACHE_TTL)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.BOARD_ACCESS_CACHE_SIZE:
+                self._entries.popitem(last=False)
+    def discard(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _LRUCache()
+NO_ACCESS = BoardAccess()
+
+
+def _board_access_rows(user_id):
+    """
+    Single indexed query: boards owned by the user or joined through membership.
+    Always read from the primary: a lagging replica would re-cache access that
+    was just revoked or not yet granted.
+    """
+    memberships = Board.members.through.objects.using(DEFAULT_DB_ALIAS).filter(user_id=user_id).values("board_id")
+    return (
+        Board.objects.using(DEFAULT_DB_ALIAS)
+        .filter(Q(owner_id=user_id) | Q(id__in=memberships))
+        .order_by()
+        .values_list("id", "owner_id")
+    )
+
+
+def _build_board_access(user_id, rows):
+    board_ids, owned_board_ids = set(), set()
+    for board_id, owner_id in rows:
+        board_ids.add(board_id)
+        if owner_id == user_id:
+            owned_board_ids.add(board_id)
+    return BoardAccess(board_ids, owned_board_ids)
+
+
+def load_board_access(user_id):
+    return _build_board_access(user_id, _board_access_rows(user_id))
+
+
+def get_board_access(user):
+    """Returns the (cached) BoardAccess of a user instance or user id."""
+    user_id = getattr(user, "pk", user)
+    if user_id is None:
+        return NO_ACCESS
+    access = _cache.get(user_id)
+    if access is None:
+        access = load_board_access(user_id)
+        _cache.set(user_id, access)
+    return access
+
+
+def is_board_member(user, board_id):
+    """True if the user owns the board or is one of its members."""
+    return get_board_access(user).has_board(board_id)
+
+
+async def aget_board_access(user):
+    """get_board_access() for async views, sharing the same cache."""
+    user_id = getattr(user, "pk", user)
+    if user_id is None:
+        return NO_ACCESS
+    access = _cache.get(user_id)
+    if access is None:
+        access = _build_board_access(user_id, [row async for row in _board_access_rows(user_id)])
+        _cache.set(user_id, access)
+    return access
+
+
+async def ais_board_member(user, board_id):
+    return (await aget_board_access(user)).has_board(board_id)
+
+
+def invalidate_board_access(user_ids):
+    """
+    Drops cached entries now and again after the surrounding transaction
+    commits, so a concurrent reader cannot re-cache pre-commit data.
+    """
+    user_ids = [user_id for user_id in user_ids if user_id is not None]
+    if not user_ids:
+        return
+    _cache.discard(user_ids)
+    transaction.on_commit(lambda: _cache.discard(user_ids))
+    # the set of listed boards changes as well
+    list_cache.bump_users(user_ids)
+
+
+def clear_board_access_cache():
+    _cache.clear()
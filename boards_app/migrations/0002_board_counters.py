@@ -0,0 +1,56 @@
+# Generated by Django 5.1.15 on 2026-10-18 02:31
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Board = apps.get_model('boards_app', 'Board')
+    Task = apps.get_model('tasks_app', 'Task')
+
+    def count(model, **filters):
+        rows = (
+            model.objects.filter(board=OuterRef('pk'), **filters)
+            .order_by().values('board').annotate(total=Count('pk')).values('total')
+        )
+        return Coalesce(Subquery(rows), 0)
+
+    Board.objects.update(
+        member_count=count(Board.members.through),
+        ticket_count=count(Task),
+        tasks_to_do_count=count(Task, status='to-do'),
+        tasks_high_prio_count=count(Task, priority='high'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards_app', '0001_initial'),
+        ('tasks_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='member_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='tasks_high_prio_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='tasks_to_do_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='ticket_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
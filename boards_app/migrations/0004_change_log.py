@@ -0,0 +1,43 @@
+# Generated by Django 5.1.15 on 2026-10-18 02:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def start_log_at_current_version(apps, schema_editor):
+    # nothing was logged before this migration
+    Board = apps.get_model('boards_app', 'Board')
+    Board.objects.update(log_floor=F('version'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards_app', '0003_board_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='log_floor',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField()),
+                ('kind', models.CharField(choices=[('board', 'Board'), ('task', 'Task'), ('comment', 'Comment'), ('member', 'Member')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('upsert', 'Created or updated'), ('delete', 'Deleted')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='change_log', to='boards_app.board')),
+            ],
+            options={
+                'ordering': ['version', 'id'],
+                'indexes': [models.Index(fields=['board', 'version'], name='boards_app__board_i_26daee_idx')],
+            },
+        ),
+        migrations.RunPython(start_log_at_current_version, migrations.RunPython.noop),
+    ]
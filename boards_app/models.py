@@ -1,12 +1,88 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count_per_board(model, **filters):
+    """Correlated COUNT of `model` rows pointing at the outer board."""
+    rows = (
+        model.objects
+        .filter(board=OuterRef("pk"), **filters)
+        .order_by()
+        .values("board")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+class BoardQuerySet(models.QuerySet):
+    """
+    Helpers for the denormalized counters stored on Board.
+    The counters are maintained incrementally by signals; these methods
+    recompute them from the task and membership tables.
+    """
+    def _counted_expressions(self):
+        Task = self.model.tasks.rel.related_model
+        return {
+            "member_count": _count_per_board(self.model.members.through),
+            "ticket_count": _count_per_board(Task),
+            "tasks_to_do_count": _count_per_board(Task, status="to-do"),
+            "tasks_high_prio_count": _count_per_board(Task, priority="high"),
+        }
+    def with_counted_totals(self):
+        """Annotates `counted_<field>` for every counter field."""
+        return self.annotate(**{
+            f"counted_{field}": expression
+            for field, expression in self._counted_expressions().items()
+        })
+    def out_of_sync(self):
+        """Boards whose stored counters differ from the recomputed ones."""
+        return self.with_counted_totals().exclude(**{
+            field: F(f"counted_{field}") for field in Board.COUNTER_FIELDS
+        })
+    def refresh_counters(self, fields=None):
+        """Recomputes the stored counters in a single UPDATE."""
+        expressions = self._counted_expressions()
+        return self.update(**{
+            field: expressions[field] for field in (fields or Board.COUNTER_FIELDS)
+        })
+    def bump_version(self):
+        """
+        Sets the version of the selected boards to one above the highest
+        version of any board, so versions form a global, increasing sequence.
+        """
+        latest = self.model._base_manager.order_by("-version").values("version")[:1]
+        return self.update(version=Coalesce(Subquery(latest), 0) + 1)
+    def shift_counters(self, **deltas):
+        """Adds the given deltas to the stored counters in a single UPDATE."""
+        changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if not changes:
+            return 0
+        return self.update(**changes)
+
 
 class Board(models.Model):
     """
     KanMind board entity.
     - owner: creator of the board
     - members: users that have access to the board
+    - *_count: denormalized counters shown in the board list
+    - version: stamp bumped on every write to the board or its tasks,
+      comments and members (drives ETags and delta sync)
+    - log_floor: change log entries up to this version may have been
+      compacted away
     """
+    COUNTER_FIELDS = (
+        "member_count",
+        "ticket_count",
+        "tasks_to_do_count",
+        "tasks_high_prio_count",
+    )
+    # Maintained with UPDATE ... SET x = x + n, never written back by save().
+    DENORMALIZED_FIELDS = COUNTER_FIELDS + ("version", "log_floor")
+
     title = models.CharField(max_length=200)
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -18,12 +94,66 @@ class Board(models.Model):
         related_name="boards",
         blank=True,
     )
+    member_count = models.IntegerField(default=0, editable=False)
+    ticket_count = models.IntegerField(default=0, editable=False)
+    tasks_to_do_count = models.IntegerField(default=0, editable=False)
+    tasks_high_prio_count = models.IntegerField(default=0, editable=False)
+    version = models.BigIntegerField(default=0, db_index=True, editable=False)
+    log_floor = models.BigIntegerField(default=0, editable=False)
+    objects = BoardQuerySet.as_manager()
     class Meta:
         ordering = ["id"]
         verbose_name = "Board"
         verbose_name_plural = "Boards"
     def __str__(self):
         return self.title
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # lets the membership cache detect owner changes
+        instance._loaded_owner_id = instance.__dict__.get("owner_id")
+        return instance
+    def save(self, *args, **kwargs):
+        """
+        Updates never write the denormalized fields back, so a stale
+        in-memory instance cannot overwrite concurrent counter updates.
+        """
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DENORMALIZED_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
 
 
-
+class ChangeLogEntry(models.Model):
+    """
+    Append-only log of board changes, written by boards_app.changes.
+    `version` is the board version created by the change; deltas since a
+    version are all entries with a higher one.
+    """
+    KIND_CHOICES = [
+        ("board", "Board"),
+        ("task", "Task"),
+        ("comment", "Comment"),
+        ("member", "Member"),
+    ]
+    ACTION_CHOICES = [
+        ("upsert", "Created or updated"),
+        ("delete", "Deleted"),
+    ]
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name="change_log")
+    version = models.BigIntegerField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    class Meta:
+        ordering = ["version", "id"]
+        indexes = [models.Index(fields=["board", "version"])]
+    def __str__(self):
+        return f"{self.kind} {self.object_id} {self.action} @ {self.version}"
@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import list_cache
+from .changes import DELETE, UPSERT, BoardChange, record_board_change, record_board_changes
+from .membership import invalidate_board_access
+from .models import Board
+
+
+@receiver(m2m_changed, sender=Board.members.through)
+def update_member_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keeps Board.member_count in sync with Board.members.
+    Works from both sides (board.members.add / user.boards.add).
+    """
+    if action == "pre_clear" and reverse:
+        instance._cleared_board_ids = list(instance.boards.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        if action == "post_clear":
+            board_ids = getattr(instance, "_cleared_board_ids", [])
+        else:
+            board_ids = pk_set
+        boards = Board.objects.filter(pk__in=board_ids)
+    else:
+        boards = Board.objects.filter(pk=instance.pk)
+
+    if action == "post_add" and not reverse:
+        # pk_set only contains the rows that were actually inserted.
+        boards.shift_counters(member_count=len(pk_set))
+    else:
+        boards.refresh_counters(fields=["member_count"])
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def release_memberships(sender, instance, **kwargs):
+    """Membership rows of a deleted user are removed without m2m signals."""
+    board_ids = list(Board.objects.filter(members=instance).values_list("pk", flat=True))
+    Board.objects.filter(pk__in=board_ids).shift_counters(member_count=-1)
+    list_cache.bump_boards(board_ids)
+
+
+@receiver(m2m_changed, sender=Board.members.through)
+def invalidate_access_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_board_access([instance.pk])
+        return
+    if action == "pre_clear":
+        instance._cleared_member_ids = list(instance.members.values_list("pk", flat=True))
+    elif action == "post_clear":
+        invalidate_board_access(getattr(instance, "_cleared_member_ids", []))
+    elif action in ("post_add", "post_remove"):
+        invalidate_board_access(pk_set)
+
+
+@receiver(post_save, sender=Board)
+def invalidate_access_on_owner_change(sender, instance, created, **kwargs):
+    previous_owner_id = getattr(instance, "_loaded_owner_id", None)
+    if created or previous_owner_id != instance.owner_id:
+        invalidate_board_access([previous_owner_id, instance.owner_id])
+    instance._loaded_owner_id = instance.owner_id
+
+
+@receiver(pre_delete, sender=Board)
+def invalidate_access_on_board_delete(sender, instance, **kwargs):
+    member_ids = list(instance.members.values_list("pk", flat=True))
+    invalidate_board_access([instance.owner_id, *member_ids])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_access_on_user_change(sender, instance, **kwargs):
+    """User ids can be reused (e.g. after a rolled back transaction)."""
+    if kwargs.get("created", True):
+        invalidate_board_access([instance.pk])
+
+
+@receiver(post_save, sender=Board)
+def record_board_save(sender, instance, raw, **kwargs):
+    if not raw:
+        record_board_change(instance.pk, "board", instance.pk)
+
+
+@receiver(m2m_changed, sender=Board.members.through)
+def record_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    change = UPSERT if action == "post_add" else DELETE
+    if reverse:
+        board_ids = getattr(instance, "_cleared_board_ids", []) if action == "post_clear" else pk_set
+        pairs = [(board_id, instance.pk) for board_id in board_ids]
+    else:
+        user_ids = getattr(instance, "_cleared_member_ids", []) if action == "post_clear" else pk_set
+        pairs = [(instance.pk, user_id) for user_id in user_ids]
+    record_board_changes([BoardChange(board_id, "member", user_id, change) for board_id, user_id in pairs])
+
+
+@receiver(post_save, sender=Board)
+def bump_listed_board_on_save(sender, instance, raw, **kwargs):
+    if not raw:
+        list_cache.bump_boards([instance.pk])
+
+
+@receiver(m2m_changed, sender=Board.members.through)
+def bump_listed_boards_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Everyone on the board sees its member_count change."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        list_cache.bump_boards(getattr(instance, "_cleared_board_ids", []) if action == "post_clear" else pk_set)
+    else:
+        list_cache.bump_boards([instance.pk])
@@ -1,13 +1,45 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+from asgiref.sync import async_to_sync, sync_to_async
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
+from boards_app import list_cache
+from boards_app.api.async_views import AsyncBoardDetailView, AsyncBoardListView
+from boards_app.events import RESYNC, broker
 from boards_app.models import Board
+from core import metrics
+from core.asgi import application
+from tasks_app.models import Task
 
 User = get_user_model()
 
 
+def async_get(token, path, data=None, headers=None):
+    """GET through the ASGI request path (AsyncClient) from a sync test."""
+    headers = dict(headers or {})
+    if token:
+        headers["Authorization"] = "Token " + token
+    return async_to_sync(AsyncClient().get)(path, data, headers=headers)
+
+
 class BoardTests(APITestCase):
     def setUp(self):
         # users
@@ -107,6 +139,70 @@ class BoardTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_board_detail_query_count_is_constant(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Token " + self.member_token.key
+        )
+        self.client.get(self.board_detail_url)  # warms token and membership caches
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.board_detail_url)
+
+        for i in range(20):
+            task = Task.objects.create(
+                board=self.board,
+                title=f"Task {i}",
+                status="to-do",
+                priority="low",
+                assignee=self.member if i % 2 else self.owner,
+                reviewer=self.owner,
+                created_by=self.owner,
+            )
+            task.comments.create(author=self.member, content="comment")
+
+        # board, members, tasks + users + comment counts
+        with self.assertNumQueries(3):
+            response = self.client.get(self.board_detail_url)
+
+        self.assertEqual(len(small), 3)
+        self.assertEqual(len(response.data["tasks"]), 20)
+        self.assertEqual(response.data["tasks"][0]["comments_count"], 1)
+        self.assertEqual(response.data["tasks"][0]["assignee"]["id"], self.owner.id)
+
+    def test_board_detail_access_follows_membership_changes(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Token " + self.other_token.key
+        )
+        self.assertEqual(self.client.get(self.board_detail_url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.board.members.add(self.other_user)
+        self.assertEqual(self.client.get(self.board_detail_url).status_code, status.HTTP_200_OK)
+
+        self.other_user.boards.remove(self.board)
+        self.assertEqual(self.client.get(self.board_detail_url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.board.owner = self.other_user
+        self.board.save()
+        self.assertEqual(self.client.get(self.board_detail_url).status_code, status.HTTP_200_OK)
+
+    def test_board_detail_conditional_get(self):
+        task = Task.objects.create(
+            board=self.board, title="A", status="to-do", priority="low", created_by=self.owner
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Token " + self.member_token.key
+        )
+        etag = self.client.get(self.board_detail_url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.board_detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        task.comments.create(author=self.member, content="changes the board")
+        response = self.client.get(self.board_detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
     def test_board_detail_forbidden(self):
         self.client.credentials(
             HTTP_AUTHORIZATION="Token " + self.other_token.key
@@ -154,5 +250,704 @@ class BoardTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    # --------------------
+    # COUNTERS
+    # --------------------
+    def test_board_list_counters(self):
+        Task.objects.create(
+            board=self.board, title="A", status="to-do", priority="high", created_by=self.owner
+        )
+        Task.objects.create(
+            board=self.board, title="B", status="done", priority="low", created_by=self.owner
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Token " + self.owner_token.key
+        )
+
+        response = self.client.get(self.boards_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data[0],
+            {
+                "id": self.board.id,
+                "title": "Test Board",
+                "member_count": 1,
+                "ticket_count": 2,
+                "tasks_to_do_count": 1,
+                "tasks_high_prio_count": 1,
+                "owner_id": self.owner.id,
+            },
+        )
+
+    def test_counters_follow_task_and_member_writes(self):
+        task = Task.objects.create(
+            board=self.board, title="A", status="to-do", priority="high", created_by=self.owner
+        )
+        task.status = "done"
+        task.save()
+        self.board.members.add(self.other_user)
+        self.board.members.remove(self.member)
+        self.other_user.boards.clear()
+
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.ticket_count, 1)
+        self.assertEqual(self.board.tasks_to_do_count, 0)
+        self.assertEqual(self.board.tasks_high_prio_count, 1)
+        self.assertEqual(self.board.member_count, 0)
+
+        Task.objects.filter(board=self.board).delete()
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.ticket_count, 0)
+        self.assertEqual(self.board.tasks_high_prio_count, 0)
+
+    def test_rebuild_board_counters_command(self):
+        Board.objects.filter(id=self.board.id).update(member_count=7, ticket_count=3)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_board_counters", "--verify", stdout=StringIO())
+
+        call_command("rebuild_board_counters", stdout=StringIO())
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.member_count, 1)
+        self.assertEqual(self.board.ticket_count, 0)
+        call_command("rebuild_board_counters", "--verify", stdout=StringIO())
+
+
+    # --------------------
+    # ASYNC READS (ASGI)
+    # --------------------
+    def test_async_board_reads_match_sync_views(self):
+        task = Task.objects.create(
+            board=self.board, title="A", status="to-do", priority="low", assignee=self.member, created_by=self.owner
+        )
+        task.comments.create(author=self.member, content="hi")
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+        sync_list = self.client.get(self.boards_url)
+        sync_detail = self.client.get(self.board_detail_url)
+        aget = lambda *args, **kwargs: async_get(self.member_token.key, *args, **kwargs)
+
+        response = aget(self.boards_url)
+        self.assertIs(response.resolver_match.func.view_class, AsyncBoardListView)
+        self.assertEqual(response.json(), sync_list.json())
+
+        response = aget(self.board_detail_url)
+        self.assertIs(response.resolver_match.func.view_class, AsyncBoardDetailView)
+        self.assertEqual(response.json(), sync_detail.json())
+        self.assertEqual(response["ETag"], sync_detail["ETag"])
+        self.assertEqual(aget(self.board_detail_url, headers={"If-None-Match": response["ETag"]}).status_code, 304)
+
+        # paginated requests are handed to the DRF view
+        self.assertEqual(aget(self.boards_url, {"page_size": 1}).json()["results"], sync_list.json())
+
+    def test_async_board_detail_errors(self):
+        aget = lambda *args, **kwargs: async_get(self.other_token.key, *args, **kwargs)
+
+        self.assertEqual(aget(self.board_detail_url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(aget("/api/boards/999999/").status_code, status.HTTP_404_NOT_FOUND)
+        response = async_get(None, self.board_detail_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response["WWW-Authenticate"], "Token")
+
+    # --------------------
+    # STREAMED BOARD DETAIL
+    # --------------------
+    @staticmethod
+    async def read_stream(response):
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    def test_big_board_detail_is_streamed_with_the_same_json(self):
+        for number in range(5):
+            task = Task.objects.create(
+                board=self.board, title=f"T{number}\u2028", status="to-do", priority="low",
+                assignee=self.member if number % 2 else None, due_date="2026-03-01", created_by=self.owner,
+            )
+        task.comments.create(author=self.member, content="hi")
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+        expected = self.client.get(self.board_detail_url)
+        self.assertFalse(expected.streaming)
+
+        with override_settings(JSON_STREAMING_MIN_ROWS=5, JSON_STREAMING_CHUNK_SIZE=2):
+            response = self.client.get(self.board_detail_url)
+            async_response = async_get(self.member_token.key, self.board_detail_url)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(b"".join(response.streaming_content), expected.content)
+        self.assertEqual(response["ETag"], expected["ETag"])
+        self.assertEqual(async_to_sync(self.read_stream)(async_response), expected.content)
+        self.assertEqual(json.loads(expected.content)["tasks"][0]["title"], "T0\u2028")
+
+    # --------------------
+    # GET /api/boards/{id}/export/
+    # --------------------
+    def export(self, token, **params):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + token.key)
+        return self.client.get(f"{self.board_detail_url}export/", params)
+
+    def test_export_ndjson(self):
+        task = Task.objects.create(
+            board=self.board, title="A", status="to-do", priority="low", due_date="2026-03-01", created_by=self.owner
+        )
+        comment = task.comments.create(author=self.member, content="hi")
+
+        with override_settings(EXPORT_BUFFER_BYTES=1):
+            response = self.export(self.member_token)
+            chunks = list(response.streaming_content)
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        self.assertEqual(response["Content-Disposition"], f'attachment; filename="board-{self.board.id}.ndjson"')
+        records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        self.assertEqual(len(chunks), len(records))
+        self.assertEqual([record["type"] for record in records], ["board", "member", "task", "comment"])
+        self.assertEqual(records[0]["version"], Board.objects.get(pk=self.board.pk).version)
+        self.assertEqual(records[2]["due_date"], "2026-03-01")
+        self.assertEqual(records[2]["comments_count"], 1)
+        self.assertEqual(records[3]["id"], comment.id)
+        comments = self.client.get(f"/api/tasks/{task.id}/comments/").data
+        self.assertEqual(records[3]["created_at"], comments[0]["created_at"])
+
+    def test_export_csv_and_gzip(self):
+        Task.objects.create(board=self.board, title="Comma, \"quote\"", status="done", priority="high",
+                            created_by=self.owner)
+
+        plain = b"".join(self.export(self.owner_token, format="csv").streaming_content)
+        response = self.export(self.owner_token, format="csv", compress="gzip")
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), plain)
+        rows = list(csv.DictReader(io.StringIO(plain.decode())))
+        self.assertEqual([row["type"] for row in rows], ["board", "member", "task"])
+        self.assertEqual(rows[2]["title"], 'Comma, "quote"')
+        self.assertEqual(rows[2]["assignee_id"], "")
+        self.assertEqual(rows[1]["email"], "member@test.com")
+
+    def test_export_is_streamed_asynchronously_under_asgi(self):
+        Task.objects.create(board=self.board, title="A", status="to-do", priority="low", created_by=self.owner)
+
+        expected = b"".join(self.export(self.member_token, format="csv", compress="gzip").streaming_content)
+        with override_settings(EXPORT_BUFFER_BYTES=1):
+            response = async_get(self.member_token.key, f"{self.board_detail_url}export/",
+                                 {"format": "csv", "compress": "gzip"})
+            content = async_to_sync(self.read_stream)(response)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        self.assertEqual(gzip.decompress(content), gzip.decompress(expected))
+
+    def test_export_errors(self):
+        self.assertEqual(self.export(self.other_token).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.export(self.owner_token, compress="zip").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.export(self.owner_token, format="xml").status_code, status.HTTP_404_NOT_FOUND)
+
+    # --------------------
+    # POST /api/boards/import/
+    # --------------------
+    def import_file(self, token, content, name="board.ndjson", **data):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + token.key)
+        upload = SimpleUploadedFile(name, content)
+        return self.client.post("/api/boards/import/", {"file": upload, **data}, format="multipart")
+
+    def test_import_round_trip_of_an_export(self):
+        task = Task.objects.create(
+            board=self.board, title="Login bug", status="review", priority="high", assignee=self.member,
+            reviewer=self.owner, due_date="2026-03-01", created_by=self.member,
+        )
+        task.comments.create(author=self.member, content="Reproduced")
+        task.comments.create(author=self.owner, content="Fixed")
+        Task.objects.create(board=self.board, title="Docs", status="to-do", priority="low", created_by=self.owner)
+
+        for export_format, compress in (("ndjson", None), ("csv", "gzip")):
+            params = {"format": export_format, **({"compress": compress} if compress else {})}
+            exported = b"".join(self.export(self.owner_token, **params).streaming_content)
+            name = f"board.{export_format}" + (".gz" if compress else "")
+            response = self.import_file(self.owner_token, exported, name=name)
+
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+            self.assertEqual(response.data["created"], {"boards": 1, "members": 1, "tasks": 2, "comments": 2})
+            self.assertEqual(response.data["errors"], [])
+            board = Board.objects.get(pk=response.data["boards"][0]["id"])
+            self.assertEqual((board.title, board.owner_id), ("Test Board", self.owner.id))
+            self.assertEqual(list(board.members.all()), [self.member])
+            self.assertFalse(Board.objects.filter(pk=board.pk).out_of_sync().exists())
+            self.assertFalse(Task.objects.filter(board=board).comments_out_of_sync().exists())
+            copy = Task.objects.get(board=board, title="Login bug")
+            self.assertEqual(
+                (copy.status, copy.priority, copy.assignee_id, copy.reviewer_id, str(copy.due_date), copy.created_by_id),
+                ("review", "high", self.member.id, self.owner.id, "2026-03-01", self.member.id),
+            )
+            self.assertEqual(
+                list(copy.comments.values_list("author_id", "content", "created_at")),
+                list(task.comments.values_list("author_id", "content", "created_at")),
+            )
+            # the new board is visible to its members and searchable
+            self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+            self.assertEqual(self.client.get(f"/api/boards/{board.id}/").status_code, status.HTTP_200_OK)
+            found = self.client.get("/api/tasks/search/", {"q": "login"}).data
+            self.assertIn(copy.id, [item["id"] for item in found])
+
+    def test_import_reports_row_errors_and_keeps_valid_rows(self):
+        lines = [
+            {"type": "board", "title": "Imported", "owner_id": 90},
+            {"type": "member", "id": 91, "email": "member@test.com"},
+            {"type": "member", "id": 92, "email": "nobody@test.com"},
+            {"type": "task", "id": 1, "title": "Ok", "status": "to-do", "priority": "high", "assignee_id": 91,
+             "reviewer_id": 90, "due_date": "2026-01-31"},
+            {"type": "task", "id": 2, "title": "", "status": "later", "priority": "low", "due_date": "31.01.2026"},
+            {"type": "task", "id": 3, "title": "Outsider", "status": "done", "priority": "low",
+             "assignee_email": "owner@test.com", "reviewer_id": 92},
+            {"type": "comment", "task_id": 1, "author_id": 91, "content": "A", "created_at": "2025-05-01T10:00:00Z"},
+            {"type": "comment", "task_id": 2, "content": "B"},
+            {"type": "comment", "task_id": 1, "content": "C"},
+            {"type": "column", "title": "?"},
+        ]
+        content = b"\n".join(json.dumps(line).encode() for line in lines) + b"\n{broken\n\n[1]\n"
+
+        with override_settings(IMPORT_CHUNK_SIZE=2, IMPORT_MAX_ERRORS=6):
+            response = self.import_file(self.other_token, content, format="ndjson", name="upload.txt")
 
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], {"boards": 1, "members": 1, "tasks": 1, "comments": 2})
+        self.assertEqual(response.data["error_count"], 7)
+        errors = {error["line"]: error for error in response.data["errors"]}
+        self.assertEqual(sorted(errors), [3, 5, 6, 8, 10, 11])
+        self.assertEqual(errors[3]["errors"], {"email": ["User does not exist."]})
+        self.assertEqual(errors[5]["type"], "task")
+        self.assertEqual(set(errors[5]["errors"]), {"title", "status", "due_date"})
+        self.assertEqual(errors[6]["errors"], {
+            "assignee_email": ["Assignee/Reviewer must be member of the board."],
+            "reviewer_id": ["User does not exist."],
+        })
+        self.assertEqual(errors[8]["errors"], {"task_id": ["No imported task with this id."]})
+        self.assertEqual(errors[11]["errors"], {"non_field_errors": ["Invalid JSON."]})
+
+        board = Board.objects.get(pk=response.data["boards"][0]["id"])
+        self.assertEqual((board.owner_id, board.member_count, board.ticket_count), (self.other_user.id, 1, 1))
+        self.assertEqual(board.tasks_high_prio_count, 1)
+        task = board.tasks.get()
+        self.assertEqual((task.assignee_id, task.reviewer_id, task.created_by_id, task.comments_count),
+                         (self.member.id, self.other_user.id, self.other_user.id, 2))
+        first, second = task.comments.order_by("pk")
+        self.assertEqual((first.author_id, first.created_at.isoformat()), (self.member.id, "2025-05-01T10:00:00+00:00"))
+        self.assertEqual(second.author_id, self.other_user.id)
+        self.assertEqual(board.log_floor, board.version)
+
+    def test_import_truncated_gzip_keeps_the_rows_before(self):
+        Task.objects.bulk_create([
+            Task(board=self.board, title=f"T{i}", status="to-do", priority="low", created_by=self.owner)
+            for i in range(200)
+        ])
+        exported = b"".join(self.export(self.owner_token, compress="gzip").streaming_content)
+
+        with override_settings(IMPORT_CHUNK_SIZE=50):
+            response = self.import_file(self.owner_token, exported[:len(exported) // 2], name="board.ndjson.gz")
 
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["error_count"], 1)
+        self.assertIn("file", response.data["errors"][0]["errors"])
+        board = Board.objects.get(pk=response.data["boards"][0]["id"])
+        self.assertGreater(board.ticket_count, 0)
+        self.assertEqual(board.ticket_count, board.tasks.count())
+
+    def test_import_errors(self):
+        self.client.credentials()
+        response = self.client.post("/api/boards/import/", {}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.owner_token.key)
+        response = self.client.post("/api/boards/import/", {}, format="multipart")
+        self.assertEqual(response.data, {"file": ["No file was submitted."]})
+        response = self.import_file(self.owner_token, b"", name="board.xlsx")
+        self.assertIn("format", response.data)
+        response = self.import_file(self.owner_token, b'{"type": "task", "title": "x"}\n')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["errors"][0]["errors"], {
+            "non_field_errors": ["No imported board record before this row."]
+        })
+        self.assertEqual(Board.objects.count(), 1)
+
+    def test_import_boards_command(self):
+        lines = b'{"type": "board", "title": "From file"}\n{"type": "task", "title": "A", "status": "done", ' \
+            b'"priority": "low"}\n{"type": "task", "title": "B"}\n'
+        with tempfile.NamedTemporaryFile(suffix=".ndjson") as file:
+            file.write(lines)
+            file.flush()
+            out, err = StringIO(), StringIO()
+            with self.assertRaisesMessage(CommandError, "1 row(s) were not imported."):
+                call_command("import_boards", file.name, owner="member@test.com", stdout=out, stderr=err)
+            with self.assertRaisesMessage(CommandError, "No user with email nobody@test.com."):
+                call_command("import_boards", file.name, owner="nobody@test.com", stdout=out)
+
+        self.assertIn("Created 1 boards, 0 members, 1 tasks, 0 comments", out.getvalue())
+        self.assertIn("line 3 (task)", err.getvalue())
+        self.assertEqual(Board.objects.get(title="From file").owner, self.member)
+
+    # --------------------
+    # GET /api/boards/{id}/changes/
+    # --------------------
+    def test_board_changes_since_version(self):
+        kept = Task.objects.create(
+            board=self.board, title="A", status="to-do", priority="low", created_by=self.owner
+        )
+        gone = Task.objects.create(
+            board=self.board, title="B", status="to-do", priority="low", created_by=self.owner
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Token " + self.member_token.key
+        )
+        since = int(self.client.get(self.board_detail_url)["X-Board-Version"])
+
+        kept.title = "A2"
+        kept.save()
+        comment = kept.comments.create(author=self.member, content="hi")
+        gone_id = gone.id
+        gone.delete()
+        self.board.members.add(self.other_user)
+        self.board.members.remove(self.member)
+        self.board.members.add(self.member)
+
+        response = self.client.get(f"{self.board_detail_url}changes/", {"since": since})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.board.refresh_from_db()
+        self.assertEqual(response.data["version"], self.board.version)
+        self.assertIsNone(response.data["board"])
+        self.assertEqual([t["title"] for t in response.data["tasks"]], ["A2"])
+        self.assertEqual(response.data["tasks"][0]["comments_count"], 1)
+        self.assertEqual(response.data["deleted_tasks"], [gone_id])
+        self.assertEqual([(c["task"], c["id"]) for c in response.data["comments"]], [(kept.id, comment.id)])
+        self.assertEqual(
+            sorted(m["id"] for m in response.data["members"]), sorted([self.member.id, self.other_user.id])
+        )
+        self.assertEqual(response.data["removed_members"], [])
+
+        response = self.client.get(f"{self.board_detail_url}changes/", {"since": self.board.version})
+        self.assertEqual(response.data["tasks"], [])
+        self.assertEqual(response.data["deleted_tasks"], [])
+
+    def test_board_changes_validation_and_access(self):
+        url = f"{self.board_detail_url}changes/"
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Token " + self.owner_token.key
+        )
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {"since": "x"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Token " + self.other_token.key
+        )
+        self.assertEqual(self.client.get(url, {"since": 0}).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_compact_board_changes_command(self):
+        task = Task.objects.create(
+            board=self.board, title="A", status="to-do", priority="low", created_by=self.owner
+        )
+        since = Board.objects.get(pk=self.board.pk).version
+        for title in ("B", "C", "D"):
+            task.title = title
+            task.save()
+        self.assertEqual(self.board.change_log.filter(kind="task").count(), 4)
+
+        call_command("compact_board_changes", stdout=StringIO())
+        self.assertEqual(self.board.change_log.filter(kind="task").count(), 1)
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Token " + self.owner_token.key
+        )
+        url = f"{self.board_detail_url}changes/"
+        response = self.client.get(url, {"since": since})
+        self.assertEqual([t["title"] for t in response.data["tasks"]], ["D"])
+
+        call_command("compact_board_changes", "--older-than-days", "0", stdout=StringIO())
+        self.assertFalse(self.board.change_log.exists())
+        response = self.client.get(url, {"since": since})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.board.refresh_from_db()
+        self.assertEqual(response.data["version"], self.board.version)
+        self.assertEqual(self.client.get(url, {"since": self.board.version}).status_code, status.HTTP_200_OK)
+
+
+class BoardListCacheTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email="owner@test.com", fullname="Owner", password="OwnerPass123!")
+        self.member = User.objects.create_user(email="member@test.com", fullname="Member", password="MemberPass123!")
+        self.owner_token = Token.objects.create(user=self.owner)
+        self.member_token = Token.objects.create(user=self.member)
+        self.board = Board.objects.create(title="Test Board", owner=self.owner)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.owner_token.key)
+
+    def listed(self, token=None):
+        if token is not None:
+            self.client.credentials(HTTP_AUTHORIZATION="Token " + token.key)
+        response = self.client.get("/api/boards/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {board["id"]: board for board in response.json()}
+
+    def assert_listed_without_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            boards = self.listed()
+        self.assertEqual(len(queries), 0, [q["sql"] for q in queries])
+        return boards
+
+    # --------------------
+    # hits and invalidation
+    # --------------------
+    def test_repeated_list_is_served_from_cache(self):
+        first = self.listed()
+        self.assertEqual(self.assert_listed_without_queries(), first)
+
+        paginated = self.client.get("/api/boards/", {"page_size": 10})
+        self.assertEqual(paginated.json()["results"], list(first.values()))
+
+    def test_task_writes_invalidate_the_list(self):
+        self.listed()
+        task = Task.objects.create(
+            board=self.board, title="A", status="to-do", priority="high", created_by=self.owner
+        )
+        board = self.listed()[self.board.id]
+        self.assertEqual((board["ticket_count"], board["tasks_to_do_count"], board["tasks_high_prio_count"]), (1, 1, 1))
+
+        task.status, task.priority = "done", "low"
+        task.save()
+        board = self.listed()[self.board.id]
+        self.assertEqual((board["tasks_to_do_count"], board["tasks_high_prio_count"]), (0, 0))
+
+        task.delete()
+        self.assertEqual(self.listed()[self.board.id]["ticket_count"], 0)
+        self.assert_listed_without_queries()
+
+    def test_board_and_membership_changes_invalidate_the_list(self):
+        self.assertEqual(self.listed(self.member_token), {})
+        self.listed(self.owner_token)
+
+        self.board.members.add(self.member)
+        self.assertEqual(self.listed(self.owner_token)[self.board.id]["member_count"], 1)
+        self.assertEqual(list(self.listed(self.member_token)), [self.board.id])
+
+        self.board.title = "Renamed"
+        self.board.save()
+        self.assertEqual(self.listed(self.owner_token)[self.board.id]["title"], "Renamed")
+
+        self.member.boards.remove(self.board)
+        self.assertEqual(self.listed(self.owner_token)[self.board.id]["member_count"], 0)
+        self.assertEqual(self.listed(self.member_token), {})
+
+        other = Board.objects.create(title="Other", owner=self.member)
+        self.assertEqual(list(self.listed(self.owner_token)), [self.board.id])
+        self.assertEqual(list(self.listed(self.member_token)), [other.id])
+
+    def test_rebuilt_counters_invalidate_the_list(self):
+        Board.objects.filter(id=self.board.id).update(ticket_count=3)
+        self.assertEqual(self.listed()[self.board.id]["ticket_count"], 3)
+
+        call_command("rebuild_board_counters", stdout=StringIO())
+        self.assertEqual(self.listed()[self.board.id]["ticket_count"], 0)
+
+    def test_async_list_uses_the_same_cache(self):
+        boards = self.listed()
+        response = async_get(self.owner_token.key, "/api/boards/")
+        self.assertEqual({board["id"]: board for board in response.json()}, boards)
+
+        Task.objects.create(board=self.board, title="A", status="to-do", priority="low", created_by=self.owner)
+        response = async_get(self.owner_token.key, "/api/boards/")
+        self.assertEqual(response.json()[0]["ticket_count"], 1)
+
+    def test_file_based_cache(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "board-lists": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": directory},
+            },
+            BOARD_LIST_CACHE_ALIAS="board-lists",
+        ):
+            first = self.listed()
+            self.assertEqual(self.listed(), first)
+            self.assertTrue(os.listdir(directory))
+
+            Task.objects.create(board=self.board, title="A", status="to-do", priority="low", created_by=self.owner)
+            self.assertEqual(self.listed()[self.board.id]["ticket_count"], 1)
+
+    # --------------------
+    # single flight
+    # --------------------
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        start = threading.Barrier(5)
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return [{"id": self.board.id}]
+        def request():
+            start.wait()
+            return list_cache.cached_board_list(self.owner.pk, [self.board.id], compute)
+
+        waits = metrics.get(list_cache.WAIT)
+        with ThreadPoolExecutor(5) as pool:
+            results = list(pool.map(lambda _: request(), range(5)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[{"id": self.board.id}]] * 5)
+        self.assertEqual(metrics.get(list_cache.WAIT) - waits, 4)
+
+    @override_settings(BOARD_LIST_CACHE_LOCK_TIMEOUT=0.05)
+    def test_waiting_ends_after_lock_timeout(self):
+        generation = list_cache._generations(list_cache._cache(), [list_cache.user_key(self.owner.pk)])
+        key = list_cache._entry_key(self.owner.pk, generation[list_cache.user_key(self.owner.pk)])
+        list_cache._cache().add(key + ":lock", True, 10)  # a request that never finishes
+        self.assertEqual(list_cache.cached_board_list(self.owner.pk, [], lambda: []), [])
+
+    def test_hit_ratio_metric(self):
+        self.listed()
+        self.listed()
+        staff = User.objects.create_user(email="staff@test.com", fullname="Staff", password="StaffPass123!", is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + Token.objects.create(user=staff).key)
+        ratio = self.client.get("/api/metrics/").json()["boards.list_cache.hit_ratio"]
+        self.assertGreater(ratio, 0)
+        self.assertLessEqual(ratio, 1)
+
+
+class EventStreamClient:
+    """Holds one open GET request against the ASGI application."""
+    def __init__(self, path, token):
+        self.path = path
+        self.token = token
+        self.messages = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        self.request_sent = False
+        self.buffer = ""
+    async def receive(self):
+        if not self.request_sent:
+            self.request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+    async def send(self, message):
+        await self.messages.put(message)
+    def open(self):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": self.path,
+            "raw_path": self.path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Token {self.token}".encode()),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        self.task = asyncio.create_task(application(scope, self.receive, self.send))
+    async def read_event(self):
+        while "\n\n" not in self.buffer:
+            message = await asyncio.wait_for(self.messages.get(), timeout=30)
+            if message["type"] == "http.response.start":
+                self.status = message["status"]
+            else:
+                self.buffer += message.get("body", b"").decode()
+        frame, self.buffer = self.buffer.split("\n\n", 1)
+        data = [line[len("data: "):] for line in frame.splitlines() if line.startswith("data: ")]
+        return json.loads(data[0])
+    async def ended(self):
+        """Waits for the server to finish the response."""
+        while True:
+            message = await asyncio.wait_for(self.messages.get(), timeout=30)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                return True
+    async def close(self):
+        self.disconnected.set()
+        await asyncio.wait_for(self.task, timeout=30)
+
+
+class BoardEventStreamTests(TestCase):
+    # the harness also passes with a few thousand streams, 200 keeps the suite fast
+    SUBSCRIBERS = 200
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email="owner@test.com",
+            fullname="Owner",
+            password="OwnerPass123!",
+        )
+        self.token = Token.objects.create(user=self.owner)
+        self.board = Board.objects.create(title="Live", owner=self.owner)
+        self.events_url = f"/api/boards/{self.board.id}/events/"
+
+    async def test_many_subscribers_receive_committed_changes(self):
+        clients = [EventStreamClient(self.events_url, self.token.key) for _ in range(self.SUBSCRIBERS)]
+        for client in clients:
+            client.open()
+        for client in clients:
+            self.assertEqual((await client.read_event())["type"], "ready")
+        self.assertEqual(broker.subscriber_count(self.board.id), self.SUBSCRIBERS)
+
+        def write():
+            with self.captureOnCommitCallbacks(execute=True):
+                return Task.objects.create(
+                    board=self.board, title="Live", status="to-do", priority="low", created_by=self.owner
+                )
+        task = await sync_to_async(write)()
+
+        for client in clients:
+            event = await client.read_event()
+            self.assertEqual(
+                event,
+                {
+                    "type": "task",
+                    "action": "upsert",
+                    "board": self.board.id,
+                    "id": task.id,
+                    "version": event["version"],
+                },
+            )
+            self.assertEqual(client.status, 200)
+        await asyncio.gather(*(client.close() for client in clients))
+        self.assertEqual(broker.subscriber_count(self.board.id), 0)
+
+    @override_settings(BOARD_EVENTS_QUEUE_SIZE=2)
+    async def test_slow_subscriber_is_dropped_with_resync(self):
+        subscription = broker.subscribe(self.board.id)
+        for i in range(5):
+            broker.publish(self.board.id, {"type": "task", "id": i})
+        await asyncio.sleep(0)
+
+        self.assertEqual(await subscription.get(timeout=1), RESYNC)
+        self.assertEqual(broker.subscriber_count(self.board.id), 0)
+
+    async def test_stream_ends_when_the_member_is_removed(self):
+        member = await sync_to_async(User.objects.create_user)(
+            email="member@test.com", fullname="Member", password="MemberPass123!"
+        )
+        token = await Token.objects.acreate(user=member)
+        await sync_to_async(self.board.members.add)(member)
+        client = EventStreamClient(self.events_url, token.key)
+        client.open()
+        self.assertEqual((await client.read_event())["type"], "ready")
+
+        def remove():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.board.members.remove(member)
+        await sync_to_async(remove)()
+
+        self.assertTrue(await client.ended())
+        await client.close()
+        self.assertEqual(broker.subscriber_count(self.board.id), 0)
+
+    @override_settings(BOARD_EVENTS_HEARTBEAT=0.05)
+    async def test_stream_ends_when_the_token_is_deleted(self):
+        client = EventStreamClient(self.events_url, self.token.key)
+        client.open()
+        self.assertEqual((await client.read_event())["type"], "ready")
+
+        def delete_token():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.token.delete()
+        await sync_to_async(delete_token)()
+
+        self.assertTrue(await client.ended())
+        await client.close()
+
+    def test_event_stream_requires_asgi(self):
+        response = self.client.get(self.events_url, HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.assertEqual(response.status_code, 501)
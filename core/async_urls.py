@@ -0,0 +1,20 @@
+"""
+URLconf for GET/HEAD requests under ASGI (see core.middleware).
+
+The read endpoints below are served by async views; every other route,
+and the other methods of these routes, behave exactly as in core.urls.
+"""
+from django.urls import path
+
+from boards_app.api.async_views import AsyncBoardDetailView, AsyncBoardListView
+from tasks_app.api.async_views import AsyncAssignedToMeView, AsyncReviewingView, AsyncTaskCommentListView
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("api/boards/", AsyncBoardListView.as_view(), name="boards-list"),
+    path("api/boards/<int:pk>/", AsyncBoardDetailView.as_view(), name="boards-detail"),
+    path("api/tasks/assigned-to-me/", AsyncAssignedToMeView.as_view(), name="tasks-assigned-to-me"),
+    path("api/tasks/reviewing/", AsyncReviewingView.as_view(), name="tasks-reviewing"),
+    path("api/tasks/<int:task_id>/comments/", AsyncTaskCommentListView.as_view(), name="task-comments"),
+    *sync_urlpatterns,
+]
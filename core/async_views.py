@@ -0,0 +1,93 @@
+"""
+Minimal async counterparts of DRF's APIView.
+
+DRF views are synchronous. AsyncAPIView is a plain Django View with async
+handlers that keeps the DRF request parsing, authentication, exception
+handling and JSON responses, so an async endpoint looks the same to
+clients as its sync predecessor:
+
+    class LoginView(AsyncAPIView):
+        async def post(self, request):
+            data = self.get_data(request)
+            ...
+            return Response({...})
+
+AsyncReadView serves GET of an existing DRF route with the async ORM and
+hands everything else to that route's DRF view (see core.async_urls).
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from core.renderers import FastJSONRenderer
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncAPIView(View):
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    renderer_class = FastJSONRenderer
+    # authenticators must provide `async aauthenticate(request)`
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    requires_authentication = False
+    def get_data(self, request):
+        """Request body parsed like request.data in DRF views."""
+        return Request(request, parsers=[parser() for parser in self.parser_classes]).data
+    async def authenticate(self, request):
+        """Sets request.user / request.auth like DRF, or raises NotAuthenticated."""
+        for authenticator in self.get_authenticators():
+            result = await authenticator.aauthenticate(request)
+            if result is not None:
+                request.user, request.auth = result
+                return
+        raise exceptions.NotAuthenticated()
+    def get_authenticators(self):
+        return [auth() for auth in self.authentication_classes]
+    async def dispatch(self, request, *args, **kwargs):
+        request.accepted_renderer = self.renderer_class()
+        try:
+            if self.requires_authentication:
+                await self.authenticate(request)
+            response = await super().dispatch(request, *args, **kwargs)
+        except (exceptions.APIException, Http404) as exc:
+            response = self.handle_exception(request, exc)
+        return self.finalize(response)
+    def handle_exception(self, request, exc):
+        response = exception_handler(exc, {"view": self, "request": request})
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticators = self.get_authenticators()
+            header = authenticators[0].authenticate_header(request) if authenticators else None
+            if header:
+                response["WWW-Authenticate"] = header
+            else:
+                response.status_code = exceptions.PermissionDenied.status_code
+        return response
+    def finalize(self, response):
+        """Gives DRF Responses the renderer the APIView content negotiation would pick."""
+        if getattr(response, "accepted_renderer", None) is None and hasattr(response, "data"):
+            renderer = self.renderer_class()
+            response.accepted_renderer = renderer
+            response.accepted_media_type = renderer.media_type
+            response.renderer_context = {"view": self, "response": response}
+        return response
+
+
+class AsyncReadView(AsyncAPIView):
+    """
+    Async GET for a route that is otherwise served by `sync_view` (the DRF
+    view of the same URL). Other methods and paginated requests are
+    passed on to `sync_view` in a worker thread.
+    """
+    sync_view = None
+    requires_authentication = True
+    fallback_params = ("cursor", "page_size")
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or any(p in request.GET for p in self.fallback_params):
+            # looked up on the class, so the view function is not bound to self
+            return await sync_to_async(type(self).sync_view)(request, *args, **kwargs)
+        return await super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,599 @@
+"""
+Endpoint benchmark and query budgets (python manage.py benchmark_api).
+
+seed_dataset() generates users, boards, memberships, tasks and comments
+with core.seeding. run_workload() sends every request
+of ENDPOINTS through the test client and records p50/p95 latency and the
+number of SQL queries per endpoint. check_budgets() compares the results
+with the stored baseline (benchmark_baseline.json):
+
+    {
+        "queries": {"GET boards-detail": 3, ...},
+        "latency": {"small": {"GET boards-detail": {"p50_ms": 4.1, "p95_ms": 6.0}, ...}}
+    }
+
+Query budgets do not depend on the dataset size (that is the point of
+them); latency budgets are stored per scale.
+
+run_wsgi_load() / run_asgi_load() drive the read endpoints through the
+WSGI and ASGI applications with many concurrent clients
+(python manage.py benchmark_servers).
+
+run_reader_comparison() measures rows per second of the list serializers
+against their core.readers.ValuesReader (python manage.py benchmark_readers).
+
+run_render_comparison() renders the detail of one big board with DRF's
+JSONRenderer, core.renderers.FastJSONRenderer and as a stream, recording
+throughput and peak memory (python manage.py benchmark_json).
+"""
+import asyncio
+import io
+import json
+import math
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from boards_app.models import Board
+from core import seeding
+from core.seeding import Range, SeedPlan
+from tasks_app.models import Comment, Task
+
+User = get_user_model()
+
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+BENCH_PASSWORD = "Bench-Pass-123!"
+
+SCALES = {
+    "tiny": SeedPlan(30, 6, Range(2, 5), Range(5, 15), 2.0, 0.5, seed=0),
+    "small": SeedPlan(500, 200, Range(3, 12), Range(20, 80), 2.0, 0.5, seed=0),
+    "medium": SeedPlan(2000, 1000, Range(5, 15), Range(50, 150), 2.0, 0.5, seed=0),
+    # ~1M tasks and ~2M comments
+    "production": SeedPlan(10000, 5000, Range(5, 15), Range(100, 300), 2.0, 0.5, seed=0),
+}
+
+# routes that cannot be measured with a request/response round trip
+UNMEASURED = {
+    "api-root": "router index",
+    "board-events": "server-sent event stream, ASGI only",
+}
+
+PRIORITIES = [priority for priority, _ in Task.PRIORITY_CHOICES]
+STATUSES = [status for status, _ in Task.STATUS_CHOICES]
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+# --------------------
+# dataset
+# --------------------
+class Dataset:
+    """Objects the workload refers to; `user` owns `board` and is a member of a few more."""
+    def __init__(self, user, token, staff_token, board, task, member):
+        self.user = user
+        self.token = token
+        self.staff_token = staff_token
+        self.board = board
+        self.task = task
+        self.member = member
+
+
+def seed_dataset(plan, seed=0):
+    """Seeds `plan` (see core.seeding) and picks the benchmark user and objects."""
+    result = seeding.seed(plan._replace(seed=seed), password=BENCH_PASSWORD)
+    board = Board.objects.select_related("owner").get(pk=result.board_ids[0])
+    user = board.owner
+    Membership = Board.members.through
+    joined = Board.objects.filter(pk__in=result.board_ids[1:10]).exclude(owner=user).exclude(members=user)
+    Membership.objects.bulk_create([
+        Membership(board_id=board_id, user_id=user.pk) for board_id in joined.values_list("pk", flat=True)
+    ])
+    Board.objects.filter(pk__in=result.board_ids[1:10]).refresh_counters(fields=["member_count"])
+    staff = User.objects.create(email="staff@kanmind.test", fullname="Staff", is_staff=True)
+    return Dataset(
+        user=user,
+        token=Token.objects.create(user=user).key,
+        staff_token=Token.objects.create(user=staff).key,
+        board=board,
+        task=Task.objects.filter(board=board).order_by("pk").first(),
+        member=board.members.order_by("pk").first(),
+    )
+
+
+# --------------------
+# workload
+# --------------------
+class Endpoint:
+    """
+    One measured request. `build(data, i)` returns (path, body) for the
+    i-th iteration and may create the objects the request consumes; it
+    runs outside the timed section.
+    """
+    def __init__(self, method, url_name, build, status=200, auth="user", label="", body_format="json"):
+        self.method = method
+        self.url_name = url_name
+        self.build = build
+        self.status = status
+        self.auth = auth
+        self.body_format = body_format
+        self.key = f"{method} {url_name}{label}"
+
+
+def _scratch_task(data, i):
+    return Task.objects.create(
+        board=data.board, title=f"Scratch {i}", status="to-do", priority="low", created_by=data.user
+    )
+
+
+def _move_body(data, i):
+    """Drops the task below a card of the next column, a different card each time."""
+    status = STATUSES[i % len(STATUSES)]
+    column = Task.objects.filter(board=data.board, status=status).exclude(pk=data.task.pk)
+    card_ids = list(column.in_column_order().values_list("pk", flat=True))
+    return {"status": status, "after": card_ids[i % len(card_ids)] if card_ids else None}
+
+
+def _import_file(data, i, tasks=100):
+    """A board with one member, `tasks` tasks and a comment on each, as an NDJSON upload."""
+    records = [{"type": "board", "title": f"Imported {i}"}, {"type": "member", "id": 1, "email": data.member.email}]
+    records += [
+        {"type": "task", "id": number, "title": f"Task {number}", "status": "to-do", "priority": "low",
+         "assignee_id": 1}
+        for number in range(tasks)
+    ]
+    records += [{"type": "comment", "task_id": number, "author_id": 1, "content": "Hi"} for number in range(tasks)]
+    content = b"\n".join(json.dumps(record).encode() for record in records)
+    return {"file": SimpleUploadedFile(f"import-{i}.ndjson", content)}
+
+
+ENDPOINTS = [
+    Endpoint("POST", "registration", lambda d, i: (reverse("registration"), {
+        "fullname": f"Registered {i}",
+        "email": f"registered{i}@kanmind.test",
+        "password": BENCH_PASSWORD,
+        "repeated_password": BENCH_PASSWORD,
+    }), status=201, auth=None),
+    Endpoint("POST", "login", lambda d, i: (
+        reverse("login"), {"email": d.user.email, "password": BENCH_PASSWORD}
+    ), auth=None),
+    Endpoint("GET", "email-check", lambda d, i: (reverse("email-check"), {"email": d.member.email})),
+    Endpoint("GET", "boards-list", lambda d, i: (reverse("boards-list"), None)),
+    Endpoint("GET", "boards-list", lambda d, i: (reverse("boards-list"), {"page_size": 50}), label=" paginated"),
+    Endpoint("POST", "boards-list", lambda d, i: (
+        reverse("boards-list"), {"title": f"New board {i}", "members": [d.member.pk]}
+    ), status=201),
+    Endpoint("GET", "boards-detail", lambda d, i: (reverse("boards-detail", args=[d.board.pk]), None)),
+    Endpoint("PATCH", "boards-detail", lambda d, i: (
+        reverse("boards-detail", args=[d.board.pk]), {"title": f"Board 0 ({i})"}
+    )),
+    Endpoint("DELETE", "boards-detail", lambda d, i: (
+        reverse("boards-detail", args=[Board.objects.create(title=f"Doomed {i}", owner=d.user).pk]), None
+    ), status=204),
+    Endpoint("GET", "boards-changes", lambda d, i: (
+        reverse("boards-changes", args=[d.board.pk]), {"since": d.board.log_floor}
+    )),
+    Endpoint("GET", "boards-export", lambda d, i: (reverse("boards-export", args=[d.board.pk]), None)),
+    Endpoint("GET", "boards-export", lambda d, i: (
+        reverse("boards-export", args=[d.board.pk]), {"format": "csv", "compress": "gzip"}
+    ), label=" csv gzip"),
+    Endpoint("POST", "boards-import", lambda d, i: (
+        reverse("boards-import"), _import_file(d, i)
+    ), status=201, body_format="multipart"),
+    Endpoint("GET", "tasks-list", lambda d, i: (reverse("tasks-list"), {"page_size": 50}), label=" paginated"),
+    Endpoint("POST", "tasks-list", lambda d, i: (reverse("tasks-list"), {
+        "board": d.board.pk,
+        "title": f"New task {i}",
+        "status": "to-do",
+        "priority": "medium",
+        "assignee_id": d.member.pk,
+    }), status=201),
+    Endpoint("GET", "tasks-detail", lambda d, i: (reverse("tasks-detail", args=[d.task.pk]), None)),
+    Endpoint("PATCH", "tasks-detail", lambda d, i: (
+        reverse("tasks-detail", args=[d.task.pk]), {"title": f"Task 0 ({i})"}
+    )),
+    Endpoint("DELETE", "tasks-detail", lambda d, i: (
+        reverse("tasks-detail", args=[_scratch_task(d, i).pk]), None
+    ), status=204),
+    Endpoint("POST", "tasks-move", lambda d, i: (reverse("tasks-move", args=[d.task.pk]), _move_body(d, i))),
+    Endpoint("POST", "tasks-bulk", lambda d, i: (reverse("tasks-bulk"), [
+        {"op": "update", "id": pk, "data": {"priority": PRIORITIES[i % len(PRIORITIES)]}}
+        for pk in Task.objects.filter(board=d.board).order_by("pk").values_list("pk", flat=True)[:20]
+    ])),
+    Endpoint("GET", "tasks-search", lambda d, i: (reverse("tasks-search"), {"q": "task 1"})),
+    Endpoint("GET", "tasks-assigned-to-me", lambda d, i: (reverse("tasks-assigned-to-me"), None)),
+    Endpoint("GET", "tasks-reviewing", lambda d, i: (reverse("tasks-reviewing"), None)),
+    Endpoint("GET", "task-comments", lambda d, i: (reverse("task-comments", args=[d.task.pk]), None)),
+    Endpoint("GET", "task-comments", lambda d, i: (
+        reverse("task-comments", args=[d.task.pk]), {"page_size": 50, "order": "newest"}
+    ), label=" newest"),
+    Endpoint("POST", "task-comments", lambda d, i: (
+        reverse("task-comments", args=[d.task.pk]), {"content": f"Comment {i}"}
+    ), status=201),
+    Endpoint("DELETE", "task-comment-delete", lambda d, i: (
+        reverse("task-comment-delete", args=[
+            d.task.pk, Comment.objects.create(task=d.task, author=d.user, content="Doomed").pk
+        ]), None
+    ), status=204),
+    Endpoint("GET", "dashboard", lambda d, i: (reverse("dashboard"), None)),
+    Endpoint("GET", "metrics", lambda d, i: (reverse("metrics"), None), auth="staff"),
+]
+
+
+def api_route_names(patterns=None, prefix=""):
+    """Names of all routes below api/ in the root urlconf."""
+    names = set()
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            names |= api_route_names(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern) and route.lstrip("^").startswith("api/") and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def uncovered_routes(endpoints=ENDPOINTS):
+    return sorted(api_route_names() - {e.url_name for e in endpoints} - set(UNMEASURED))
+
+
+def count_queries(captured):
+    """Savepoints depend on the surrounding transaction (tests vs. command), so they do not count."""
+    return sum(
+        1 for query in captured.captured_queries
+        if not query["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT"))
+    )
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def run_workload(data, endpoints=ENDPOINTS, repeat=20, warmup=1, on_queries=None):
+    """
+    Returns {endpoint key: {"queries", "p50_ms", "p95_ms"}}; `queries` is the
+    maximum seen. `on_queries(endpoint, captured_queries)` receives the SQL of
+    every request (see core.index_advisor).
+    """
+    client = APIClient()
+    tokens = {"user": data.token, "staff": data.staff_token}
+    results = {}
+    for endpoint in endpoints:
+        timings, queries = [], 0
+        for i in range(warmup + repeat):
+            path, body = endpoint.build(data, i)
+            if endpoint.auth:
+                client.credentials(HTTP_AUTHORIZATION="Token " + tokens[endpoint.auth])
+            else:
+                client.credentials()
+            send = getattr(client, endpoint.method.lower())
+            with CaptureQueriesContext(connection) as captured:
+                start = perf_counter()
+                if endpoint.method == "GET":
+                    response = send(path, body)
+                else:
+                    response = send(path, body, format=endpoint.body_format)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                elapsed = perf_counter() - start
+            if response.status_code != endpoint.status:
+                raise BenchmarkError(
+                    f"{endpoint.key}: expected {endpoint.status}, got {response.status_code}: "
+                    f"{getattr(response, 'data', '')}"
+                )
+            if on_queries:
+                on_queries(endpoint, captured.captured_queries)
+            if i >= warmup:
+                timings.append(elapsed * 1000)
+                queries = max(queries, count_queries(captured))
+        results[endpoint.key] = {
+            "queries": queries,
+            "p50_ms": round(percentile(timings, 50), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+        }
+    return results
+
+
+# --------------------
+# baseline
+# --------------------
+def load_baseline(path=BASELINE_PATH):
+    path = Path(path)
+    if not path.exists():
+        return {"queries": {}, "latency": {}}
+    return json.loads(path.read_text())
+
+
+def save_baseline(results, scale_name, path=BASELINE_PATH):
+    baseline = load_baseline(path)
+    baseline["queries"] = {key: result["queries"] for key, result in sorted(results.items())}
+    baseline.setdefault("latency", {})[scale_name] = {
+        key: {"p50_ms": result["p50_ms"], "p95_ms": result["p95_ms"]}
+        for key, result in sorted(results.items())
+    }
+    Path(path).write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+def check_budgets(results, baseline, scale_name=None, tolerance=0.5):
+    """
+    Returns a list of budget violations. Query budgets are exact; p95 may
+    exceed the stored value by `tolerance` (a fraction). Latency is only
+    checked when `scale_name` has a stored baseline.
+    """
+    violations = []
+    latency = baseline.get("latency", {}).get(scale_name, {}) if scale_name else {}
+    for key, result in results.items():
+        budget = baseline.get("queries", {}).get(key)
+        if budget is None:
+            violations.append(f"{key}: no query budget in the baseline")
+        elif result["queries"] > budget:
+            violations.append(f"{key}: {result['queries']} queries, budget is {budget}")
+        limit = latency.get(key)
+        if limit and result["p95_ms"] > limit["p95_ms"] * (1 + tolerance):
+            violations.append(f"{key}: p95 {result['p95_ms']} ms, baseline is {limit['p95_ms']} ms")
+    return violations
+
+
+# --------------------
+# WSGI vs ASGI under concurrency
+# --------------------
+def read_paths(data):
+    """The read endpoints that have async views under ASGI (core.async_urls)."""
+    return [
+        reverse("boards-list"),
+        reverse("boards-detail", args=[data.board.pk]),
+        reverse("tasks-assigned-to-me"),
+        reverse("tasks-reviewing"),
+        reverse("task-comments", args=[data.task.pk]),
+    ]
+
+
+def _summary(latencies, elapsed):
+    latencies = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 2),
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def _wsgi_get(application, path, token):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_AUTHORIZATION": "Token " + token,
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    status = []
+    body = application(environ, lambda line, headers, exc_info=None: status.append(line))
+    try:
+        b"".join(body)
+    finally:
+        body.close()
+    return int(status[0].split()[0])
+
+
+def run_wsgi_load(paths, token, clients, requests_per_client, threads):
+    """
+    `clients` closed-loop clients against core.wsgi.application on a server
+    with `threads` worker threads; latency includes waiting for a thread.
+    """
+    from core.wsgi import application
+
+    workers = threading.BoundedSemaphore(threads)
+    latencies, failures = [], []
+    def client(number):
+        for i in range(requests_per_client):
+            path = paths[(number + i) % len(paths)]
+            start = perf_counter()
+            with workers:
+                status = _wsgi_get(application, path, token)
+            latencies.append(perf_counter() - start)
+            if status != 200:
+                failures.append(f"{path}: {status}")
+
+    started = perf_counter()
+    pool = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = perf_counter() - started
+    if failures:
+        raise BenchmarkError(f"WSGI: {len(failures)} failed requests, e.g. {failures[0]}")
+    return _summary(latencies, elapsed)
+
+
+async def _asgi_get(application, path, token):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"authorization", f"Token {token}".encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    request_sent = False
+    disconnected = asyncio.Event()
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+    status = []
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+    await application(scope, receive, send)
+    disconnected.set()
+    return status[0]
+
+
+def run_asgi_load(paths, token, clients, requests_per_client):
+    """`clients` closed-loop clients as coroutines against core.asgi.application on one event loop."""
+    from core.asgi import application
+
+    latencies, failures = [], []
+    async def client(number):
+        for i in range(requests_per_client):
+            path = paths[(number + i) % len(paths)]
+            start = perf_counter()
+            status = await _asgi_get(application, path, token)
+            latencies.append(perf_counter() - start)
+            if status != 200:
+                failures.append(f"{path}: {status}")
+    async def main():
+        await asyncio.gather(*(client(number) for number in range(clients)))
+
+    started = perf_counter()
+    asyncio.run(main())
+    elapsed = perf_counter() - started
+    if failures:
+        raise BenchmarkError(f"ASGI: {len(failures)} failed requests, e.g. {failures[0]}")
+    return _summary(latencies, elapsed)
+
+
+# --------------------
+# serializers vs values() readers
+# --------------------
+def reader_cases():
+    """(name, queryset, serializer class, ValuesReader) of the list endpoints with a fast path."""
+    from boards_app.api.serializers import BoardListSerializer
+    from boards_app.api.views import BoardViewSet
+    from tasks_app.api.serializers import TaskSerializer
+    from tasks_app.api.views import ConditionalTaskListView
+
+    return [
+        ("tasks", Task.objects.select_related("assignee", "reviewer").order_by("pk"),
+         TaskSerializer, ConditionalTaskListView.values_reader),
+        ("boards", Board.objects.order_by("pk"), BoardListSerializer, BoardViewSet.values_reader),
+    ]
+
+
+def _best_of(repeat, run):
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        run()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def run_reader_comparison(rows=5000, repeat=5):
+    """
+    Rows per second of each case in reader_cases(), best of `repeat` runs:
+    fetching and serializing `rows` rows (`*_rows_per_s`) and serializing
+    already fetched rows only (`*_serialize_rows_per_s`). Raises
+    BenchmarkError if a reader's output differs from its serializer's.
+    """
+    results = {}
+    for name, queryset, serializer_class, reader in reader_cases():
+        queryset = queryset[:rows]
+        objects, values = list(queryset), list(reader.values(queryset))
+        expected = json.dumps(serializer_class(objects, many=True).data)
+        if json.dumps(reader.read(values)) != expected:
+            raise BenchmarkError(f"{name}: ValuesReader output differs from {serializer_class.__name__}")
+        timings = {
+            "serializer": _best_of(repeat, lambda: serializer_class(list(queryset), many=True).data),
+            "reader": _best_of(repeat, lambda: reader.read(reader.values(queryset))),
+            "serializer_serialize": _best_of(repeat, lambda: serializer_class(objects, many=True).data),
+            "reader_serialize": _best_of(repeat, lambda: reader.read(values)),
+        }
+        results[name] = {"rows": len(objects)} | {
+            f"{kind}_rows_per_s": round(len(objects) / seconds) for kind, seconds in timings.items()
+        }
+    return results
+
+
+# --------------------
+# JSON rendering: DRF vs orjson vs streamed
+# --------------------
+def _render_modes(board_id):
+    from boards_app.api.serializers import BoardDetailSerializer
+    from boards_app.api.views import BoardViewSet
+    from django.conf import settings
+    from django.db.models import prefetch_related_objects
+    from rest_framework.renderers import JSONRenderer
+
+    from core.renderers import FastJSONRenderer, iter_json
+
+    def detail_data():
+        board = Board.objects.get(pk=board_id)
+        prefetch_related_objects([board], *BoardViewSet.detail_prefetches)
+        return BoardDetailSerializer(board).data
+    data = detail_data()
+    def streamed():
+        board = Board.objects.get(pk=board_id)
+        prefetch_related_objects([board], *BoardViewSet.streamed_detail_prefetches)
+        tasks = BoardViewSet.streamed_tasks(board).iterator(chunk_size=settings.JSON_STREAMING_CHUNK_SIZE)
+        return sum(len(chunk) for chunk in iter_json(BoardViewSet.streamed_detail(board, tasks)))
+    return {
+        "drf": lambda: len(JSONRenderer().render(detail_data())),
+        "fast": lambda: len(FastJSONRenderer().render(detail_data())),
+        "streamed": streamed,
+        # encoding of already serialized data only
+        "drf encode": lambda: len(JSONRenderer().render(data)),
+        "fast encode": lambda: len(FastJSONRenderer().render(data)),
+    }
+
+
+def run_render_comparison(tasks=20000, repeat=3):
+    """
+    Seeds one board with `tasks` tasks and renders its detail in every mode
+    of _render_modes() (query, serialization and encoding unless noted):
+    {mode: {"bytes", "seconds" (best of `repeat`), "rows_per_s", "peak_mb"}}.
+    Peak memory is traced in a separate run, tracing slows Python down.
+    """
+    plan = SeedPlan(20, 1, Range(5, 10), Range(tasks, tasks), 1.0, 0.5, seed=0)
+    board_id = seeding.seed(plan, password=BENCH_PASSWORD).board_ids[0]
+    results = {}
+    for mode, render in _render_modes(board_id).items():
+        size = render()
+        seconds = _best_of(repeat, render)
+        tracemalloc.start()
+        try:
+            render()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        results[mode] = {
+            "bytes": size,
+            "seconds": round(seconds, 3),
+            "rows_per_s": round(tasks / seconds),
+            "peak_mb": round(peak / 2**20, 1),
+        }
+    if len({result["bytes"] for result in results.values()}) != 1:
+        raise BenchmarkError(f"Rendered sizes differ: {results}")
+    return results
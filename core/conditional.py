@@ -0,0 +1,40 @@
+"""
+Strong ETags and If-None-Match handling for DRF views.
+
+Views compute a cheap version stamp first (see Board.version), build the
+ETag from it and return 304 before any serializer work:
+
+    etag = make_etag("board", board.pk, board.version, request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+"""
+import hashlib
+
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts, request=None):
+    """
+    Quoted strong ETag for the given version parts. When a request is
+    passed, the path, query string and negotiated format are included,
+    since they change the representation.
+    """
+    if request is not None:
+        renderer = getattr(request, "accepted_renderer", None)
+        parts += (request.get_full_path(), getattr(renderer, "format", ""))
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request, etag):
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in etags
+
+
+def not_modified(etag):
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
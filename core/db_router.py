@@ -0,0 +1,154 @@
+"""
+Read replica routing (settings.READ_REPLICAS, see KANMIND_READ_REPLICAS).
+
+ReplicaRoutingMiddleware marks every request; ReadReplicaRouter then sends
+the reads of GET/HEAD requests to one replica per request and everything
+else to the primary ("default"):
+
+- writes, reads of unsafe requests, reads inside a transaction and reads
+  outside a request (commands, signals of scripts) use the primary;
+- read-your-writes: after a client wrote (an unsafe request, or a write
+  during a safe one) its reads stay on the primary for
+  READ_REPLICA_STICKY_SECONDS. Clients are told apart by their
+  Authorization header or session cookie; the marks live in the
+  READ_REPLICA_CACHE_ALIAS cache (use a shared cache with several workers);
+- replicas more than READ_REPLICA_MAX_LAG seconds behind the primary, or
+  unreachable, are skipped. Lag is probed at most every
+  READ_REPLICA_PROBE_INTERVAL seconds per process by comparing the newest
+  board change log entry on both sides.
+
+Tokens and sessions are always read from the primary, so a fresh login
+works before the replicas have it.
+"""
+import contextvars
+import hashlib
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from core import metrics
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PRIMARY_READ_MODELS = {"authtoken.token", "sessions.session"}
+
+_request_state = contextvars.ContextVar("replica_routing", default=None)
+_probes = {}  # replica alias -> (probed at, lag in seconds)
+_probe_lock = threading.Lock()
+
+
+class RoutingState:
+    """Per request: whether reads may use a replica and which one was picked."""
+    __slots__ = ("client", "safe", "sticky", "wrote", "replica")
+    def __init__(self, client, safe, sticky):
+        self.client = client
+        self.safe = safe
+        self.sticky = sticky
+        self.wrote = False
+        self.replica = None
+
+
+def client_key(request):
+    """Cache key of the client behind a request, None for anonymous requests."""
+    credentials = request.META.get("HTTP_AUTHORIZATION") or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credentials:
+        return None
+    return "kanmind:replica-sticky:" + hashlib.sha256(credentials.encode()).hexdigest()
+
+
+def begin_request(request):
+    """Starts routing for a request; returns the token for end_request()."""
+    client = client_key(request)
+    safe = request.method in SAFE_METHODS
+    sticky = bool(
+        settings.READ_REPLICAS and safe and client
+        and caches[settings.READ_REPLICA_CACHE_ALIAS].get(client)
+    )
+    return _request_state.set(RoutingState(client, safe, sticky))
+
+
+def end_request(token):
+    state = _request_state.get()
+    _request_state.reset(token)
+    if state and state.client and settings.READ_REPLICAS and (state.wrote or not state.safe):
+        caches[settings.READ_REPLICA_CACHE_ALIAS].set(state.client, True, settings.READ_REPLICA_STICKY_SECONDS)
+
+
+def _newest_change(alias):
+    from boards_app.models import ChangeLogEntry
+    return ChangeLogEntry.objects.using(alias).order_by("-pk").values_list("pk", "created_at").first()
+
+
+def probe_lag(alias):
+    """Seconds `alias` is behind the primary (0 when in sync, inf when unreachable)."""
+    try:
+        primary = _newest_change(DEFAULT_DB_ALIAS)
+        replica = _newest_change(alias)
+    except DatabaseError:
+        return float("inf")
+    if primary is None or (replica is not None and replica[0] >= primary[0]):
+        return 0.0
+    if replica is None:
+        return float("inf")
+    return max(0.0, (primary[1] - replica[1]).total_seconds())
+
+
+def replica_lag(alias):
+    """probe_lag(alias), cached for READ_REPLICA_PROBE_INTERVAL seconds."""
+    now = time.monotonic()
+    probed = _probes.get(alias)
+    if probed and now - probed[0] < settings.READ_REPLICA_PROBE_INTERVAL:
+        return probed[1]
+    with _probe_lock:
+        probed = _probes.get(alias)
+        if probed and now - probed[0] < settings.READ_REPLICA_PROBE_INTERVAL:
+            return probed[1]
+        lag = probe_lag(alias)
+        _probes[alias] = (time.monotonic(), lag)
+    metrics.set_gauge(f"db.replica.{alias}.lag_seconds", lag)
+    return lag
+
+
+def forget_probes():
+    _probes.clear()
+
+
+def pick_replica():
+    """A random replica within READ_REPLICA_MAX_LAG, or the primary if there is none."""
+    healthy = [alias for alias in settings.READ_REPLICAS if replica_lag(alias) <= settings.READ_REPLICA_MAX_LAG]
+    if not healthy:
+        metrics.incr("db.replica.fallback")
+        return DEFAULT_DB_ALIAS
+    return random.choice(healthy)
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if (
+            state is None
+            or not state.safe
+            or state.sticky
+            or state.wrote
+            or not settings.READ_REPLICAS
+            or model._meta.label_lower in PRIMARY_READ_MODELS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            state.replica = pick_replica()
+        return state.replica
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+    def allow_migrate(self, db, app_label, **hints):
+        # replicas are copies of the primary, schema included
+        return False if db in settings.READ_REPLICAS else None
@@ -0,0 +1,192 @@
+"""
+Index advice from the SQL the API really issues (python manage.py advise_indexes).
+
+QueryLog collects the statements of a benchmark workload (it is passed
+to benchmark.run_workload as `on_queries`). analyze() runs SQLite's
+EXPLAIN QUERY PLAN on each distinct statement and reports full table
+scans and temporary B-trees (sorts / groupings the planner cannot read
+from an index). For every finding a composite index is derived from the
+statement - equality columns first, then the range, ORDER BY or GROUP BY
+columns - and only proposed if creating it really removes the finding
+from the plan. Findings no index can fix (e.g. OR across two tables) are
+reported without a proposal.
+"""
+import re
+from collections import namedtuple
+
+from django.apps import apps
+from django.db import migrations, models
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+
+PROBE_INDEX = "index_advisor_probe"
+EXPLAINED = ("SELECT", "UPDATE", "DELETE")
+
+# "tasks_app_task"."status" / U0."board_id" followed by a comparison
+_TABLE = r'(?:"(?P<table>\w+)"|(?P<alias>[TUV]\d+))'
+_COMPARISON = re.compile(_TABLE + r'\."(?P<column>\w+)"\s*(?P<op>=|IN\b|IS\b|<=|>=|<|>)')
+_REFERENCE = re.compile(_TABLE + r'\."(?P<column>\w+)"')
+_ALIAS = re.compile(r'(?:FROM|JOIN) "(?P<table>\w+)" (?P<alias>[TUV]\d+)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"IN \((?:\?, )*\?\)")
+
+Finding = namedtuple("Finding", ["kind", "table", "detail", "sql", "endpoints", "proposal"])
+Proposal = namedtuple("Proposal", ["table", "columns", "model", "index"])
+
+
+def shape(sql):
+    """The statement with literals replaced by ?, so repeated requests collapse."""
+    return _IN_LIST.sub("IN (?)", _LITERAL.sub("?", sql))
+
+
+class QueryLog:
+    """on_queries hook for benchmark.run_workload; keeps one sample per statement shape."""
+    def __init__(self):
+        self.statements = {}  # shape -> (sample sql, set of endpoint keys)
+    def __call__(self, endpoint, captured_queries):
+        for query in captured_queries:
+            sql = query["sql"]
+            if not sql.startswith(EXPLAINED):
+                continue
+            self.statements.setdefault(shape(sql), (sql, set()))[1].add(endpoint.key)
+    def __iter__(self):
+        return iter(self.statements.values())
+
+
+def explain(cursor, sql):
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+    return [row[-1] for row in cursor.fetchall()]
+
+
+def _clause(sql, keyword, end_keywords):
+    """Text of the last `keyword` clause of the statement, up to the next clause."""
+    start = sql.rfind(f" {keyword} ")
+    if start == -1:
+        return ""
+    text = sql[start + len(keyword) + 2:]
+    for end in end_keywords:
+        text = text.split(f" {end} ")[0]
+    return text
+
+
+def _resolve(match, aliases):
+    return match["table"] or aliases.get(match["alias"])
+
+
+def problems(plan, sql):
+    """[(kind, table, plan row)] for the full scans and temporary B-trees of a plan."""
+    aliases = {match["alias"]: match["table"] for match in _ALIAS.finditer(sql)}
+    found = []
+    for detail in plan:
+        words = detail.split()
+        if words[0] == "SCAN" and "INDEX" not in words and len(words) == 2:
+            found.append(("full scan", aliases.get(words[1], words[1]), detail))
+        elif detail.startswith("USE TEMP B-TREE FOR"):
+            clause = "GROUP BY" if "GROUP BY" in detail else "ORDER BY"
+            references = list(_REFERENCE.finditer(_clause(sql, clause, ("ORDER BY", "HAVING", "LIMIT"))))
+            if references:
+                found.append(("temp b-tree", _resolve(references[0], aliases), detail))
+    return found
+
+
+def candidate_columns(sql, table, kind):
+    """Columns of a composite index on `table` that could serve the statement."""
+    aliases = {match["alias"]: match["table"] for match in _ALIAS.finditer(sql)}
+    equal, ranged = [], []
+    for match in _COMPARISON.finditer(sql):
+        if _resolve(match, aliases) != table:
+            continue
+        bucket = equal if match["op"] in ("=", "IN", "IS") else ranged
+        if match["column"] not in equal + ranged:
+            bucket.append(match["column"])
+    if kind == "full scan":
+        return equal + ranged[:1]
+    clause = "GROUP BY" if " GROUP BY " in sql else "ORDER BY"
+    trailing = [
+        match["column"]
+        for match in _REFERENCE.finditer(_clause(sql, clause, ("ORDER BY", "HAVING", "LIMIT")))
+        if _resolve(match, aliases) == table
+    ]
+    return equal + [column for column in trailing if column not in equal]
+
+
+def existing_indexes(connection, table):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [c["columns"] for c in constraints.values() if c["index"] or c["unique"] or c["primary_key"]]
+
+
+def _fixes(connection, sql, kind, table, columns):
+    """Whether an index on table(columns) removes the finding from the plan."""
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE INDEX {quote(PROBE_INDEX)} ON {quote(table)} ({', '.join(map(quote, columns))})"
+        )
+        try:
+            return all(
+                (found_kind, found_table) != (kind, table)
+                for found_kind, found_table, _ in problems(explain(cursor, sql), sql)
+            )
+        finally:
+            cursor.execute(f"DROP INDEX {quote(PROBE_INDEX)}")
+
+
+def _proposal(table, columns):
+    """Proposal for table(columns); model and index are None for tables without a model Meta."""
+    model = next(
+        (m for m in apps.get_models() if m._meta.db_table == table and not m._meta.auto_created),
+        None,
+    )
+    if model is None:
+        return Proposal(table, tuple(columns), None, None)
+    by_column = {field.column: field.name for field in model._meta.concrete_fields}
+    index = models.Index(fields=[by_column[column] for column in columns])
+    index.set_name_with_model(model)
+    return Proposal(table, tuple(columns), model, index)
+
+
+def analyze(connection, statements):
+    """Findings for the (sql, endpoints) pairs, each with a verified Proposal or None."""
+    findings, indexes = [], {}
+    for sql, endpoints in statements:
+        with connection.cursor() as cursor:
+            plan = explain(cursor, sql)
+        for kind, table, detail in problems(plan, sql):
+            if table not in indexes:
+                indexes[table] = existing_indexes(connection, table)
+            columns = candidate_columns(sql, table, kind)
+            covered = any(existing[:len(columns)] == columns for existing in indexes[table])
+            proposal = None
+            if columns and not covered and _fixes(connection, sql, kind, table, columns):
+                proposal = _proposal(table, columns)
+            findings.append(Finding(kind, table, detail, sql, sorted(endpoints), proposal))
+    return findings
+
+
+def proposals(findings):
+    """Distinct proposals of the findings, in order of first appearance."""
+    return list({(f.proposal.table, f.proposal.columns): f.proposal for f in findings if f.proposal}.values())
+
+
+def write_migrations(proposed):
+    """Writes one AddIndex migration per app and returns the file paths."""
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    by_app = {}
+    for proposal in proposed:
+        if proposal.model is not None:
+            by_app.setdefault(proposal.model._meta.app_label, []).append(proposal)
+    paths = []
+    for app_label, app_proposals in by_app.items():
+        leaves = loader.graph.leaf_nodes(app_label)
+        number = int(leaves[0][1].split("_")[0]) + 1 if leaves else 1
+        migration = migrations.Migration(f"{number:04d}_advised_indexes", app_label)
+        migration.dependencies = leaves
+        migration.operations = [
+            migrations.AddIndex(proposal.model._meta.model_name, proposal.index) for proposal in app_proposals
+        ]
+        writer = MigrationWriter(migration)
+        with open(writer.path, "w") as fh:
+            fh.write(writer.as_string())
+        paths.append(writer.path)
+    return paths
@@ -0,0 +1,58 @@
+"""
+Multi-row INSERTs for bulk loads of validated rows (see boards_app.api.importer).
+
+insert_rows() writes tuples of field values with one
+INSERT ... VALUES (...), (...) RETURNING id per batch and returns the new
+primary keys in row order. No model instances are built and no pre_save()
+or signals run, which makes it several times faster than bulk_create() for
+large loads; the rows must already hold valid, database-ready values
+(dates and datetimes are adapted). Fields left out get their default.
+"""
+import itertools
+
+from django.db import DEFAULT_DB_ALIAS, NotSupportedError, connections
+
+# rows per statement on databases without a query parameter limit
+DEFAULT_BATCH_SIZE = 1000
+
+
+def insert_rows(model, field_names, rows, using=DEFAULT_DB_ALIAS):
+    """INSERTs tuples of `field_names` values; returns the primary keys of the new rows."""
+    db = connections[using]
+    if not db.features.can_return_rows_from_bulk_insert:
+        raise NotSupportedError(f"{db.display_name} cannot return the ids of a multi-row INSERT.")
+    fields = [model._meta.get_field(name) for name in field_names]
+    omitted = [field for field in model._meta.concrete_fields if field not in fields and not field.primary_key]
+    defaults = [field.get_db_prep_save(field.get_default(), db) for field in omitted]
+    columns = ", ".join(db.ops.quote_name(field.column) for field in fields + omitted)
+    returning, _ = db.ops.return_insert_columns([model._meta.pk])
+    row_sql = "(" + ", ".join(["%s"] * len(fields + omitted)) + ")"
+    adapters = {
+        index: db.ops.adapt_datetimefield_value if field.get_internal_type() == "DateTimeField"
+        else db.ops.adapt_datefield_value
+        for index, field in enumerate(fields)
+        if field.get_internal_type() in ("DateTimeField", "DateField")
+    }
+    # as many rows as the parameter limit allows, like bulk_create()
+    max_params = db.features.max_query_params
+    batch_size = max(1, max_params // len(fields + omitted)) if max_params else DEFAULT_BATCH_SIZE
+
+    pks = []
+    rows = iter(rows)
+    with db.cursor() as cursor:
+        while batch := list(itertools.islice(rows, batch_size)):
+            params = []
+            for row in batch:
+                if adapters:
+                    row = list(row)
+                    for index, adapt in adapters.items():
+                        row[index] = adapt(row[index])
+                params.extend(row)
+                params.extend(defaults)
+            cursor.execute(
+                f"INSERT INTO {db.ops.quote_name(model._meta.db_table)} ({columns}) "
+                f"VALUES {', '.join([row_sql] * len(batch))} {returning}",
+                params,
+            )
+            pks.extend(pk for pk, in cursor.fetchall())
+    return pks
@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from boards_app.membership import clear_board_access_cache
+from core import benchmark, index_advisor
+
+
+class Command(BaseCommand):
+    """
+    python manage.py advise_indexes [--scale tiny] [--emit]
+    Runs the benchmark workload on a throwaway test database, explains every
+    distinct statement it issued and proposes the composite indexes that
+    remove full scans and temporary B-trees. --emit writes them as migrations.
+    """
+    help = "Explain the SQL of the API workload and propose indexes for full scans and temp B-trees."
+
+    def add_arguments(self, parser):
+        # without ANALYZE statistics SQLite plans do not depend on the table sizes
+        parser.add_argument("--scale", choices=sorted(benchmark.SCALES), default="tiny")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--emit",
+            action="store_true",
+            help="Write AddIndex migrations for the proposed indexes.",
+        )
+        parser.add_argument("--sql", action="store_true", help="Print the statement of every finding.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("advise_indexes reads SQLite query plans; the database is %s." % connection.vendor)
+
+        log = index_advisor.QueryLog()
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            clear_board_access_cache()
+            data = benchmark.seed_dataset(benchmark.SCALES[options["scale"]], seed=options["seed"])
+            benchmark.run_workload(data, repeat=1, warmup=0, on_queries=log)
+            findings = index_advisor.analyze(connection, log)
+        except benchmark.BenchmarkError as exc:
+            raise CommandError(str(exc))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            clear_board_access_cache()
+
+        self.stdout.write(f"{len(log.statements)} distinct statements, {len(findings)} finding(s).")
+        for finding in findings:
+            fix = (
+                f"index {finding.proposal.table}({', '.join(finding.proposal.columns)})"
+                if finding.proposal else "no index removes it"
+            )
+            self.stdout.write(f"{finding.kind:<12} {finding.table:<24} {finding.detail}")
+            self.stdout.write(f"    {', '.join(finding.endpoints)} -> {fix}")
+            if options["sql"]:
+                self.stdout.write(f"    {finding.sql}")
+
+        proposed = index_advisor.proposals(findings)
+        if not proposed:
+            self.stdout.write(self.style.SUCCESS("No index proposals."))
+            return
+        self.stdout.write("Proposed indexes:")
+        for proposal in proposed:
+            if proposal.model is None:
+                self.stdout.write(f"  {proposal.table}({', '.join(proposal.columns)}) - table has no model Meta")
+            else:
+                self.stdout.write(
+                    f"  {proposal.model.__name__}.Meta.indexes: "
+                    f"models.Index(fields={list(proposal.index.fields)!r}, name={proposal.index.name!r})"
+                )
+        if options["emit"]:
+            for path in index_advisor.write_migrations(proposed):
+                self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
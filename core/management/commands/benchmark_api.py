@@ -0,0 +1,83 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from boards_app.membership import clear_board_access_cache
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """
+    python manage.py benchmark_api [--scale small] [--repeat 30] [--update-baseline]
+    Seeds a throwaway test database, measures every API route and fails
+    when a query or latency budget from core/benchmark_baseline.json is exceeded.
+    """
+    help = "Benchmark all API endpoints against the stored query and latency budgets."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(benchmark.SCALES), default="small")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--repeat", type=int, default=30, help="Measured requests per endpoint.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Allowed p95 regression as a fraction of the baseline (default 0.5).",
+        )
+        parser.add_argument("--baseline", default=str(benchmark.BASELINE_PATH))
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Store the results as the new baseline instead of checking them.",
+        )
+        parser.add_argument("--json", dest="json_path", help="Also write the raw results to this file.")
+
+    def handle(self, *args, **options):
+        uncovered = benchmark.uncovered_routes()
+        if uncovered:
+            raise CommandError(f"Routes without a benchmark endpoint: {', '.join(uncovered)}")
+
+        scale = benchmark.SCALES[options["scale"]]
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            clear_board_access_cache()
+            self.stdout.write(f"Seeding {options['scale']} dataset: {scale}")
+            data = benchmark.seed_dataset(scale, seed=options["seed"])
+            results = benchmark.run_workload(data, repeat=options["repeat"])
+        except benchmark.BenchmarkError as exc:
+            raise CommandError(str(exc))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            clear_board_access_cache()
+
+        self.stdout.write(f"{'endpoint':<40} {'queries':>7} {'p50 ms':>9} {'p95 ms':>9}")
+        for key, result in results.items():
+            self.stdout.write(f"{key:<40} {result['queries']:>7} {result['p50_ms']:>9} {result['p95_ms']:>9}")
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump(results, fh, indent=2)
+
+        if options["update_baseline"]:
+            benchmark.save_baseline(results, options["scale"], options["baseline"])
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}."))
+            return
+
+        violations = benchmark.check_budgets(
+            results,
+            benchmark.load_baseline(options["baseline"]),
+            options["scale"],
+            options["tolerance"],
+        )
+        for violation in violations:
+            self.stdout.write(self.style.ERROR(violation))
+        if violations:
+            raise CommandError(f"{len(violations)} budget(s) exceeded.")
+        self.stdout.write(self.style.SUCCESS("All endpoints within budget."))
@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from core import benchmark, renderers
+
+
+class Command(BaseCommand):
+    """
+    python manage.py benchmark_json [--tasks 20000] [--repeat 3]
+    Renders the detail of one big board on a throwaway test database with
+    DRF's JSONRenderer, FastJSONRenderer and as a stream (core.renderers),
+    and reports rows per second and peak traced memory of each.
+    """
+    help = "Compare throughput and peak memory of the JSON renderers on a big board."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=20000, help="Tasks on the rendered board.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per mode, the best one counts.")
+        parser.add_argument("--json", dest="json_path", help="Also write the raw results to this file.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = benchmark.run_render_comparison(options["tasks"], options["repeat"])
+        except benchmark.BenchmarkError as exc:
+            raise CommandError(str(exc))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        encoder = "orjson" if renderers.orjson is not None else "json (orjson not installed)"
+        self.stdout.write(f"Board detail with {options['tasks']} tasks, fast encoder: {encoder}")
+        self.stdout.write(f"{'mode':<12} {'bytes':>11} {'seconds':>8} {'rows/s':>9} {'peak MB':>8}")
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<12} {result['bytes']:>11} {result['seconds']:>8}"
+                f" {result['rows_per_s']:>9} {result['peak_mb']:>8}"
+            )
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump(results, fh, indent=2)
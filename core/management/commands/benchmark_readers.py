@@ -0,0 +1,59 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from boards_app.membership import clear_board_access_cache
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """
+    python manage.py benchmark_readers [--scale small] [--rows 5000] [--repeat 5]
+    Compares rows per second of the task and board list serializers with
+    their values() readers (core.readers) on a throwaway seeded test
+    database, and checks that both produce the same JSON.
+    """
+    help = "Compare rows/sec of DRF list serializers and their values() readers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(benchmark.SCALES), default="small")
+        parser.add_argument("--rows", type=int, default=5000, help="Rows per list.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, the best one counts.")
+        parser.add_argument("--json", dest="json_path", help="Also write the raw results to this file.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            clear_board_access_cache()
+            benchmark.seed_dataset(benchmark.SCALES[options["scale"]])
+            results = benchmark.run_reader_comparison(options["rows"], options["repeat"])
+        except benchmark.BenchmarkError as exc:
+            raise CommandError(str(exc))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            clear_board_access_cache()
+
+        self.stdout.write(f"rows/s, best of {options['repeat']}; 'serialize' excludes the query")
+        self.stdout.write(
+            f"{'list':<8} {'rows':>6} {'serializer':>11} {'reader':>11} {'speedup':>8}"
+            f" {'serialize':>11} {'reader':>11} {'speedup':>8}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<8} {result['rows']:>6}"
+                f" {result['serializer_rows_per_s']:>11} {result['reader_rows_per_s']:>11}"
+                f" {result['reader_rows_per_s'] / result['serializer_rows_per_s']:>7.1f}x"
+                f" {result['serializer_serialize_rows_per_s']:>11} {result['reader_serialize_rows_per_s']:>11}"
+                f" {result['reader_serialize_rows_per_s'] / result['serializer_serialize_rows_per_s']:>7.1f}x"
+            )
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump(results, fh, indent=2)
@@ -0,0 +1,67 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from boards_app.membership import clear_board_access_cache
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """
+    python manage.py benchmark_servers [--clients 500] [--requests 4] [--wsgi-threads 32]
+    Compares throughput and tail latency of the read endpoints served by the
+    sync DRF views (WSGI) and the async views (ASGI) with many concurrent
+    clients, on a throwaway seeded test database.
+    """
+    help = "Compare sync WSGI and async ASGI read endpoints under concurrent load."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(benchmark.SCALES), default="small")
+        parser.add_argument("--clients", type=int, default=500)
+        parser.add_argument("--requests", type=int, default=4, help="Requests per client.")
+        parser.add_argument(
+            "--wsgi-threads",
+            type=int,
+            default=32,
+            help="Worker threads of the simulated WSGI server (e.g. gunicorn workers x threads).",
+        )
+        parser.add_argument("--json", dest="json_path", help="Also write the raw results to this file.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            clear_board_access_cache()
+            data = benchmark.seed_dataset(benchmark.SCALES[options["scale"]])
+            paths = benchmark.read_paths(data)
+            # warm up caches and connections on both stacks
+            benchmark.run_wsgi_load(paths, data.token, 1, len(paths), 1)
+            benchmark.run_asgi_load(paths, data.token, 1, len(paths))
+            results = {
+                "wsgi": benchmark.run_wsgi_load(
+                    paths, data.token, options["clients"], options["requests"], options["wsgi_threads"]
+                ),
+                "asgi": benchmark.run_asgi_load(paths, data.token, options["clients"], options["requests"]),
+            }
+        except benchmark.BenchmarkError as exc:
+            raise CommandError(str(exc))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            clear_board_access_cache()
+
+        self.stdout.write(f"{options['clients']} clients x {options['requests']} requests, scale {options['scale']}")
+        self.stdout.write(f"{'server':<8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for server, result in results.items():
+            self.stdout.write(
+                f"{server:<8} {result['throughput']:>9} {result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9}"
+            )
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump(results, fh, indent=2)
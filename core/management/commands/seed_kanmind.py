@@ -0,0 +1,64 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.seeding import DEFAULT_PASSWORD, Range, SeedPlan, seed
+
+
+def count_range(value):
+    try:
+        return Range.parse(value)
+    except ValueError:
+        raise CommandError(f"Expected a count like 50 or 10-100, got {value!r}.")
+
+
+class Command(BaseCommand):
+    """
+    python manage.py seed_kanmind --users 10000 --boards 5000 --tasks-per-board 100-300
+    Adds generated users, boards, memberships, tasks and comments to the
+    database. Counts given as "low-high" are drawn uniformly per board.
+    Every user gets the same password (--password).
+    """
+    help = "Generate a realistic, reproducible data set with bulk inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--boards", type=int, default=200)
+        parser.add_argument("--members-per-board", type=count_range, default=Range(2, 12))
+        parser.add_argument("--tasks-per-board", type=count_range, default=Range(20, 200))
+        parser.add_argument(
+            "--comments-per-task",
+            type=float,
+            default=2.0,
+            help="Average number of comments per task.",
+        )
+        parser.add_argument(
+            "--comment-skew",
+            type=float,
+            default=0.5,
+            help="0 spreads comments evenly; 1 and above concentrates them on few tasks (Zipf).",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--password", default=DEFAULT_PASSWORD)
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["boards"] < 0:
+            raise CommandError("At least one user is required.")
+        plan = SeedPlan(
+            users=options["users"],
+            boards=options["boards"],
+            members_per_board=options["members_per_board"],
+            tasks_per_board=options["tasks_per_board"],
+            comments_per_task=options["comments_per_task"],
+            comment_skew=options["comment_skew"],
+            seed=options["seed"],
+        )
+        started = perf_counter()
+        seed(
+            plan,
+            password=options["password"],
+            batch_size=options["batch_size"],
+            log=lambda message: self.stdout.write(f"  {message} ({perf_counter() - started:.1f}s)"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {perf_counter() - started:.1f}s."))
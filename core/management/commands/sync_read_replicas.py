@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    """
+    python manage.py sync_read_replicas [--every SECONDS]
+    Copies the primary SQLite database over every replica file with the
+    SQLite online backup API - a stand-in for real replication when
+    trying the replica routing locally (see core.db_router).
+    """
+    help = "Copy the primary SQLite database into the read replica files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=float,
+            help="Keep copying every SECONDS seconds instead of once.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.READ_REPLICAS:
+            raise CommandError("No read replicas configured (KANMIND_READ_REPLICAS).")
+        if any(connections[alias].vendor != "sqlite" for alias in [DEFAULT_DB_ALIAS, *settings.READ_REPLICAS]):
+            raise CommandError("sync_read_replicas only copies SQLite databases.")
+        while True:
+            self.sync()
+            if not options["every"]:
+                return
+            time.sleep(options["every"])
+
+    def sync(self):
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        for alias in settings.READ_REPLICAS:
+            replica = connections[alias]
+            replica.ensure_connection()
+            primary.connection.backup(replica.connection)
+            self.stdout.write(f"{alias} <- {DEFAULT_DB_ALIAS}")
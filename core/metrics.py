@@ -0,0 +1,59 @@
+"""
+In-process counters and gauges for cache hit ratios, queue depths, etc.
+
+    from core import metrics
+    metrics.incr("auth.token_cache.hit")
+    metrics.snapshot()  # {"auth.token_cache.hit": 12, ...}
+
+Values are per worker process; GET /api/metrics/ (staff only) returns
+the snapshot of the process that serves the request, including the hit
+ratios declared with register_ratio().
+"""
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_values = defaultdict(int)
+_ratios = {}  # name -> (hits counter, misses counter)
+
+
+def incr(name, amount=1):
+    with _lock:
+        _values[name] += amount
+
+
+def set_gauge(name, value):
+    with _lock:
+        _values[name] = value
+
+
+def get(name):
+    with _lock:
+        return _values.get(name, 0)
+
+
+def ratio(hits, misses):
+    """hits / (hits + misses) of two counters, None before the first lookup."""
+    with _lock:
+        total = _values.get(hits, 0) + _values.get(misses, 0)
+        return _values.get(hits, 0) / total if total else None
+
+
+def register_ratio(name, hits, misses):
+    """Adds ratio(hits, misses) to every snapshot as `name`."""
+    with _lock:
+        _ratios[name] = (hits, misses)
+
+
+def snapshot():
+    values = {}
+    with _lock:
+        values.update(_values)
+    for name, (hits, misses) in list(_ratios.items()):
+        values[name] = ratio(hits, misses)
+    return values
+
+
+def reset():
+    with _lock:
+        _values.clear()
@@ -0,0 +1,52 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from core import db_router
+
+
+class AsyncReadRoutingMiddleware:
+    """
+    Under ASGI, resolves GET/HEAD requests against ASYNC_READ_URLCONF so the
+    read endpoints run on the async ORM; WSGI requests are left alone.
+    Native async (no MiddlewareMixin) to avoid a thread hop per request.
+    """
+    sync_capable = True
+    async_capable = True
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.get_response(request)
+    async def __acall__(self, request):
+        if settings.ASYNC_READ_URLCONF and request.method in ("GET", "HEAD"):
+            request.urlconf = settings.ASYNC_READ_URLCONF
+        return await self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """Scopes core.db_router decisions (replica or primary) to the request."""
+    sync_capable = True
+    async_capable = True
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = db_router.begin_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            db_router.end_request(token)
+    async def __acall__(self, request):
+        token = db_router.begin_request(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            db_router.end_request(token)
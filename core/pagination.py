@@ -0,0 +1,140 @@
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Opaque-cursor keyset pagination for list endpoints.
+
+    GET ...?page_size=50             -> first page
+    GET ...?cursor=<next>&page_size=50 -> following page
+
+    Pages are fetched with WHERE id > <position> ... LIMIT n, so page
+    10,000 costs the same as page 1. Pagination is opt-in: requests
+    without `cursor` or `page_size` still receive the plain list.
+    """
+    ordering = "id"
+    page_size_query_param = "page_size"
+
+    @property
+    def max_page_size(self):
+        return settings.API_MAX_PAGE_SIZE
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class CreatedAtKeysetPagination(BasePagination):
+    """
+    Keyset pagination on (created_at, id) in both directions (comments).
+
+    GET ...?page_size=50                 -> oldest first
+    GET ...?page_size=50&order=newest    -> newest first
+    GET <next> / <previous>              -> neighbouring pages
+    GET <since>                          -> comments created after the newest
+                                            one seen, oldest first (polling)
+
+    Cursors hold (order, direction, created_at, id). A page is one range
+    read on the (task, created_at) index - rows with the same created_at
+    are ordered by id, which that index stores too - so there is no
+    offset and no sort, however deep the page. Opt-in like
+    KeysetCursorPagination.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    order_query_param = "order"
+    orders = {"oldest": ("created_at", "id"), "newest": ("-created_at", "-id")}
+    invalid_cursor_message = "Invalid cursor"
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return max(1, min(size, settings.API_MAX_PAGE_SIZE))
+
+    def encode_cursor(self, order, reverse, position):
+        created_at, pk = position
+        token = f"{order}|{int(reverse)}|{created_at.isoformat()}|{pk}"
+        cursor = base64.urlsafe_b64encode(token.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """(order, reverse, (created_at, id) or None) of the request."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor is None:
+            order = request.query_params.get(self.order_query_param, "oldest")
+            if order not in self.orders:
+                raise NotFound(f"Unknown order {order!r}, use oldest or newest.")
+            return order, False, None
+        try:
+            order, reverse, created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            if order not in self.orders:
+                raise ValueError(order)
+            return order, reverse == "1", (datetime.fromisoformat(created_at), int(pk))
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.order_query_param)
+        order, reverse, position = self.decode_cursor(request)
+        page_size = self.get_page_size(request)
+        # walking backwards reads the opposite order and flips the page
+        descending = (order == "newest") != reverse
+        if position is not None:
+            created_at, pk = position
+            if descending:
+                queryset = queryset.filter(created_at__lte=created_at).exclude(created_at=created_at, id__gte=pk)
+            else:
+                queryset = queryset.filter(created_at__gte=created_at).exclude(created_at=created_at, id__lte=pk)
+        rows = list(queryset.order_by(*self.orders["newest" if descending else "oldest"])[:page_size + 1])
+        has_more = len(rows) > page_size
+        page = rows[:page_size]
+        if reverse:
+            page.reverse()
+
+        self.next = self.previous = None
+        if page and (reverse or has_more):
+            self.next = self.encode_cursor(order, False, self.position(page[-1]))
+        if page and position is not None and (has_more or not reverse):
+            self.previous = self.encode_cursor(order, True, self.position(page[0]))
+        newest = max(map(self.position, page), default=None)
+        if newest is None and not descending:
+            # nothing new yet: poll the same position again
+            newest = position
+        self.since = self.encode_cursor("oldest", False, newest) if newest else None
+        return page
+
+    @staticmethod
+    def position(obj):
+        return (obj.created_at, obj.pk)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.next, "previous": self.previous, "since": self.since, "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        link = {"type": "string", "nullable": True, "format": "uri"}
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {"next": link, "previous": link, "since": link, "results": schema},
+        }
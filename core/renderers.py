@@ -0,0 +1,158 @@
+"""
+JSON rendering and parsing with orjson, and streamed JSON for big responses.
+
+FastJSONRenderer and FastJSONParser (see REST_FRAMEWORK in core.settings)
+produce and accept exactly what DRF's JSONRenderer/JSONParser do, using
+orjson when it is installed and DRF's json-based code otherwise.
+
+StreamedRows puts a lazily encoded array into a response body:
+
+    data = {"id": board.id, "tasks": StreamedRows(rows.iterator(chunk_size=2000), reader.read)}
+    return StreamingJSONResponse(data)
+
+The rows are encoded JSON_STREAMING_CHUNK_SIZE at a time while the
+response is sent, so neither the Python objects nor the encoded body of
+the whole array are ever held in memory. `rows` may be an async iterator
+(e.g. QuerySet.aiterator()) for responses sent under ASGI.
+"""
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# DRF escapes these so that the JSON is also valid JavaScript
+_LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+_drf_default = JSONEncoder().default
+
+
+def dumps(data, default=_drf_default):
+    """Compact UTF-8 JSON of `data` as DRF's JSONRenderer writes it (without indent)."""
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(
+                data, default=default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers above 64 bit, which the json module handles
+            pass
+        else:
+            for character, escaped in _LINE_SEPARATORS:
+                if character in encoded:
+                    encoded = encoded.replace(character, escaped)
+            return encoded
+    encoded = json.dumps(data, default=default, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return encoded.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+
+def loads(data):
+    """Parses JSON bytes or text; raises ValueError on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data)  # orjson.JSONDecodeError is a ValueError
+    return json.loads(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer using orjson; indented output (`; indent=` in Accept) uses DRF's own code."""
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser using orjson (which, like DRF, rejects NaN and Infinity)."""
+    renderer_class = FastJSONRenderer
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class StreamedRows:
+    """A JSON array encoded row by row from `rows`; `serialize` maps a batch of rows to JSON-able items."""
+    def __init__(self, rows, serialize=list, chunk_size=None):
+        self.rows = rows
+        self.serialize = serialize
+        self.chunk_size = chunk_size or settings.JSON_STREAMING_CHUNK_SIZE
+    def _encode(self, batch, first):
+        items = self.serialize(batch)
+        if not items:
+            return b""
+        # "[a,b]" -> "a,b", prefixed with "," after the first batch
+        body = dumps(items)[1:-1]
+        return body if first else b"," + body
+    def chunks(self):
+        yield b"["
+        batch, first = [], True
+        for row in self.rows:
+            batch.append(row)
+            if len(batch) >= self.chunk_size:
+                chunk = self._encode(batch, first)
+                first, batch = first and not chunk, []
+                yield chunk
+        yield self._encode(batch, first) + b"]"
+    async def achunks(self):
+        yield b"["
+        batch, first = [], True
+        async for row in self.rows:
+            batch.append(row)
+            if len(batch) >= self.chunk_size:
+                chunk = self._encode(batch, first)
+                first, batch = first and not chunk, []
+                yield chunk
+        yield self._encode(batch, first) + b"]"
+
+
+def _split(data):
+    """The encoded `data` as a list of bytes and the StreamedRows to put between them."""
+    streams = []
+    def placeholder(value):
+        if isinstance(value, StreamedRows):
+            streams.append(value)
+            return f"\x00stream{len(streams) - 1}\x00"
+        return _drf_default(value)
+    encoded = dumps(data, default=placeholder)
+    parts = []
+    for number, stream in enumerate(streams):
+        before, encoded = encoded.split(f'"\\u0000stream{number}\\u0000"'.encode(), 1)
+        parts += [before, stream]
+    return parts + [encoded]
+
+
+def iter_json(data):
+    """Chunks of the JSON of `data`, with its StreamedRows encoded lazily."""
+    for part in _split(data):
+        if isinstance(part, StreamedRows):
+            yield from part.chunks()
+        else:
+            yield part
+
+
+async def aiter_json(data):
+    """iter_json() for StreamedRows over async iterators."""
+    for part in _split(data):
+        if isinstance(part, StreamedRows):
+            async for chunk in part.achunks():
+                yield chunk
+        else:
+            yield part
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    def __init__(self, data, asynchronous=False, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(aiter_json(data) if asynchronous else iter_json(data), **kwargs)
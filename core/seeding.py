@@ -0,0 +1,234 @@
+"""
+Bulk generation of realistic data sets (python manage.py seed_kanmind).
+
+Rows are written with executemany() straight into the tables, in batches
+and with explicit primary keys, so no model instances are built, no
+password is hashed more than once and no signals fire. Board counters,
+versions, the search index and primary key sequences are fixed up at the end. All
+randomness comes from one random.Random(seed): the same plan always
+produces the same data.
+"""
+import itertools
+import random
+from array import array
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from boards_app import list_cache
+from boards_app.models import Board
+from tasks_app import search
+from tasks_app.models import Comment, Task
+from tasks_app.ranks import spread_ranks
+
+User = get_user_model()
+
+DEFAULT_PASSWORD = "KanMind-Seed-1!"
+STATUSES = [status for status, _ in Task.STATUS_CHOICES]
+PRIORITIES = [priority for priority, _ in Task.PRIORITY_CHOICES]
+# share of tasks per status / priority on a typical board
+STATUS_WEIGHTS = [40, 25, 10, 25]
+PRIORITY_WEIGHTS = [45, 35, 20]
+UNASSIGNED_SHARE = 0.2
+COMMENT_AGE = timedelta(days=90)
+
+
+class Range:
+    """A count drawn uniformly from low..high; parsed from "50" or "10-100"."""
+    def __init__(self, low, high=None):
+        self.low = low
+        self.high = low if high is None else high
+        if not 0 <= self.low <= self.high:
+            raise ValueError(f"Invalid range {low}-{high}.")
+    @classmethod
+    def parse(cls, value):
+        low, _, high = str(value).partition("-")
+        return cls(int(low), int(high) if high else None)
+    def draw(self, rng):
+        return rng.randint(self.low, self.high)
+    def __str__(self):
+        return str(self.low) if self.low == self.high else f"{self.low}-{self.high}"
+    def __repr__(self):
+        return f"Range({self})"
+
+
+SeedPlan = namedtuple("SeedPlan", [
+    "users",                # number of users
+    "boards",               # number of boards, owners picked uniformly from the users
+    "members_per_board",    # Range, owner not included
+    "tasks_per_board",      # Range
+    "comments_per_task",    # mean number of comments per task
+    "comment_skew",         # 0 spreads comments evenly, 1 and above follows Zipf's law
+    "seed",
+])
+SeedResult = namedtuple("SeedResult", ["user_ids", "board_ids", "tasks", "comments"])
+
+
+def _next_id(model):
+    return (model.objects.aggregate(top=Max("pk"))["top"] or 0) + 1
+
+
+def _insert(model, field_names, rows, batch_size):
+    """
+    INSERTs tuples of `field_names` values; the remaining concrete fields
+    get their (static) default. Returns the number of rows written.
+    """
+    db = connections[DEFAULT_DB_ALIAS]
+    fields = [model._meta.get_field(name) for name in field_names]
+    omitted = [field for field in model._meta.concrete_fields if field not in fields and not field.primary_key]
+    defaults = tuple(field.get_db_prep_save(field.get_default(), db) for field in omitted)
+    columns = ", ".join(db.ops.quote_name(field.column) for field in fields + omitted)
+    placeholders = ", ".join(["%s"] * (len(fields) + len(omitted)))
+    sql = f"INSERT INTO {db.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})"
+    # only dates need adapting; the generators already yield database-ready values otherwise
+    adapters = {
+        index: db.ops.adapt_datetimefield_value if field.get_internal_type() == "DateTimeField"
+        else db.ops.adapt_datefield_value
+        for index, field in enumerate(fields)
+        if field.get_internal_type() in ("DateTimeField", "DateField")
+    }
+
+    written = 0
+    rows = iter(rows)
+    with db.cursor() as cursor:
+        while batch := list(itertools.islice(rows, batch_size)):
+            if adapters:
+                batch = [list(row) for row in batch]
+                for row in batch:
+                    for index, adapt in adapters.items():
+                        row[index] = adapt(row[index])
+            cursor.executemany(sql, [tuple(row) + defaults for row in batch])
+            written += len(batch)
+    return written
+
+
+def _comment_targets(rng, task_count, total, skew):
+    """Yields `total` task indexes; with skew > 0 a few tasks receive most comments."""
+    if skew <= 0:
+        for _ in range(total):
+            yield rng.randrange(task_count)
+        return
+    # rank r gets weight 1 / r**skew; ranks are shuffled across tasks
+    order = list(range(task_count))
+    rng.shuffle(order)
+    cumulative = list(itertools.accumulate(1 / rank ** skew for rank in range(1, task_count + 1)))
+    top = cumulative[-1]
+    for _ in range(total):
+        yield order[min(bisect_left(cumulative, rng.random() * top), task_count - 1)]
+
+
+def seed(plan, password=DEFAULT_PASSWORD, batch_size=10000, log=None):
+    """Adds the data set described by `plan` to the database and returns what was created."""
+    rng = random.Random(plan.seed)
+    log = log or (lambda message: None)
+    password_hash = make_password(password)
+
+    indexed = search.triggers_suspended() if search.is_available() else nullcontext()
+    with transaction.atomic(), indexed:
+        # users
+        first_user = _next_id(User)
+        user_ids = range(first_user, first_user + plan.users)
+        _insert(User, ["id", "email", "fullname", "password", "is_active"], (
+            (user_id, f"user{user_id}@seed.kanmind.test", f"Seed User {user_id}", password_hash, True)
+            for user_id in user_ids
+        ), batch_size)
+        log(f"{plan.users} users")
+
+        # boards and memberships
+        first_board = _next_id(Board)
+        board_ids = range(first_board, first_board + plan.boards)
+        owners = [rng.choice(user_ids) for _ in board_ids]
+        _insert(Board, ["id", "title", "owner_id"], (
+            (board_id, f"Board {board_id}", owner) for board_id, owner in zip(board_ids, owners)
+        ), batch_size)
+        people = []
+        for owner in owners:
+            size = min(plan.members_per_board.draw(rng), plan.users - 1)
+            members = [user_id for user_id in rng.sample(user_ids, size + 1) if user_id != owner][:size]
+            people.append(members + [owner])
+        memberships = _insert(Board.members.through, ["board_id", "user_id"], (
+            (board_id, user_id)
+            for board_id, board_people in zip(board_ids, people) for user_id in board_people[:-1]
+        ), batch_size)
+        log(f"{plan.boards} boards, {memberships} memberships")
+
+        # tasks; board index and creator of every task are kept for the comments
+        first_task = _next_id(Task)
+        task_boards, task_creators = array("l"), array("l")
+        def tasks():
+            task_id = first_task
+            for index, board_id in enumerate(board_ids):
+                board_people = people[index]
+                rows = []
+                for number in range(plan.tasks_per_board.draw(rng)):
+                    creator = rng.choice(board_people)
+                    task_boards.append(index)
+                    task_creators.append(creator)
+                    rows.append((
+                        task_id,
+                        board_id,
+                        f"Task {number + 1}",
+                        "",
+                        rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+                        rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0],
+                        None if rng.random() < UNASSIGNED_SHARE else rng.choice(board_people),
+                        rng.choice(board_people),
+                        creator,
+                    ))
+                    task_id += 1
+                # cards in id order within each column
+                positions = {
+                    status: iter(spread_ranks(count))
+                    for status, count in Counter(row[4] for row in rows).items()
+                }
+                for row in rows:
+                    yield row + (next(positions[row[4]]),)
+        task_count = _insert(Task, [
+            "id", "board_id", "title", "description", "status", "priority",
+            "assignee_id", "reviewer_id", "created_by_id", "position",
+        ], tasks(), batch_size)
+        log(f"{task_count} tasks")
+
+        # comments
+        comment_count = round(task_count * plan.comments_per_task) if task_count else 0
+        first_comment = _next_id(Comment)
+        oldest = timezone.now() - COMMENT_AGE
+        def comments():
+            # grouped by task, so the task_id index is filled in order
+            targets = sorted(_comment_targets(rng, task_count, comment_count, plan.comment_skew))
+            for offset, task_index in enumerate(targets):
+                board_people = people[task_boards[task_index]]
+                author = task_creators[task_index] if rng.random() < 0.3 else rng.choice(board_people)
+                yield (
+                    first_comment + offset,
+                    first_task + task_index,
+                    author,
+                    f"Comment {offset + 1}",
+                    oldest + timedelta(seconds=rng.randrange(int(COMMENT_AGE.total_seconds()))),
+                )
+        _insert(Comment, ["id", "task_id", "author_id", "content", "created_at"], comments(), batch_size)
+        log(f"{comment_count} comments")
+
+        if search.is_available():
+            # one pass over the new rows is far cheaper than a trigger per row
+            search.index_new_rows(first_task, first_comment)
+        Task.objects.filter(pk__gte=first_task).refresh_comments_count()
+        boards = Board.objects.filter(pk__gte=first_board)
+        boards.refresh_counters()
+        list_cache.bump_boards(board_ids)
+        # deltas from before the seed are meaningless, clients reload instead
+        boards.bump_version()
+        boards.update(log_floor=F("version"))
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [User, Board, Task, Comment]):
+                cursor.execute(sql)
+
+    return SeedResult(user_ids=user_ids, board_ids=board_ids, tasks=task_count, comments=comment_count)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,11 +50,13 @@ INSTALLED_APPS = [
     "auth_app",
     "boards_app",
     "tasks_app",
+    "core",
   
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    "core.middleware.ReplicaRoutingMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -61,10 +64,13 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "corsheaders.middleware.CorsMiddleware",
+    "core.middleware.AsyncReadRoutingMiddleware",
 
 ]
 
 ROOT_URLCONF = 'core.urls'
+# GET/HEAD requests under ASGI are resolved here (async read views); None disables.
+ASYNC_READ_URLCONF = "core.async_urls"
 
 TEMPLATES = [
     {
@@ -91,6 +97,35 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # WAL: long reads (board exports run in one read transaction) do not block writers
+        'OPTIONS': {'init_command': 'PRAGMA journal_mode=WAL;'},
+    }
+}
+
+# Read replicas: KANMIND_READ_REPLICAS="replica1.sqlite3,replica2.sqlite3" adds one
+# alias per file (replica1, replica2, ...). GET/HEAD requests read from them, see core.db_router.
+READ_REPLICAS = []
+for number, name in enumerate(filter(None, os.environ.get("KANMIND_READ_REPLICAS", "").split(",")), start=1):
+    DATABASES[f"replica{number}"] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    READ_REPLICAS.append(f"replica{number}")
+DATABASE_ROUTERS = ["core.db_router.ReadReplicaRouter"]
+READ_REPLICA_MAX_LAG = 2.0  # seconds behind the primary before a replica is skipped
+READ_REPLICA_PROBE_INTERVAL = 1.0  # seconds between lag probes per replica and process
+READ_REPLICA_STICKY_SECONDS = 10  # a client reads from the primary this long after its own write
+READ_REPLICA_CACHE_ALIAS = "default"
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'kanmind',
     }
 }
 
@@ -139,10 +174,70 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = "auth_app.User"
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "auth_app.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetCursorPagination",
+    "PAGE_SIZE": 50,
+    # orjson when installed, DRF's json code otherwise (core.renderers)
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
+# Board details with at least this many tasks stream their task list
+# (core.renderers.StreamedRows), encoding JSON_STREAMING_CHUNK_SIZE rows at a time.
+JSON_STREAMING_MIN_ROWS = 1000
+JSON_STREAMING_CHUNK_SIZE = 2000
+# GET /api/boards/{id}/export/: rows fetched per query and bytes per sent chunk.
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_BUFFER_BYTES = 64 * 1024
+# POST /api/boards/import/: records per transaction, emails per user lookup
+# and the number of row errors listed in the report (all are counted).
+IMPORT_CHUNK_SIZE = 5000
+IMPORT_EMAIL_BATCH = 500
+IMPORT_MAX_ERRORS = 1000
+# Token -> user cache used by CachedTokenAuthentication. Deleting a token or
+# deactivating a user evicts the entry only in the cache of the process that
+# did it: with "default" (local memory) and several workers, the others keep
+# accepting it for up to TOKEN_AUTH_CACHE_TTL seconds. Point the alias at a
+# shared backend (e.g. FileBasedCache) to revoke everywhere at once.
+TOKEN_AUTH_CACHE_ALIAS = "default"
+TOKEN_AUTH_CACHE_TTL = 5
+# Hard cap for ?page_size= on paginated list endpoints.
+API_MAX_PAGE_SIZE = 200
+# Upper limit for POST /api/tasks/bulk/.
+TASK_BULK_MAX_OPERATIONS = 500
+# Card positions (tasks_app.positions): a column whose ranks grow longer than
+# this is rebalanced after the commit, on this many background threads (0: inline).
+TASK_POSITION_REBALANCE_LENGTH = 12
+TASK_POSITION_REBALANCE_WORKERS = 1
+# Live board events (GET /api/boards/{id}/events/, ASGI only).
+BOARD_EVENTS_QUEUE_SIZE = 100
+BOARD_EVENTS_MAX_SUBSCRIBERS = 10000
+BOARD_EVENTS_HEARTBEAT = 15
+# Per-process board membership cache (boards_app.membership).
+BOARD_ACCESS_CACHE_SIZE = 10000
+BOARD_ACCESS_CACHE_TTL = 60
+# GET /api/boards/ response cache (boards_app.list_cache). "default" (local
+# memory) is only correct with a single worker process: invalidations do not
+# reach other workers, which then serve stale lists for up to
+# BOARD_LIST_CACHE_TTL seconds. With several workers use a shared backend
+# (e.g. FileBasedCache).
+BOARD_LIST_CACHE_ALIAS = "default"
+BOARD_LIST_CACHE_TTL = 300
+# single flight: how long concurrent misses wait for the first one, and how often they look
+BOARD_LIST_CACHE_LOCK_TIMEOUT = 5
+BOARD_LIST_CACHE_POLL_INTERVAL = 0.02
+# Password hashing for login/registration (auth_app.hashing): threads in
+# the pool and hashing jobs allowed to run or wait before answering 503.
+AUTH_HASHER_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+AUTH_HASHER_MAX_PENDING = 64
 # APPEND_SLASH = True
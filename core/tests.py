@@ -0,0 +1,277 @@
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import Count
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from boards_app.membership import clear_board_access_cache
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+
+from boards_app.models import Board
+from core import benchmark, db_router, index_advisor, renderers
+from core.readers import ValuesReader
+from core.renderers import FastJSONRenderer, StreamedRows, iter_json
+from core.seeding import Range, SeedPlan, seed
+from tasks_app.models import Comment, Task
+
+User = get_user_model()
+
+
+class QueryBudgetTests(TestCase):
+    """Runs the benchmark workload on a tiny dataset against the stored query budgets."""
+    def setUp(self):
+        clear_board_access_cache()
+        self.data = benchmark.seed_dataset(benchmark.SCALES["tiny"])
+
+    def test_every_api_route_has_a_benchmark_endpoint(self):
+        self.assertEqual(benchmark.uncovered_routes(), [])
+
+    def test_endpoints_stay_within_query_budgets(self):
+        results = benchmark.run_workload(self.data, repeat=2)
+        baseline = benchmark.load_baseline()
+
+        self.assertEqual(sorted(baseline["queries"]), sorted(results))
+        self.assertEqual(benchmark.check_budgets(results, baseline), [])
+
+    def test_budget_violations_are_reported(self):
+        results = {"GET boards-detail": {"queries": 9, "p50_ms": 1.0, "p95_ms": 30.0}}
+        baseline = {
+            "queries": {"GET boards-detail": 3},
+            "latency": {"tiny": {"GET boards-detail": {"p50_ms": 1.0, "p95_ms": 10.0}}},
+        }
+
+        violations = benchmark.check_budgets(results, baseline, "tiny", tolerance=0.5)
+
+        self.assertEqual(len(violations), 2)
+
+
+class IndexAdvisorTests(TestCase):
+    def test_workload_needs_no_further_indexes(self):
+        clear_board_access_cache()
+        data = benchmark.seed_dataset(benchmark.SCALES["tiny"])
+        log = index_advisor.QueryLog()
+        benchmark.run_workload(data, repeat=1, warmup=0, on_queries=log)
+
+        findings = index_advisor.analyze(connection, log)
+
+        self.assertTrue(log.statements)
+        self.assertEqual(index_advisor.proposals(findings), [])
+
+    def test_full_scan_gets_a_verified_index_proposal(self):
+        with CaptureQueriesContext(connection) as captured:
+            list(Task.objects.filter(status="done"))
+        statements = [(captured.captured_queries[0]["sql"], {"GET example"})]
+
+        findings = index_advisor.analyze(connection, statements)
+
+        self.assertEqual([(f.kind, f.table) for f in findings], [("full scan", "tasks_app_task")])
+        proposal = findings[0].proposal
+        self.assertIs(proposal.model, Task)
+        self.assertEqual(proposal.index.fields, ["status"])
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, "tasks_app_task")
+        self.assertNotIn(index_advisor.PROBE_INDEX, constraints)
+
+
+class SeedKanmindTests(TestCase):
+    def test_seed_command_creates_consistent_data(self):
+        call_command(
+            "seed_kanmind",
+            "--users", "20",
+            "--boards", "4",
+            "--members-per-board", "2-5",
+            "--tasks-per-board", "10",
+            "--comments-per-task", "1.5",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Board.objects.count(), 4)
+        self.assertEqual(Task.objects.count(), 40)
+        self.assertEqual(Comment.objects.count(), 60)
+        self.assertFalse(Board.objects.out_of_sync().exists())
+        self.assertFalse(Task.objects.comments_out_of_sync().exists())
+        self.assertTrue(self.client.login(email=User.objects.first().email, password="KanMind-Seed-1!"))
+
+    def test_seed_is_deterministic(self):
+        plan = SeedPlan(15, 3, Range(1, 4), Range(2, 9), 3.0, 1.0, seed=7)
+
+        def shape(result):
+            tasks = Task.objects.filter(board_id__in=result.board_ids).order_by("pk")
+            return (
+                list(tasks.values_list("title", "status", "priority")),
+                list(tasks.annotate(n=Count("comments")).values_list("n", flat=True)),
+            )
+
+        self.assertEqual(shape(seed(plan)), shape(seed(plan)))
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="me@test.com", fullname="Me", password="MePass123!")
+        self.peer = User.objects.create_user(email="peer@test.com", fullname="Peer", password="PeerPass123!")
+        self.board = Board.objects.create(title="Mine", owner=self.user)
+        shared = Board.objects.create(title="Shared", owner=self.peer)
+        shared.members.add(self.user)
+        Board.objects.create(title="Foreign", owner=self.peer)
+        today = timezone.localdate()
+        def task(title, status="to-do", **fields):
+            return Task.objects.create(
+                board=self.board, title=title, status=status, priority="low", created_by=self.peer, **fields
+            )
+        task("late", assignee=self.user, reviewer=self.peer, due_date=today - timedelta(days=1))
+        task("today", assignee=self.user, due_date=today)
+        task("late but done", assignee=self.user, due_date=today - timedelta(days=3), status="done")
+        task("review", assignee=self.peer, reviewer=self.user, due_date=today - timedelta(days=1))
+        task("other", assignee=self.peer)
+        self.token = Token.objects.create(user=self.user)
+
+    def test_dashboard_combines_the_lists_in_fixed_queries(self):
+        headers = {"Authorization": "Token " + self.token.key}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/dashboard/", headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        # token, boards, tasks, users
+        self.assertEqual(len(queries.captured_queries), 4)
+        self.assertEqual([board["title"] for board in response.data["boards"]], ["Mine", "Shared"])
+        self.assertEqual(
+            response.data["assigned_to_me"],
+            self.client.get("/api/tasks/assigned-to-me/", headers=headers).data,
+        )
+        self.assertEqual(response.data["reviewing"], self.client.get("/api/tasks/reviewing/", headers=headers).data)
+        self.assertEqual(response.data["overdue_count"], 1)
+        self.assertEqual(response.data["due_this_week_count"], 1)
+
+    def test_dashboard_requires_authentication(self):
+        self.assertEqual(self.client.get("/api/dashboard/").status_code, 401)
+
+
+class ValuesReaderTests(TestCase):
+    def test_readers_match_their_serializers(self):
+        benchmark.seed_dataset(benchmark.SCALES["tiny"])
+        task = Task.objects.first()
+        Task.objects.filter(pk=task.pk).update(due_date="2026-01-31", assignee=None)
+
+        # raises BenchmarkError on any difference
+        results = benchmark.run_reader_comparison(rows=100, repeat=1)
+
+        self.assertEqual(set(results), {"tasks", "boards"})
+
+    def test_unsupported_fields_are_rejected(self):
+        class CommentCountSerializer(serializers.ModelSerializer):
+            comments = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+            class Meta:
+                model = Task
+                fields = ["id", "comments"]
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesReader(CommentCountSerializer).columns
+
+
+class FastJSONTests(TestCase):
+    data = {
+        "text": "Zażółć \u2028 \"quoted\"",
+        "when": datetime(2026, 5, 1, 12, 30, tzinfo=dt_timezone.utc),
+        "day": date(2026, 5, 1),
+        "amount": Decimal("1.50"),
+        "id": uuid.UUID(int=7),
+        "big": 2**70,
+        1: [None, True, 0.5],
+    }
+
+    def test_renderer_matches_drf(self):
+        expected = JSONRenderer().render(self.data)
+        self.assertEqual(FastJSONRenderer().render(self.data), expected)
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(FastJSONRenderer().render(self.data), expected)
+        indented = "application/json; indent=2"
+        self.assertEqual(FastJSONRenderer().render(self.data, indented), JSONRenderer().render(self.data, indented))
+
+    def test_streamed_rows_are_encoded_in_chunks(self):
+        rows = StreamedRows(iter(range(5)), lambda batch: [{"n": n} for n in batch if n], chunk_size=2)
+        chunks = list(iter_json({"before": 1, "rows": rows, "empty": StreamedRows([]), "after": 2}))
+
+        self.assertEqual(
+            b"".join(chunks),
+            JSONRenderer().render({"before": 1, "rows": [{"n": n} for n in range(1, 5)], "empty": [], "after": 2}),
+        )
+        self.assertGreater(len(chunks), 4)
+
+    def test_parser_rejects_invalid_json(self):
+        user = User.objects.create_user(email="p@test.com", fullname="P", password="PPass123!")
+        headers = {"Authorization": "Token " + Token.objects.create(user=user).key}
+
+        response = self.client.post("/api/boards/", b'{"title": NaN}', content_type="application/json", headers=headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post("/api/boards/", b'{"title": "Parsed"}', content_type="application/json",
+                                    headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["title"], "Parsed")
+
+
+@override_settings(READ_REPLICAS=["replica1"], READ_REPLICA_MAX_LAG=2.0, READ_REPLICA_PROBE_INTERVAL=60)
+class ReadReplicaRouterTests(SimpleTestCase):
+    """Routing decisions only; replica lag is preset instead of probed."""
+    def setUp(self):
+        caches["default"].clear()
+        self.set_lag(0.0)
+        self.router = db_router.ReadReplicaRouter()
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        db_router.forget_probes()
+
+    def set_lag(self, seconds):
+        db_router._probes["replica1"] = (time.monotonic(), seconds)
+
+    def reads(self, method="get", token="alice", write=False, model=Board):
+        request = getattr(self.factory, method)("/api/boards/", HTTP_AUTHORIZATION=f"Token {token}")
+        state = db_router.begin_request(request)
+        try:
+            if write:
+                self.router.db_for_write(Board)
+            return self.router.db_for_read(model)
+        finally:
+            db_router.end_request(state)
+
+    def test_safe_requests_read_from_a_replica(self):
+        self.assertEqual(self.reads(), "replica1")
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(self.router.db_for_read(Board), "default")
+
+    def test_client_reads_its_own_writes(self):
+        self.assertEqual(self.reads("post"), "default")
+
+        self.assertEqual(self.reads(), "default")
+        self.assertEqual(self.reads(token="bob"), "replica1")
+
+    def test_write_during_safe_request_pins_the_primary(self):
+        self.assertEqual(self.reads(write=True), "default")
+        self.assertEqual(self.reads(), "default")
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.set_lag(5.0)
+
+        self.assertEqual(self.reads(), "default")
+
+    def test_tokens_are_read_from_the_primary(self):
+        self.assertEqual(self.reads(model=Token), "default")
+
+    @override_settings(READ_REPLICAS=[])
+    def test_without_replicas_everything_uses_the_primary(self):
+        self.assertEqual(self.reads(), "default")
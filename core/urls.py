@@ -17,11 +17,15 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import DashboardView, MetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("auth_app.api.urls")),
     path("api/", include("boards_app.api.urls")),
     path("api/", include("tasks_app.api.urls")),
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
+    path("api/dashboard/", DashboardView.as_view(), name="dashboard"),
    
 
 ]  
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from boards_app.api.serializers import BoardListSerializer
+from boards_app.models import Board
+from core import metrics
+from tasks_app.api.serializers import TaskSerializer
+from tasks_app.models import Task
+
+User = get_user_model()
+
+
+class MetricsView(APIView):
+    """
+    GET /api/metrics/
+    Returns the in-process counters of the serving worker.
+    Permissions: staff only
+    """
+    permission_classes = [IsAdminUser]
+    def get(self, request):
+        return Response(metrics.snapshot())
+
+
+class DashboardView(APIView):
+    """
+    GET /api/dashboard/
+    Boards, assigned and reviewing tasks of the current user in one response,
+    plus how many assigned open tasks are overdue or due this week (up to Sunday).
+
+    At most three queries: boards, tasks of both lists, and the users they
+    reference. The current user is never looked up again.
+    """
+    permission_classes = [IsAuthenticated]
+    def get(self, request):
+        user = request.user
+        boards = Board.objects.filter(Q(owner=user) | Q(id__in=user.boards.values("id")))
+        tasks = list(Task.objects.filter(Q(assignee=user) | Q(reviewer=user)).order_by("id"))
+        self.attach_users(tasks, user)
+
+        assigned = [task for task in tasks if task.assignee_id == user.pk]
+        reviewing = [task for task in tasks if task.reviewer_id == user.pk]
+        today = timezone.localdate()
+        week_end = today + timedelta(days=6 - today.weekday())
+        open_due = [task.due_date for task in assigned if task.due_date and task.status != "done"]
+        return Response({
+            "boards": BoardListSerializer(boards, many=True).data,
+            "assigned_to_me": TaskSerializer(assigned, many=True).data,
+            "reviewing": TaskSerializer(reviewing, many=True).data,
+            "overdue_count": sum(due < today for due in open_due),
+            "due_this_week_count": sum(today <= due <= week_end for due in open_due),
+        })
+    def attach_users(self, tasks, user):
+        """Sets assignee and reviewer of the tasks from one shared user lookup."""
+        ids = {task.assignee_id for task in tasks} | {task.reviewer_id for task in tasks}
+        ids -= {None, user.pk}
+        users = User.objects.only("id", "email", "fullname").in_bulk(ids) if ids else {}
+        users[user.pk] = user
+        for task in tasks:
+            if task.assignee_id is not None:
+                task.assignee = users[task.assignee_id]
+            if task.reviewer_id is not None:
+                task.reviewer = users[task.reviewer_id]
@@ -0,0 +1,59 @@
+from django.db.models import Count, Max
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.response import Response
+
+from boards_app.membership import ais_board_member
+from core.async_views import AsyncReadView
+from core.conditional import etag_matches, make_etag, not_modified
+from tasks_app.models import Comment, Task
+from .serializers import CommentSerializer
+from .views import AssignedToMeView, ConditionalTaskListView, ReviewingView, TaskCommentListCreateView
+
+
+class AsyncConditionalTaskListView(AsyncReadView):
+    """Async ConditionalTaskListView: tasks of the current user by `user_field`, with ETag."""
+    user_field = None
+    async def get(self, request):
+        tasks = Task.objects.filter(**{self.user_field: request.user})
+        stamp = await tasks.aaggregate(tasks=Count("id"), version=Max("board__version"))
+        etag = make_etag(self.user_field, request.user.pk, stamp["tasks"], stamp["version"], request=request)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        reader = ConditionalTaskListView.values_reader
+        rows = [row async for row in reader.values(tasks)]
+        return Response(reader.read(rows), headers={"ETag": etag})
+
+
+class AsyncAssignedToMeView(AsyncConditionalTaskListView):
+    """
+    GET /api/tasks/assigned-to-me/ under ASGI
+    """
+    user_field = "assignee"
+    sync_view = AssignedToMeView.as_view()
+
+
+class AsyncReviewingView(AsyncConditionalTaskListView):
+    """
+    GET /api/tasks/reviewing/ under ASGI
+    """
+    user_field = "reviewer"
+    sync_view = ReviewingView.as_view()
+
+
+class AsyncTaskCommentListView(AsyncReadView):
+    """
+    GET /api/tasks/<task_id>/comments/ under ASGI.
+    POST and paginated requests are served by TaskCommentListCreateView.
+    """
+    sync_view = TaskCommentListCreateView.as_view()
+    async def get(self, request, task_id):
+        board_id = await Task.objects.filter(pk=task_id).values_list("board_id", flat=True).afirst()
+        if board_id is None:
+            raise NotFound("No Task matches the given query.")
+        if not await ais_board_member(request.user, board_id):
+            raise PermissionDenied("You do not have access to this task.")
+        comments = [
+            comment async for comment in
+            Comment.objects.filter(task_id=task_id).select_related("author").order_by("created_at", "id")
+        ]
+        return Response(CommentSerializer(comments, many=True).data)
@@ -0,0 +1,212 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework import status
+
+from boards_app.membership import get_board_access
+from boards_app.models import Board
+from tasks_app.models import Task
+from tasks_app.positions import append_positions
+from tasks_app.signals import tasks_bulk_written
+from .serializers import TaskBulkItemSerializer, TaskSerializer
+
+User = get_user_model()
+
+OPERATIONS = ("create", "update", "delete")
+NOT_APPLIED = {
+    "status": status.HTTP_424_FAILED_DEPENDENCY,
+    "detail": "Not applied because another operation failed.",
+}
+
+
+class TaskBulkOperation:
+    """
+    Validates and applies a list of task operations (POST /api/tasks/bulk/):
+
+        [
+            {"op": "create", "data": {"board": 1, "title": "...", "status": "to-do", "priority": "low"}},
+            {"op": "update", "id": 5, "data": {"status": "done", "assignee_id": 3}},
+            {"op": "delete", "id": 7}
+        ]
+
+    Referenced tasks, boards, users and memberships are loaded with a fixed
+    number of queries, whatever the number of operations. Either all
+    operations are applied in one transaction or none is; `results` holds
+    one entry per operation in both cases.
+    """
+    def __init__(self, operations, request):
+        self.operations = operations
+        self.request = request
+        self.results = []
+        self._items = []
+
+    # validation
+    def is_valid(self):
+        self._items = [self._parse(operation) for operation in self.operations]
+        self._reject_duplicate_ids()
+        self._load_references()
+        for item in self._items:
+            if "errors" not in item:
+                self._check_references(item)
+        failed = any("errors" in item for item in self._items)
+        if failed:
+            self.results = [
+                {"op": item["op"], "status": item["status"], "errors": item["errors"]}
+                if "errors" in item else {"op": item["op"], **NOT_APPLIED}
+                for item in self._items
+            ]
+        return not failed
+    def _fail(self, item, errors, code=status.HTTP_400_BAD_REQUEST):
+        item["errors"] = errors
+        item["status"] = code
+        return item
+    def _parse(self, operation):
+        if not isinstance(operation, dict):
+            return self._fail({"op": None}, {"non_field_errors": ["Expected an object."]})
+        item = {"op": operation.get("op")}
+        if item["op"] not in OPERATIONS:
+            return self._fail(item, {"op": [f"Must be one of: {', '.join(OPERATIONS)}."]})
+        if item["op"] != "create":
+            task_id = operation.get("id")
+            if not isinstance(task_id, int) or isinstance(task_id, bool):
+                return self._fail(item, {"id": ["A valid integer is required."]})
+            item["id"] = task_id
+        if item["op"] == "delete":
+            return item
+        serializer = TaskBulkItemSerializer(
+            data=operation.get("data"),
+            partial=item["op"] == "update",
+            context={"request": self.request},
+        )
+        if not serializer.is_valid():
+            return self._fail(item, serializer.errors)
+        item["data"] = dict(serializer.validated_data)
+        if item["op"] == "update":
+            # the board of a task cannot be changed, as in TaskSerializer.update
+            item["data"].pop("board", None)
+        return item
+    def _reject_duplicate_ids(self):
+        seen = set()
+        for item in self._items:
+            if "id" not in item or "errors" in item:
+                continue
+            if item["id"] in seen:
+                self._fail(item, {"id": ["Task appears in more than one operation."]})
+            seen.add(item["id"])
+    def _load_references(self):
+        valid = [item for item in self._items if "errors" not in item]
+        task_ids = {item["id"] for item in valid if "id" in item}
+        self._tasks = (
+            Task.objects.select_related("assignee", "reviewer").in_bulk(task_ids)
+            if task_ids else {}
+        )
+
+        board_ids = {task.board_id for task in self._tasks.values()}
+        board_ids.update(item["data"]["board"] for item in valid if item["op"] == "create")
+        self._boards = Board.objects.only("id", "owner_id").in_bulk(board_ids) if board_ids else {}
+
+        user_ids = {
+            item["data"][field]
+            for item in valid if "data" in item
+            for field in ("assignee_id", "reviewer_id")
+            if item["data"].get(field) is not None
+        }
+        self._users = User.objects.in_bulk(user_ids) if user_ids else {}
+        self._memberships = set(
+            Board.members.through.objects
+            .filter(board_id__in=board_ids, user_id__in=user_ids)
+            .values_list("board_id", "user_id")
+        ) if board_ids and user_ids else set()
+        self._access = get_board_access(self.request.user)
+    def _check_references(self, item):
+        if item["op"] == "create":
+            board = self._boards.get(item["data"]["board"])
+            if board is None:
+                return self._fail(item, {"board": ["Board does not exist."]})
+            if not self._access.has_board(board.id):
+                return self._fail(item, {"board": ["You must be a member of this board."]})
+        else:
+            task = self._tasks.get(item["id"])
+            if task is None:
+                return self._fail(item, {"detail": "Not found."}, status.HTTP_404_NOT_FOUND)
+            board = self._boards[task.board_id]
+            allowed = (
+                task.created_by_id == self.request.user.id or self._access.owns(board.id)
+                if item["op"] == "delete" else self._access.has_board(board.id)
+            )
+            if not allowed:
+                return self._fail(item, {"detail": "Forbidden."}, status.HTTP_403_FORBIDDEN)
+        item["board"] = board
+        if item["op"] == "delete":
+            return item
+        errors = {}
+        for field in ("assignee_id", "reviewer_id"):
+            user_id = item["data"].get(field)
+            if user_id is None:
+                continue
+            if user_id not in self._users:
+                errors[field] = ["User does not exist."]
+            elif not (board.owner_id == user_id or (board.id, user_id) in self._memberships):
+                errors[field] = ["Assignee/Reviewer must be member of the board."]
+        if errors:
+            return self._fail(item, errors)
+        return item
+
+    # saving
+    def _user(self, user_id):
+        return None if user_id is None else self._users[user_id]
+    def _apply_fields(self, task, data):
+        changed = set()
+        for field, value in data.items():
+            if field in ("assignee_id", "reviewer_id"):
+                field, value = field[:-3], self._user(value)
+            setattr(task, field, value)
+            changed.add(field)
+        return changed
+    def save(self):
+        """Applies all operations atomically and returns the per-operation results."""
+        created, updated, deleted_ids, changed_fields = [], [], [], set()
+        for item in self._items:
+            if item["op"] == "create":
+                data = dict(item["data"])
+                del data["board"]
+                task = Task(board=item["board"], created_by=self.request.user)
+                self._apply_fields(task, data)
+                item["task"] = task
+                created.append(task)
+            elif item["op"] == "update":
+                task = self._tasks[item["id"]]
+                changed_fields |= self._apply_fields(task, item["data"])
+                item["task"] = task
+                updated.append(task)
+            else:
+                deleted_ids.append(item["id"])
+
+        # new tasks and tasks moved to another column go to the end of the column
+        moved = [task for task in updated if task.changed_column()]
+        if moved:
+            changed_fields.add("position")
+
+        with transaction.atomic():
+            append_positions(created + moved)
+            Task.objects.bulk_create(created)
+            if updated and changed_fields:
+                Task.objects.bulk_update(updated, sorted(changed_fields))
+            if deleted_ids:
+                Task.objects.filter(pk__in=deleted_ids).delete()
+            tasks_bulk_written.send(
+                sender=Task,
+                board_ids={item["board"].id for item in self._items},
+                task_ids=[task.pk for task in created + updated],
+            )
+
+        self.results = []
+        for item in self._items:
+            if item["op"] == "delete":
+                self.results.append({"op": "delete", "status": status.HTTP_204_NO_CONTENT, "id": item["id"]})
+            else:
+                self.results.append({
+                    "op": item["op"],
+                    "status": status.HTTP_201_CREATED if item["op"] == "create" else status.HTTP_200_OK,
+                    "task": TaskSerializer(item["task"], context={"request": self.request}).data,
+                })
+        return self.results
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from boards_app.membership import is_board_member
 from boards_app.models import Board
 from tasks_app.models import Task, Comment
 
@@ -56,10 +57,11 @@ class TaskSerializer(serializers.ModelSerializer):
             "reviewer_id",
             "due_date",
             "comments_count",
+            "position",
         ]
     def validate_board(self, value: Board):
         user = self.context["request"].user
-        if not (value.owner_id == user.id or value.members.filter(id=user.id).exists()):
+        if not is_board_member(user, value.id):
             raise serializers.ValidationError("You must be a member of this board.")
         return value
     def _validate_user_is_board_member(self, board: Board, user_id):
@@ -69,7 +71,7 @@ class TaskSerializer(serializers.ModelSerializer):
             user = User.objects.get(id=user_id)
         except User.DoesNotExist:
             raise serializers.ValidationError("User does not exist.")
-        if not (board.owner_id == user.id or board.members.filter(id=user.id).exists()):
+        if not is_board_member(user, board.id):
             raise serializers.ValidationError("Assignee/Reviewer must be member of the board.")
         return user
     def create(self, validated_data):
@@ -102,3 +104,24 @@ class TaskSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
     comments_count = serializers.IntegerField(read_only=True)
+
+
+class TaskBulkItemSerializer(TaskSerializer):
+    """
+    Field validation for one item of POST /api/tasks/bulk/.
+    Board, assignee and reviewer references are checked in batches
+    by tasks_app.api.bulk.TaskBulkOperation.
+    """
+    board = serializers.IntegerField()
+    def validate_board(self, value):
+        return value
+
+
+class TaskMoveSerializer(serializers.Serializer):
+    """
+    Body of POST /api/tasks/{id}/move/: the target column (default: the
+    current one) and the ids of the cards directly above and/or below.
+    """
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    after = serializers.IntegerField(required=False, allow_null=True)
+    before = serializers.IntegerField(required=False, allow_null=True)
@@ -1,58 +1,141 @@
-from django.db.models import Count, Q
+from django.db.models import Count, Max, Q
 from django.shortcuts import get_object_or_404
+from django.conf import settings
 from rest_framework import status, generics
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
-from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
+from boards_app.membership import get_board_access, is_board_member
+from core.conditional import etag_matches, make_etag, not_modified
+from core.pagination import CreatedAtKeysetPagination
+from core.readers import ValuesListMixin, ValuesReader
+from tasks_app import search
 from tasks_app.models import Task, Comment
+from tasks_app.positions import ColumnError, move_task
+from .bulk import TaskBulkOperation
 from .permissions import IsTaskBoardMember
-from .serializers import TaskSerializer, CommentSerializer
+from .serializers import TaskSerializer, CommentSerializer, TaskMoveSerializer
 
-class TaskViewSet(ModelViewSet):
+class TaskViewSet(ValuesListMixin, ModelViewSet):
     """
     POST /api/tasks/
     PATCH /api/tasks/{task_id}/
     DELETE /api/tasks/{task_id}/
+    POST /api/tasks/{task_id}/move/
+    POST /api/tasks/bulk/
+    GET /api/tasks/search/?q=
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsTaskBoardMember]
+    values_reader = ValuesReader(TaskSerializer)
     def get_queryset(self):
         return (
         Task.objects
         .all()
-        .annotate(comments_count=Count("comments", distinct=True))
+        .select_related("assignee", "reviewer")
     )
     def destroy(self, request, *args, **kwargs):
         task = self.get_object()
-        if not (task.created_by_id == request.user.id or task.board.owner_id == request.user.id):
+        if not (task.created_by_id == request.user.id or get_board_access(request.user).owns(task.board_id)):
             return Response({"detail": "Forbidden."}, status=status.HTTP_403_FORBIDDEN)
         return super().destroy(request, *args, **kwargs)
+    @action(detail=True, methods=["post"], url_path="move")
+    def move(self, request, pk=None):
+        """
+        Moves the task into `status` (default: its column), directly below the
+        task `after` and/or above the task `before`; neither puts it at the end.
+        Status and position change together and only this task is written.
+        """
+        task = self.get_object()
+        serializer = TaskMoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            move_task(task, data.get("status", task.status), data.get("after"), data.get("before"))
+        except ColumnError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(task).data)
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Applies a list of create/update/delete operations in one transaction.
+        Returns one result per operation; nothing is applied if any fails.
+        """
+        operations = request.data
+        if not isinstance(operations, list):
+            return Response({"detail": "Expected a list of operations."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(operations) > settings.TASK_BULK_MAX_OPERATIONS:
+            return Response(
+                {"detail": f"At most {settings.TASK_BULK_MAX_OPERATIONS} operations per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        bulk = TaskBulkOperation(operations, request)
+        if not bulk.is_valid():
+            return Response(bulk.results, status=status.HTTP_400_BAD_REQUEST)
+        return Response(bulk.save(), status=status.HTTP_200_OK)
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        """
+        Tasks on the user's boards matching all words of `q` in title,
+        description or comments, best match first (at most `limit`, default 20).
+        """
+        if not search.is_available():
+            return Response({"detail": "Search requires SQLite FTS5."}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        text = request.query_params.get("q", "")
+        if not search.terms(text):
+            return Response({"q": ["Enter at least one word."]}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get("limit", 20)), settings.API_MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"limit": ["A valid integer is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        ranked = search.search_task_ids(text, get_board_access(request.user).board_ids, max(limit, 1))
+        tasks = self.get_queryset().in_bulk([task_id for task_id, _ in ranked])
+        results = [tasks[task_id] for task_id, _ in ranked if task_id in tasks]
+        return Response(self.get_serializer(results, many=True).data)
 
-class AssignedToMeView(APIView):
+class ConditionalTaskListView(ValuesListMixin, generics.ListAPIView):
     """
-    GET /api/tasks/assigned-to-me/
+    Task list of the current user filtered by `user_field`, with ETag support.
+
+    The ETag is built from the number of listed tasks and the highest
+    version of their boards. Board versions come from one global increasing
+    sequence, so any write to a listed task, a task joining the list or a
+    comment on it raises the maximum, and a task leaving the list lowers
+    the count.
     """
+    serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
-    def get(self, request):
-        qs = Task.objects.filter(assignee=request.user).annotate(
-            comments_count=Count("comments", distinct=True)
+    values_reader = ValuesReader(TaskSerializer)
+    user_field = None
+    def get_user_tasks(self):
+        return Task.objects.filter(**{self.user_field: self.request.user})
+    def get_queryset(self):
+        return (
+            self.get_user_tasks()
+            .select_related("assignee", "reviewer")
         )
-        serializer = TaskSerializer(qs, many=True, context={"request": request})
-        return Response(serializer.data)
+    def list(self, request, *args, **kwargs):
+        stamp = self.get_user_tasks().aggregate(tasks=Count("id"), version=Max("board__version"))
+        etag = make_etag(self.user_field, request.user.pk, stamp["tasks"], stamp["version"], request=request)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response = super().list(request, *args, **kwargs)
+        response["ETag"] = etag
+        return response
+
+class AssignedToMeView(ConditionalTaskListView):
+    """
+    GET /api/tasks/assigned-to-me/
+    """
+    user_field = "assignee"
 
-class ReviewingView(APIView):
+class ReviewingView(ConditionalTaskListView):
     """
     GET /api/tasks/reviewing/
     """
-    permission_classes = [IsAuthenticated]
-    def get(self, request):
-        qs = Task.objects.filter(reviewer=request.user).annotate(
-            comments_count=Count("comments", distinct=True)
-        )
-        serializer = TaskSerializer(qs, many=True, context={"request": request})
-        return Response(serializer.data)
+    user_field = "reviewer"
 
 class TaskCommentListCreateView(generics.ListCreateAPIView):
     """
@@ -61,18 +144,21 @@ class TaskCommentListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
     def get_queryset(self):
-        task = get_object_or_404(Task, id=self.kwargs["task_id"])
-        if not (
-        task.board.owner == self.request.user or
-        task.board.members.filter(id=self.request.user.id).exists()
-        ):
-         raise PermissionDenied("You do not have access to this task.")
-        return Comment.objects.filter(task=task).order_by("created_at")  
+        # only the board id is needed for the (cached) membership check
+        board_id = get_object_or_404(Task.objects.values_list("board_id", flat=True), id=self.kwargs["task_id"])
+        if not is_board_member(self.request.user, board_id):
+            raise PermissionDenied("You do not have access to this task.")
+        return (
+            Comment.objects
+            .filter(task_id=self.kwargs["task_id"])
+            .select_related("author")
+            .order_by("created_at", "id")
+        )
     def perform_create(self, serializer):
         task = get_object_or_404(Task, id=self.kwargs["task_id"])
-        if not (task.board.owner == self.request.user or
-                self.request.user in task.board.members.all()):
+        if not is_board_member(self.request.user, task.board_id):
             raise PermissionDenied("You do not have access to this task.")
         serializer.save(
             author=self.request.user,
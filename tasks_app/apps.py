@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.db.models.signals import pre_migrate
 
 class TasksAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks_app'
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import search
+        pre_migrate.connect(search.wrap_search_table_migrations, sender=self)
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Max, Min, Q
+from django.db.models.functions import Length
+
+from tasks_app.models import Task
+from tasks_app.positions import rebalance_column
+
+
+class Command(BaseCommand):
+    """
+    python manage.py rebalance_task_positions [--all] [--board ID ...]
+    Gives the cards of a column evenly spaced short positions, keeping their order.
+    By default only columns that need it are rebalanced: positions longer than
+    TASK_POSITION_REBALANCE_LENGTH, missing or shared by several cards.
+    """
+    help = "Rebalance the card positions of Kanban columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebalance every column, not only those that need it.",
+        )
+        parser.add_argument(
+            "--board",
+            type=int,
+            action="append",
+            dest="board_ids",
+            help="Restrict to the given board id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.all()
+        if options["board_ids"]:
+            tasks = tasks.filter(board_id__in=options["board_ids"])
+        columns = (
+            tasks.order_by("board_id", "status")
+            .values("board_id", "status")
+            .annotate(
+                cards=Count("id"),
+                positions=Count("position", distinct=True),
+                shortest=Min(Length("position")),
+                longest=Max(Length("position")),
+            )
+        )
+        if not options["all"]:
+            columns = columns.filter(
+                Q(longest__gt=settings.TASK_POSITION_REBALANCE_LENGTH)
+                | Q(shortest=0)
+                | Q(positions__lt=F("cards"))
+            )
+
+        rebalanced = updated = 0
+        for column in columns:
+            updated += rebalance_column(column["board_id"], column["status"])
+            rebalanced += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebalanced {rebalanced} column(s), {updated} task(s) updated."))
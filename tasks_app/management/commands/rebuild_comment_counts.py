@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks_app.models import Task
+
+
+class Command(BaseCommand):
+    """
+    python manage.py rebuild_comment_counts [--verify] [--task ID ...]
+    Recomputes the denormalized Task.comments_count from the comment table.
+    With --verify nothing is written; the command fails if any task is out of sync.
+    """
+    help = "Rebuild or verify the comments_count stored on Task."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report tasks whose comments_count is out of sync.",
+        )
+        parser.add_argument(
+            "--task",
+            type=int,
+            action="append",
+            dest="task_ids",
+            help="Restrict to the given task id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.all()
+        if options["task_ids"]:
+            tasks = tasks.filter(pk__in=options["task_ids"])
+
+        if options["verify"]:
+            broken = list(tasks.comments_out_of_sync().only("pk", "comments_count"))
+            for task in broken:
+                self.stdout.write(
+                    f"Task {task.pk}: stored comments_count={task.comments_count}; "
+                    f"counted comments_count={task.counted_comments_count}"
+                )
+            if broken:
+                raise CommandError(f"{len(broken)} task(s) have an out-of-sync comments_count.")
+            self.stdout.write(self.style.SUCCESS("All task comment counts are in sync."))
+            return
+
+        updated = tasks.refresh_comments_count()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt comments_count for {updated} task(s)."))
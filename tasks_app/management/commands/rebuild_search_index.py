@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks_app import search
+
+
+class Command(BaseCommand):
+    """
+    python manage.py rebuild_search_index
+    Re-indexes all tasks and comments for GET /api/tasks/search/. The index is
+    kept in sync by triggers; this repairs it, e.g. after restoring a backup
+    taken without the FTS tables.
+    """
+    help = "Rebuild the full-text index behind GET /api/tasks/search/."
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("The search index requires SQLite FTS5.")
+        tasks, comments = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {tasks} tasks and {comments} comments."))
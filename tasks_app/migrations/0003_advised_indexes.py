@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks_app', '0002_comment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['task', 'created_at'], name='tasks_app_c_task_id_3d251b_idx'),
+        ),
+    ]
@@ -0,0 +1,134 @@
+from django.db import migrations
+
+# Full-text index behind GET /api/tasks/search/ (see tasks_app.search).
+# Contentless FTS5 tables kept in sync by triggers; the `board` column
+# holds a "b<board id>" token so searches can be limited to boards.
+# Triggers must delete an entry with exactly the values it was indexed with.
+
+TABLE_SQL = [
+    """
+    CREATE VIRTUAL TABLE tasks_app_task_fts USING fts5(
+        title, description, board, content='', tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE tasks_app_comment_fts USING fts5(
+        content, board, content='', tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+]
+
+# Rebuilding tasks_app_task or tasks_app_comment (SQLite AlterField/AddField)
+# drops the triggers on it and fails on the others. tasks_app.search wraps
+# every later tasks_app migration of these tables in steps that drop the
+# triggers and recreate them (and rebuild the index), so they need no
+# DROP_TRIGGER_SQL/TRIGGER_SQL steps (0005 and 0006 still have them, which
+# is harmless).
+TRIGGER_SQL = [
+    """
+    CREATE TRIGGER tasks_app_task_fts_insert AFTER INSERT ON tasks_app_task BEGIN
+        INSERT INTO tasks_app_task_fts(rowid, title, description, board)
+        VALUES (new.id, new.title, new.description, 'b' || new.board_id);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_app_task_fts_update AFTER UPDATE OF title, description, board_id ON tasks_app_task
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description OR old.board_id IS NOT new.board_id
+    BEGIN
+        INSERT INTO tasks_app_task_fts(tasks_app_task_fts, rowid, title, description, board)
+        VALUES ('delete', old.id, old.title, old.description, 'b' || old.board_id);
+        INSERT INTO tasks_app_task_fts(rowid, title, description, board)
+        VALUES (new.id, new.title, new.description, 'b' || new.board_id);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_app_task_fts_move AFTER UPDATE OF board_id ON tasks_app_task
+    WHEN old.board_id IS NOT new.board_id
+    BEGIN
+        INSERT INTO tasks_app_comment_fts(tasks_app_comment_fts, rowid, content, board)
+        SELECT 'delete', id, content, 'b' || old.board_id FROM tasks_app_comment WHERE task_id = old.id;
+        INSERT INTO tasks_app_comment_fts(rowid, content, board)
+        SELECT id, content, 'b' || new.board_id FROM tasks_app_comment WHERE task_id = new.id;
+    END
+    """,
+    # comments of a deleted task leave the index with it; their own delete
+    # trigger below then finds no task and does nothing
+    """
+    CREATE TRIGGER tasks_app_task_fts_delete AFTER DELETE ON tasks_app_task BEGIN
+        INSERT INTO tasks_app_task_fts(tasks_app_task_fts, rowid, title, description, board)
+        VALUES ('delete', old.id, old.title, old.description, 'b' || old.board_id);
+        INSERT INTO tasks_app_comment_fts(tasks_app_comment_fts, rowid, content, board)
+        SELECT 'delete', id, content, 'b' || old.board_id FROM tasks_app_comment WHERE task_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_app_comment_fts_insert AFTER INSERT ON tasks_app_comment BEGIN
+        INSERT INTO tasks_app_comment_fts(rowid, content, board)
+        SELECT new.id, new.content, 'b' || board_id FROM tasks_app_task WHERE id = new.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_app_comment_fts_update AFTER UPDATE OF content, task_id ON tasks_app_comment
+    WHEN old.content IS NOT new.content OR old.task_id IS NOT new.task_id
+    BEGIN
+        INSERT INTO tasks_app_comment_fts(tasks_app_comment_fts, rowid, content, board)
+        SELECT 'delete', old.id, old.content, 'b' || board_id FROM tasks_app_task WHERE id = old.task_id;
+        INSERT INTO tasks_app_comment_fts(rowid, content, board)
+        SELECT new.id, new.content, 'b' || board_id FROM tasks_app_task WHERE id = new.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_app_comment_fts_delete AFTER DELETE ON tasks_app_comment BEGIN
+        INSERT INTO tasks_app_comment_fts(tasks_app_comment_fts, rowid, content, board)
+        SELECT 'delete', old.id, old.content, 'b' || board_id FROM tasks_app_task WHERE id = old.task_id;
+    END
+    """,
+]
+
+BACKFILL_SQL = [
+    """
+    INSERT INTO tasks_app_task_fts(rowid, title, description, board)
+    SELECT id, title, description, 'b' || board_id FROM tasks_app_task
+    """,
+    """
+    INSERT INTO tasks_app_comment_fts(rowid, content, board)
+    SELECT c.id, c.content, 'b' || t.board_id FROM tasks_app_comment c JOIN tasks_app_task t ON t.id = c.task_id
+    """,
+]
+
+CREATE_SQL = TABLE_SQL + TRIGGER_SQL + BACKFILL_SQL
+
+DROP_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS tasks_app_comment_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_app_comment_fts_update",
+    "DROP TRIGGER IF EXISTS tasks_app_comment_fts_insert",
+    "DROP TRIGGER IF EXISTS tasks_app_task_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_app_task_fts_move",
+    "DROP TRIGGER IF EXISTS tasks_app_task_fts_update",
+    "DROP TRIGGER IF EXISTS tasks_app_task_fts_insert",
+]
+
+DROP_SQL = DROP_TRIGGER_SQL + [
+    "DROP TABLE IF EXISTS tasks_app_comment_fts",
+    "DROP TABLE IF EXISTS tasks_app_task_fts",
+]
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks_app', '0003_advised_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_SQL), run(DROP_SQL)),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-18 04:07
+
+import importlib
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+search_index = importlib.import_module('tasks_app.migrations.0004_search_index')
+
+
+def populate_comments_count(apps, schema_editor):
+    Task = apps.get_model('tasks_app', 'Task')
+    Comment = apps.get_model('tasks_app', 'Comment')
+    rows = (
+        Comment.objects.filter(task=OuterRef('pk'))
+        .order_by().values('task').annotate(total=Count('pk')).values('total')
+    )
+    Task.objects.update(comments_count=Coalesce(Subquery(rows), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks_app', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            search_index.run(search_index.DROP_TRIGGER_SQL), search_index.run(search_index.TRIGGER_SQL)
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='comments_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            search_index.run(search_index.TRIGGER_SQL), search_index.run(search_index.DROP_TRIGGER_SQL)
+        ),
+        migrations.RunPython(populate_comments_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.15 on 2026-10-18 05:04
+
+import importlib
+import itertools
+
+from django.conf import settings
+from django.db import migrations, models
+
+from tasks_app.ranks import ranks_between
+
+search_index = importlib.import_module('tasks_app.migrations.0004_search_index')
+
+
+def populate_positions(apps, schema_editor):
+    # existing cards keep their id order within each column
+    Task = apps.get_model('tasks_app', 'Task')
+    rows = Task.objects.order_by('board_id', 'status', 'id').values_list('board_id', 'status', 'id')
+    for _, column in itertools.groupby(rows.iterator(chunk_size=2000), key=lambda row: row[:2]):
+        ids = [task_id for _, _, task_id in column]
+        tasks = [Task(pk=task_id, position=position) for task_id, position in zip(ids, ranks_between(None, None, len(ids)))]
+        Task.objects.bulk_update(tasks, ['position'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards_app', '0004_change_log'),
+        ('tasks_app', '0005_task_comments_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            search_index.run(search_index.DROP_TRIGGER_SQL), search_index.run(search_index.TRIGGER_SQL)
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='position',
+            field=models.CharField(default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(
+            search_index.run(search_index.TRIGGER_SQL), search_index.run(search_index.DROP_TRIGGER_SQL)
+        ),
+        migrations.RunPython(populate_positions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'status', 'position'], name='tasks_app_t_board_i_428b33_idx'),
+        ),
+    ]
@@ -1,12 +1,57 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from boards_app.models import Board
 
+
+class TaskQuerySet(models.QuerySet):
+    """
+    Helpers for the denormalized comments_count stored on Task.
+    The counter is maintained incrementally by signals; these methods
+    recompute it from the comment table.
+    """
+    def _counted_comments(self):
+        rows = (
+            Comment.objects
+            .filter(task=OuterRef("pk"))
+            .order_by()
+            .values("task")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return Coalesce(Subquery(rows), 0)
+    def comments_out_of_sync(self):
+        """Tasks whose stored comments_count differs from the recomputed one (as counted_comments_count)."""
+        return (
+            self.annotate(counted_comments_count=self._counted_comments())
+            .exclude(comments_count=F("counted_comments_count"))
+        )
+    def refresh_comments_count(self):
+        """Recomputes the stored comments_count in a single UPDATE."""
+        return self.update(comments_count=self._counted_comments())
+    def shift_comments_count(self, delta):
+        """Adds `delta` to the stored comments_count in a single UPDATE."""
+        if not delta:
+            return 0
+        return self.update(comments_count=F("comments_count") + delta)
+    def in_column_order(self):
+        """Cards column by column, each column in card order (see tasks_app.positions)."""
+        return self.order_by("status", "position", "id")
+    def column_end(self, board_id, status):
+        """Position of the last card in a column, None if it is empty."""
+        return self.filter(board_id=board_id, status=status).aggregate(end=Max("position"))["end"] or None
+
+
 class Task(models.Model):
     """
     Represents a task inside a board.
     A task belongs to one board and can have assignee and reviewer.
+    comments_count is denormalized and never written back by save().
+    position orders the cards of a column (tasks_app.positions); new tasks
+    and tasks saved into another column go to its end.
     """
+    DENORMALIZED_FIELDS = ("comments_count",)
     STATUS_CHOICES = [
         ("to-do", "To Do"),
         ("in-progress", "In Progress"),
@@ -43,14 +88,63 @@ class Task(models.Model):
         on_delete=models.CASCADE,
         related_name="created_tasks",
     )
-    def comments_count(self):
-        return self.comments.count()
+    comments_count = models.IntegerField(default=0, editable=False)
+    position = models.CharField(max_length=64, default="", editable=False)
+    objects = TaskQuerySet.as_manager()
     class Meta:
         ordering = ["id"]
+        # column order and column ends (tasks_app.positions)
+        indexes = [models.Index(fields=["board", "status", "position"])]
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
     def __str__(self):
         return self.title
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_counted_state()
+        return instance
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_counted_state()
+    def save(self, *args, **kwargs):
+        # Board counters are updated by post_save inside the same transaction;
+        # post_save receivers still see the previous state in _counted_state.
+        appended = self._state.adding and not self.position or self.changed_column(kwargs.get("update_fields"))
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DENORMALIZED_FIELDS
+                and field.attname not in deferred
+            ]
+        with transaction.atomic():
+            if appended:
+                from .positions import append_position  # positions imports this module
+                self.position = append_position(self.board_id, self.status)
+            super().save(*args, **kwargs)
+        self.remember_counted_state()
+    def counted_state(self):
+        """(board_id, is_to_do, is_high_prio) - what this task adds to its board counters."""
+        return (self.board_id, self.status == "to-do", self.priority == "high")
+    def remember_counted_state(self):
+        """Snapshots the counted state (and the column) as stored in the database."""
+        if all(name in self.__dict__ for name in ("board_id", "status", "priority")):
+            self._counted_state = self.counted_state()
+        else:
+            self.__dict__.pop("_counted_state", None)
+        if all(name in self.__dict__ for name in ("board_id", "status", "position")):
+            self._column = (self.board_id, self.status, self.position)
+        else:
+            self.__dict__.pop("_column", None)
+    def changed_column(self, update_fields=None):
+        """True if a full save() moves the task to another column without a new position."""
+        if self._state.adding or update_fields is not None or not hasattr(self, "_column"):
+            return False
+        board_id, status, position = self._column
+        return (board_id, status) != (self.board_id, self.status) and position == self.position
     
 class Comment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments")
@@ -59,6 +153,8 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     class Meta:
         ordering = ["created_at"]
+        # comment lists of a task in order (advise_indexes)
+        indexes = [models.Index(fields=["task", "created_at"])]
     def __str__(self):
         return f"Comment #{self.id}"
     
@@ -0,0 +1,202 @@
+"""
+Card order inside a Kanban column (one board, one status).
+
+Task.position holds a rank (tasks_app.ranks): cards sort by
+(position, id), and placing a card picks a new rank between its
+neighbours, so a move writes that card only. Once a rank gets longer than
+TASK_POSITION_REBALANCE_LENGTH the column is rebalanced in the
+background: all its cards get evenly spaced short ranks in the same
+order, in the lower half of the rank range.
+`python manage.py rebalance_task_positions` does the same for every
+column with long ranks. Cards appended to a column step past its end by a
+fixed amount (ranks.rank_after) and leave the other cards alone.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Max
+
+from .models import Task
+from .ranks import rank_after, rank_between, ranks_after, spread_ranks
+from .signals import tasks_bulk_written
+
+# longer ranks cannot be stored; the column is rebalanced first
+MAX_LENGTH = Task._meta.get_field("position").max_length
+
+logger = logging.getLogger(__name__)
+
+
+class ColumnError(ValueError):
+    """A neighbour given to move_task() is not in the target column."""
+
+
+def append_position(board_id, status):
+    """
+    Position for one card added at the end of a column (Task.save). Appends
+    step past the end rank and only make it longer once the column has run
+    out of room; then it is rebalanced after commit, or right away if the
+    rank would not fit.
+    """
+    position = rank_after(Task.objects.column_end(board_id, status))
+    if len(position) > MAX_LENGTH:
+        rebalance_column(board_id, status)
+        position = rank_after(Task.objects.column_end(board_id, status))
+    if needs_rebalance(position):
+        schedule_rebalance(board_id, status)
+    return position
+
+
+def append_positions(tasks):
+    """
+    Gives `tasks` (unsaved, or moved to another column) positions at the end
+    of their columns, in list order, with one query. Call it inside the
+    transaction that writes them: long columns are rebalanced after commit.
+    """
+    columns = {}
+    for task in tasks:
+        columns.setdefault((task.board_id, task.status), []).append(task)
+    if not columns:
+        return
+    ends = {
+        (row["board_id"], row["status"]): row["end"]
+        for row in Task.objects.filter(board_id__in={board_id for board_id, _ in columns})
+        .order_by().values("board_id", "status").annotate(end=Max("position"))
+    }
+    for column, column_tasks in columns.items():
+        positions = ranks_after(ends.get(column) or None, len(column_tasks))
+        if max(map(len, positions)) > MAX_LENGTH:
+            rebalance_column(*column)
+            positions = ranks_after(Task.objects.column_end(*column), len(column_tasks))
+        for task, position in zip(column_tasks, positions):
+            task.position = position
+        if any(map(needs_rebalance, positions)):
+            schedule_rebalance(*column)
+
+
+def rebalance_column(board_id, status):
+    """
+    Rewrites the positions of one column with evenly spaced ranks in the
+    lower half of the range (the rest is room for appends); returns the
+    number of changed tasks.
+    """
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.filter(board_id=board_id, status=status)
+            .order_by("position", "id").only("id", "position")
+        )
+        changed = []
+        for task, position in zip(tasks, spread_ranks(len(tasks))):
+            if task.position != position:
+                task.position = position
+                changed.append(task)
+        if changed:
+            Task.objects.bulk_update(changed, ["position"], batch_size=500)
+            tasks_bulk_written.send(sender=Task, board_ids=[board_id], task_ids=[task.pk for task in changed])
+    return len(changed)
+
+
+# background rebalancing
+_executor = None
+_pending = set()  # columns submitted and not rebalanced yet
+_pending_lock = threading.Lock()
+
+
+def _rebalance(column, in_worker):
+    try:
+        rebalance_column(*column)
+    except Exception:
+        if not in_worker:
+            raise
+        # nobody waits for the worker's result: report it here
+        logger.exception("Rebalancing column %s of board %s failed.", column[1], column[0])
+    finally:
+        with _pending_lock:
+            _pending.discard(column)
+        if in_worker:
+            close_old_connections()
+
+
+def _submit(column):
+    global _executor
+    with _pending_lock:
+        if column in _pending:
+            return
+        _pending.add(column)
+        workers = settings.TASK_POSITION_REBALANCE_WORKERS
+        if workers and _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="position-rebalance")
+    if workers:
+        _executor.submit(_rebalance, column, True)
+    else:
+        _rebalance(column, False)
+
+
+def schedule_rebalance(board_id, status):
+    """Rebalances the column after the surrounding transaction commits."""
+    transaction.on_commit(lambda: _submit((board_id, status)))
+
+
+def needs_rebalance(position):
+    return len(position) > settings.TASK_POSITION_REBALANCE_LENGTH
+
+
+# moving
+def _neighbour(column, task_id):
+    row = column.filter(pk=task_id).values_list("position", "id").first()
+    if row is None:
+        raise ColumnError(f"Task {task_id} is not in this column.")
+    return row
+
+
+def _neighbours(task, status, after_id, before_id):
+    """(position, id) of the cards directly above and below the new place, None at the ends."""
+    column = Task.objects.filter(board_id=task.board_id, status=status).exclude(pk=task.pk)
+    after = _neighbour(column, after_id) if after_id is not None else None
+    before = _neighbour(column, before_id) if before_id is not None else None
+    if after is not None and before is not None:
+        if after >= before:
+            raise ColumnError(f"Task {after_id} is not above task {before_id}.")
+    elif after is not None:
+        before = (
+            column.filter(position__gte=after[0]).exclude(position=after[0], id__lte=after[1])
+            .order_by("position", "id").values_list("position", "id").first()
+        )
+    elif before is not None:
+        after = (
+            column.filter(position__lte=before[0]).exclude(position=before[0], id__gte=before[1])
+            .order_by("-position", "-id").values_list("position", "id").first()
+        )
+    else:
+        after = column.order_by("-position", "-id").values_list("position", "id").first()
+    return after, before
+
+
+def _position(task, status, after_id, before_id):
+    after, before = _neighbours(task, status, after_id, before_id)
+    try:
+        position = rank_between(after and after[0], before and before[0])
+    except ValueError:
+        return None
+    return position if len(position) <= MAX_LENGTH else None
+
+
+def move_task(task, status, after_id=None, before_id=None):
+    """
+    Moves `task` into the `status` column, directly below `after_id` and/or
+    above `before_id` (task ids; neither: bottom of the column). Only the
+    moved task is written, unless its neighbours share a rank (written
+    concurrently) or have none, and the column is rebalanced first.
+    """
+    with transaction.atomic():
+        position = _position(task, status, after_id, before_id)
+        if position is None:
+            rebalance_column(task.board_id, status)
+            position = _position(task, status, after_id, before_id)
+        task.status, task.position = status, position
+        task.save(update_fields=["status", "position"])
+        if needs_rebalance(position):
+            schedule_rebalance(task.board_id, status)
+    return task
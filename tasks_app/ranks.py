@@ -0,0 +1,95 @@
+"""
+Lexicographic ranks for card positions (see tasks_app.positions).
+
+A rank is a string of base-36 digits read as a fraction (0.<digits>) and
+compared as plain text. There is always a rank between two others:
+
+    rank_between("1", "2")   -> "1i"
+    rank_between(None, "1")  -> "0i"
+    rank_between("z", None)  -> "zi"
+
+Ranks never end in "0" (0.1 and 0.10 are the same fraction), which keeps
+every gap open. Inserting at the same spot over and over makes ranks
+about one digit longer per five inserts. Appends do not bisect: they step
+by a fixed 36**-APPEND_DIGITS, and spread_ranks() fills only the lower
+half of the range, so a column can take about 800k appends before its
+ranks grow:
+
+    rank_after(None)    -> "1"
+    rank_after("1")     -> "1001"
+    rank_after("hzzz")  -> "i"
+"""
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+APPEND_DIGITS = 4
+SPREAD_END = "i"  # 0.5: ranks above it are left to appends
+
+
+def _midpoint(low, high):
+    """Key between `low` and `high` (None: 1.0); both without trailing zeros."""
+    if high is not None:
+        prefix = 0
+        while prefix < len(high) and (low[prefix] if prefix < len(low) else "0") == high[prefix]:
+            prefix += 1
+        if prefix:
+            return high[:prefix] + _midpoint(low[prefix:], high[prefix:])
+    low_digit = DIGITS.index(low[0]) if low else 0
+    high_digit = DIGITS.index(high[0]) if high is not None else BASE
+    if high_digit - low_digit > 1:
+        return DIGITS[(low_digit + high_digit) // 2]
+    if high is not None and len(high) > 1:
+        return high[0]
+    return DIGITS[low_digit] + _midpoint(low[1:], None)
+
+
+def is_rank(value):
+    return isinstance(value, str) and value != "" and value[-1] != "0" and all(c in DIGITS for c in value)
+
+
+def rank_between(before=None, after=None):
+    """Key sorting after `before` and before `after`; None is the start/end of the column."""
+    for key in (before, after):
+        if key is not None and not is_rank(key):
+            raise ValueError(f"{key!r} is not a position.")
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"No position between {before!r} and {after!r}.")
+    return _midpoint(before or "", after)
+
+
+def ranks_between(before, after, count):
+    """`count` increasing keys between `before` and `after`, as short as bisection allows."""
+    if count <= 0:
+        return []
+    middle = rank_between(before, after)
+    half = (count - 1) // 2
+    return ranks_between(before, middle, half) + [middle] + ranks_between(middle, after, count - 1 - half)
+
+
+def spread_ranks(count):
+    """`count` increasing short keys in the lower half of the range, for a whole column."""
+    return ranks_between(None, SPREAD_END, count)
+
+
+def rank_after(before=None):
+    """Key after `before` (None: an empty column), one step of 36**-APPEND_DIGITS further."""
+    if before is None:
+        return DIGITS[1]
+    if not is_rank(before):
+        raise ValueError(f"{before!r} is not a position.")
+    digits = [DIGITS.index(c) for c in before[:APPEND_DIGITS].ljust(APPEND_DIGITS, "0")]
+    for index in reversed(range(APPEND_DIGITS)):
+        if digits[index] < BASE - 1:
+            digits[index] += 1
+            return "".join(DIGITS[digit] for digit in digits[:index + 1])
+        digits[index] = 0
+    # past "zzzz": bisect towards 1.0
+    return _midpoint(before, None)
+
+
+def ranks_after(before, count):
+    """`count` increasing keys after `before`, one step apart."""
+    keys = []
+    for _ in range(count):
+        before = rank_after(before)
+        keys.append(before)
+    return keys
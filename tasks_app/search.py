@@ -0,0 +1,237 @@
+"""
+Full-text search over task titles, descriptions and comments.
+
+Backed by two contentless SQLite FTS5 tables, tasks_app_task_fts and
+tasks_app_comment_fts, which database triggers keep in sync with every
+insert, update and delete (migration 0004_search_index), so bulk writes
+and raw inserts are indexed too. Besides the text, every entry holds a
+"b<board id>" token: a search is an FTS5 AND of the user's words and
+the user's boards, so only matches on accessible boards are ever ranked.
+
+Tasks are ranked by bm25 (lower is better); title hits weigh more than
+description hits and those more than comment hits. A task matched by
+several documents keeps its best rank, ties go to the newest task.
+
+bm25 reads the whole index entry of every query word to weigh it, which
+costs ~100 ms for a word found in a million documents. Words found in
+more than COMMON_TERM_DOCUMENTS documents (counted once per
+TERM_STATS_TTL and process) are therefore only matched, not ranked, like
+stop words elsewhere; a query of common words only lists its matches
+newest first.
+"""
+import importlib
+import re
+import time
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, migrations, transaction
+
+TASK_TABLE = "tasks_app_task_fts"
+COMMENT_TABLE = "tasks_app_comment_fts"
+COMMON_TERM_DOCUMENTS = 50000
+TERM_STATS_TTL = 600
+TERM_STATS_SIZE = 10000
+_WORD = re.compile(r"\w+")
+_term_stats = {}  # (fts table, word) -> (expires at, number of documents)
+
+
+class Source:
+    """One FTS5 table and how its rows map to tasks."""
+    def __init__(self, table, columns, weights, task_of):
+        self.table = table
+        self.columns = columns
+        self.weights = weights  # bm25 weight per FTS column, the board column last
+        self.task_of = task_of  # SQL of the task id for a row id
+    def term_frequency(self, cursor, word):
+        """Number of documents containing `word`, cached for TERM_STATS_TTL seconds."""
+        key = (self.table, word.lower())
+        cached = _term_stats.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        cursor.execute(
+            f"SELECT COUNT(*) FROM {self.table} WHERE {self.table} MATCH %s",
+            ["{%s} : %s" % (" ".join(self.columns), phrase(word))],
+        )
+        count = cursor.fetchone()[0]
+        if len(_term_stats) >= TERM_STATS_SIZE:
+            _term_stats.clear()
+        _term_stats[key] = (time.monotonic() + TERM_STATS_TTL, count)
+        return count
+    def query(self, cursor, name, words, board_ids, limit):
+        """
+        ([(CTE sql, params)], select) for the (task_id, rank) rows of the words
+        on the boards. CTEs are materialized: FTS5 would otherwise re-run the
+        MATCH for every row id the other side produces.
+        """
+        ranked = [word for word in words if self.term_frequency(cursor, word) <= COMMON_TERM_DOCUMENTS]
+        matching = match_expression(words, self.columns, board_ids)
+        match = f"FROM {self.table} WHERE {self.table} MATCH %s"
+        if not ranked:
+            # common words only: the newest matches, FTS5 reads them in rowid order
+            ctes = [(f"{name} AS (SELECT rowid AS doc, 0.0 AS rank {match} ORDER BY rowid DESC LIMIT %s)",
+                     [matching, limit])]
+            return ctes, f"SELECT {self.task_of('doc')} AS task_id, rank FROM {name}"
+        bm25 = f"bm25({self.table}, {', '.join(map(str, self.weights))})"
+        ctes = [(f"{name} AS MATERIALIZED (SELECT rowid AS doc, {bm25} AS rank {match})",
+                 [match_expression(ranked, self.columns, board_ids)])]
+        select = f"SELECT {self.task_of('doc')} AS task_id, rank FROM {name}"
+        if len(ranked) < len(words):
+            ctes.append((f"{name}_all AS MATERIALIZED (SELECT rowid AS doc {match})", [matching]))
+            select += f" WHERE doc IN (SELECT doc FROM {name}_all)"
+        return ctes, select
+
+
+SOURCES = [
+    Source(TASK_TABLE, ["title", "description"], (10.0, 4.0, 0.0), lambda doc: doc),
+    Source(
+        COMMENT_TABLE, ["content"], (2.0, 0.0),
+        lambda doc: f"(SELECT task_id FROM tasks_app_comment WHERE id = {doc})",
+    ),
+]
+
+
+def is_available():
+    return connection.vendor == "sqlite"
+
+
+def terms(text):
+    """The words of a search text; punctuation and FTS5 operators are dropped."""
+    return _WORD.findall(text)
+
+
+def phrase(word):
+    return '"%s"' % word.replace('"', '""')
+
+
+def match_expression(words, columns, board_ids):
+    """FTS5 query: all `words` in one of `columns`, on one of the boards."""
+    boards = " OR ".join(f"b{int(board_id)}" for board_id in board_ids)
+    return "{%s} : (%s) AND board : (%s)" % (" ".join(columns), " ".join(map(phrase, words)), boards)
+
+
+def search_task_ids(text, board_ids, limit):
+    """[(task id, rank)] of the best matches on the given boards, best first."""
+    words = list(dict.fromkeys(word.lower() for word in terms(text)))
+    if not words or not board_ids:
+        return []
+    with connection.cursor() as cursor:
+        queries = [
+            source.query(cursor, f"source{number}", words, board_ids, limit)
+            for number, source in enumerate(SOURCES)
+        ]
+        ctes = [cte for source_ctes, _ in queries for cte in source_ctes]
+        sql = (
+            "WITH " + ", ".join(cte for cte, _ in ctes)
+            + " SELECT task_id, MIN(rank) AS best FROM ("
+            + " UNION ALL ".join(select for _, select in queries)
+            + ") GROUP BY task_id ORDER BY best, task_id DESC LIMIT %s"
+        )
+        cursor.execute(sql, [param for _, params in ctes for param in params] + [limit])
+        return cursor.fetchall()
+
+
+@contextmanager
+def triggers_suspended():
+    """
+    Drops the index triggers for a bulk load and recreates them afterwards;
+    use inside a transaction and index the new rows with index_new_rows().
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name GLOB 'tasks_app_*_fts_*'")
+        triggers = cursor.fetchall()
+        for name, _ in triggers:
+            cursor.execute(f"DROP TRIGGER {name}")
+    yield
+    with connection.cursor() as cursor:
+        for _, sql in triggers:
+            cursor.execute(sql)
+
+
+def index_new_rows(first_task_id, first_comment_id, using=DEFAULT_DB_ALIAS):
+    """Indexes tasks and comments from the given ids on, for writes made without the triggers."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {TASK_TABLE}(rowid, title, description, board) "
+            "SELECT id, title, description, 'b' || board_id FROM tasks_app_task WHERE id >= %s",
+            [first_task_id],
+        )
+        cursor.execute(
+            f"INSERT INTO {COMMENT_TABLE}(rowid, content, board) "
+            "SELECT c.id, c.content, 'b' || t.board_id FROM tasks_app_comment c "
+            "JOIN tasks_app_task t ON t.id = c.task_id WHERE c.id >= %s",
+            [first_comment_id],
+        )
+
+
+def rebuild(using=DEFAULT_DB_ALIAS):
+    """Re-indexes every task and comment; returns (tasks, comments) indexed."""
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        for table in (TASK_TABLE, COMMENT_TABLE):
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('delete-all')")
+        index_new_rows(0, 0, using)
+        for table in (TASK_TABLE, COMMENT_TABLE):
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+        cursor.execute("SELECT COUNT(*) FROM tasks_app_task")
+        tasks = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM tasks_app_comment")
+        comments = cursor.fetchone()[0]
+    _term_stats.clear()
+    return tasks, comments
+
+
+# migrate: SQLite rebuilds a table for most schema changes (AddField,
+# AlterField, ...), which fails while triggers on the other table still
+# reference it. Before migrate runs, every tasks_app migration in the plan
+# that changes the task or comment table is wrapped in two steps (like 0005
+# and 0006 do by hand): drop the triggers first, recreate them and rebuild
+# the index last. Both run inside the migration's transaction, so a failed
+# migration keeps its triggers, and the index matches whatever its data
+# steps wrote.
+SEARCH_TABLE_MODELS = {"task", "comment"}
+
+
+def _fts_installed(cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TASK_TABLE])
+    return cursor.fetchone() is not None
+
+
+def _search_migration():
+    return importlib.import_module("tasks_app.migrations.0004_search_index")
+
+
+def drop_triggers(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        if schema_editor.connection.vendor != "sqlite" or not _fts_installed(cursor):
+            return
+        for sql in _search_migration().DROP_TRIGGER_SQL:
+            cursor.execute(sql)
+
+
+def restore_triggers(apps, schema_editor):
+    """Recreates the triggers and re-indexes everything written without them."""
+    with schema_editor.connection.cursor() as cursor:
+        if schema_editor.connection.vendor != "sqlite" or not _fts_installed(cursor):
+            return
+        for sql in _search_migration().TRIGGER_SQL:
+            cursor.execute(sql.replace("CREATE TRIGGER ", "CREATE TRIGGER IF NOT EXISTS ", 1))
+    rebuild(schema_editor.connection.alias)
+
+
+def _changes_search_tables(migration):
+    return migration.app_label == "tasks_app" and any(
+        getattr(operation, "model_name_lower", getattr(operation, "name_lower", None)) in SEARCH_TABLE_MODELS
+        for operation in migration.operations
+        if not isinstance(operation, (migrations.RunPython, migrations.RunSQL))
+    )
+
+
+def wrap_search_table_migrations(plan=None, **kwargs):
+    """pre_migrate receiver."""
+    for migration, _ in plan or ():
+        if _changes_search_tables(migration) and not getattr(migration, "search_triggers_wrapped", False):
+            migration.operations = [
+                migrations.RunPython(drop_triggers, restore_triggers),
+                *migration.operations,
+                migrations.RunPython(restore_triggers, drop_triggers),
+            ]
+            migration.search_triggers_wrapped = True
@@ -0,0 +1,109 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from boards_app.changes import DELETE, UPSERT, BoardChange, record_board_change, record_board_changes
+from boards_app import list_cache
+from boards_app.models import Board
+from .models import Comment, Task
+
+# Sent after Task rows were written with bulk_create/bulk_update, which
+# skip post_save. Arguments: board_ids, task_ids.
+tasks_bulk_written = Signal()
+
+
+def _shift_board_counters(*changes):
+    """
+    Applies (counted_state, sign) pairs with one UPDATE per affected board.
+    """
+    deltas = {}
+    for (board_id, to_do, high_prio), sign in changes:
+        board = deltas.setdefault(board_id, {"ticket_count": 0, "tasks_to_do_count": 0, "tasks_high_prio_count": 0})
+        board["ticket_count"] += sign
+        board["tasks_to_do_count"] += sign * to_do
+        board["tasks_high_prio_count"] += sign * high_prio
+    for board_id, board_deltas in deltas.items():
+        Board.objects.filter(pk=board_id).shift_counters(**board_deltas)
+    list_cache.bump_boards(deltas)
+
+
+@receiver(post_save, sender=Task)
+def update_board_counters_on_save(sender, instance, created, raw, **kwargs):
+    """Applies the difference between the stored and the new counted state."""
+    if raw:
+        return
+    new_state = instance.counted_state()
+    if created:
+        _shift_board_counters((new_state, 1))
+    elif not hasattr(instance, "_counted_state"):
+        # Instance was loaded with deferred fields, previous state is unknown.
+        Board.objects.filter(pk=instance.board_id).refresh_counters()
+        list_cache.bump_boards([instance.board_id])
+    elif instance._counted_state != new_state:
+        _shift_board_counters((instance._counted_state, -1), (new_state, 1))
+
+
+@receiver(post_delete, sender=Task)
+def update_board_counters_on_delete(sender, instance, **kwargs):
+    _shift_board_counters((getattr(instance, "_counted_state", instance.counted_state()), -1))
+
+
+@receiver(tasks_bulk_written)
+def refresh_board_counters_after_bulk_write(sender, board_ids, **kwargs):
+    Board.objects.filter(pk__in=board_ids).refresh_counters()
+    list_cache.bump_boards(board_ids)
+
+
+@receiver(post_save, sender=Task)
+def record_task_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    changes = [BoardChange(instance.board_id, "task", instance.pk, UPSERT)]
+    previous_board_id = instance._counted_state[0] if hasattr(instance, "_counted_state") else None
+    if previous_board_id not in (None, instance.board_id):
+        changes.append(BoardChange(previous_board_id, "task", instance.pk, DELETE))
+    record_board_changes(changes)
+
+
+@receiver(post_delete, sender=Task)
+def record_task_delete(sender, instance, **kwargs):
+    record_board_change(instance.board_id, "task", instance.pk, DELETE)
+
+
+@receiver(tasks_bulk_written)
+def record_bulk_task_write(sender, task_ids, **kwargs):
+    rows = Task.objects.filter(pk__in=task_ids).values_list("board_id", "pk")
+    record_board_changes([BoardChange(board_id, "task", task_id, UPSERT) for board_id, task_id in rows])
+
+
+def _deletes_task_too(origin):
+    """True if the deletion that removes a comment started at its task or board."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in (Task, Board)
+
+
+@receiver(post_save, sender=Comment)
+def update_comments_count_on_save(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        Task.objects.filter(pk=instance.task_id).shift_comments_count(1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_comments_count_on_delete(sender, instance, origin=None, **kwargs):
+    # Cascades from a task or board delete the counted task as well; skipping
+    # them saves one UPDATE per comment. Other cascades (a deleted author) and
+    # queryset deletes go through here once per comment.
+    if not _deletes_task_too(origin):
+        Task.objects.filter(pk=instance.task_id).shift_comments_count(-1)
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_save(sender, instance, raw, **kwargs):
+    if not raw:
+        record_board_change(instance.task.board_id, "comment", instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def record_comment_delete(sender, instance, **kwargs):
+    board_id = Task.objects.filter(pk=instance.task_id).values_list("board_id", flat=True).first()
+    record_board_change(board_id, "comment", instance.pk, DELETE)
@@ -1,14 +1,38 @@
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, connection, migrations, models
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
 from boards_app.models import Board
+from tasks_app import search
+from tasks_app.api.async_views import AsyncAssignedToMeView, AsyncTaskCommentListView
 from tasks_app.models import Task, Comment
+from tasks_app.positions import _rebalance, rebalance_column
+from tasks_app.ranks import APPEND_DIGITS, SPREAD_END, is_rank, rank_after, rank_between, ranks_between
+from tasks_app.signals import tasks_bulk_written
 
 User = get_user_model()
 
 
+def async_get(token, path, data=None, headers=None):
+    """GET through the ASGI request path (AsyncClient) from a sync test."""
+    headers = dict(headers or {})
+    if token:
+        headers["Authorization"] = "Token " + token
+    return async_to_sync(AsyncClient().get)(path, data, headers=headers)
+
+
 class TaskTests(APITestCase):
     def setUp(self):
         # users
@@ -57,6 +81,7 @@ class TaskTests(APITestCase):
         self.assigned_to_me_url = "/api/tasks/assigned-to-me/"
         self.reviewing_url = "/api/tasks/reviewing/"
         self.comments_url = f"/api/tasks/{self.task.id}/comments/"
+        self.search_url = "/api/tasks/search/"
 
     # --------------------
     # GET /api/tasks/assigned-to-me/
@@ -69,6 +94,23 @@ class TaskTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsInstance(response.data, list)
 
+    def test_assigned_to_me_conditional_get(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+        etag = self.client.get(self.assigned_to_me_url)["ETag"]
+
+        response = self.client.get(self.assigned_to_me_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        other_board = Board.objects.create(title="Other", owner=self.owner)
+        Task.objects.create(
+            board=other_board, title="Newer", status="to-do", priority="low", created_by=self.owner
+        )
+        self.task.assignee = None
+        self.task.save()
+        response = self.client.get(self.assigned_to_me_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
     def test_assigned_to_me_unauthenticated(self):
         response = self.client.get(self.assigned_to_me_url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -204,3 +246,565 @@ class TaskTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
+    # --------------------
+    # STORED COMMENTS COUNT
+    # --------------------
+    def comments_count(self, task=None):
+        return Task.objects.values_list("comments_count", flat=True).get(pk=(task or self.task).pk)
+
+    def test_comments_count_follows_comment_writes(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+        self.client.post(self.comments_url, {"content": "One"})
+        self.client.post(self.comments_url, {"content": "Two"})
+        self.assertEqual(self.comments_count(), 2)
+
+        comment = Comment.objects.filter(task=self.task).first()
+        self.client.delete(f"{self.comments_url}{comment.id}/")
+        self.assertEqual(self.comments_count(), 1)
+
+        Comment.objects.create(task=self.task, author=self.owner, content="Three")
+        Comment.objects.filter(task=self.task).delete()
+        self.assertEqual(self.comments_count(), 0)
+
+        response = self.client.get(self.assigned_to_me_url)
+        self.assertEqual(response.data[0]["comments_count"], 0)
+
+    def test_comments_count_survives_cascades(self):
+        other_task = Task.objects.create(
+            board=self.board, title="Other", status="done", priority="low", created_by=self.owner
+        )
+        Comment.objects.create(task=self.task, author=self.other, content="Gone with its author")
+        Comment.objects.create(task=self.task, author=self.member, content="Stays")
+        Comment.objects.create(task=other_task, author=self.member, content="Gone with its task")
+
+        self.other.delete()
+        self.assertEqual(self.comments_count(), 1)
+
+        # the comments of a deleted task do not update it one by one
+        with CaptureQueriesContext(connection) as queries:
+            other_task.delete()
+        self.assertFalse(any("comments_count" in query["sql"] for query in queries.captured_queries))
+
+    def test_task_save_does_not_overwrite_comments_count(self):
+        stale = Task.objects.get(pk=self.task.pk)
+        Comment.objects.create(task=self.task, author=self.member, content="Concurrent")
+
+        stale.title = "Renamed"
+        stale.save()
+
+        self.assertEqual(self.comments_count(), 1)
+
+    def test_task_lists_do_not_count_comments(self):
+        Comment.objects.create(task=self.task, author=self.member, content="Counted")
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+
+        for url in (self.assigned_to_me_url, f"/api/boards/{self.board.id}/"):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            tasks = response.data if url == self.assigned_to_me_url else response.data["tasks"]
+            self.assertEqual(tasks[0]["comments_count"], 1)
+            self.assertFalse(any("tasks_app_comment" in query["sql"] for query in queries.captured_queries))
+
+    def test_rebuild_comment_counts_command(self):
+        Comment.objects.create(task=self.task, author=self.member, content="Counted")
+        Task.objects.filter(pk=self.task.pk).update(comments_count=5)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_comment_counts", "--verify", stdout=StringIO())
+
+        call_command("rebuild_comment_counts", stdout=StringIO())
+        self.assertEqual(self.comments_count(), 1)
+        call_command("rebuild_comment_counts", "--verify", stdout=StringIO())
+
+    # --------------------
+    # ASYNC READS (ASGI)
+    # --------------------
+    def test_async_task_reads_match_sync_views(self):
+        Comment.objects.create(task=self.task, author=self.owner, content="first")
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+        aget = lambda *args, **kwargs: async_get(self.member_token.key, *args, **kwargs)
+
+        for url in (self.assigned_to_me_url, self.reviewing_url, self.comments_url):
+            expected = self.client.get(url)
+            response = aget(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json(), expected.json())
+            self.assertEqual(response.get("ETag"), expected.get("ETag"))
+
+        response = aget(self.assigned_to_me_url)
+        self.assertIs(response.resolver_match.func.view_class, AsyncAssignedToMeView)
+        self.assertEqual(len(response.json()), 1)
+        response = aget(self.comments_url)
+        self.assertIs(response.resolver_match.func.view_class, AsyncTaskCommentListView)
+
+    def test_async_comment_list_access(self):
+        aget = lambda *args, **kwargs: async_get(self.other_token.key, *args, **kwargs)
+
+        self.assertEqual(aget(self.comments_url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(aget("/api/tasks/999999/comments/").status_code, status.HTTP_404_NOT_FOUND)
+
+    # --------------------
+    # PAGINATION
+    # --------------------
+    def test_assigned_to_me_cursor_pagination(self):
+        for i in range(4):
+            Task.objects.create(
+                board=self.board,
+                title=f"Paged {i}",
+                status="to-do",
+                priority="low",
+                assignee=self.member,
+                created_by=self.owner,
+            )
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+
+        first = self.client.get(self.assigned_to_me_url, {"page_size": 3})
+        second = self.client.get(first.data["next"])
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first.data["results"]), 3)
+        self.assertEqual(len(second.data["results"]), 2)
+        self.assertIsNone(second.data["next"])
+        ids = [t["id"] for t in first.data["results"] + second.data["results"]]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_comment_pagination_page_size_is_capped(self):
+        Comment.objects.bulk_create(
+            Comment(task=self.task, author=self.member, content=f"c{i}") for i in range(3)
+        )
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+
+        with self.settings(API_MAX_PAGE_SIZE=2):
+            response = self.client.get(self.comments_url, {"page_size": 500})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_comment_pages_in_both_directions(self):
+        comments = Comment.objects.bulk_create(
+            Comment(task=self.task, author=self.member, content=f"c{i}") for i in range(5)
+        )
+        # shared timestamps are ordered by id
+        Comment.objects.filter(pk__in=[c.pk for c in comments[1:3]]).update(created_at=comments[1].created_at)
+        ids = [c.pk for c in comments]
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+        page_ids = lambda response: [c["id"] for c in response.data["results"]]
+
+        first = self.client.get(self.comments_url, {"page_size": 2, "order": "newest"})
+        second = self.client.get(first.data["next"])
+        third = self.client.get(second.data["next"])
+        back = self.client.get(third.data["previous"])
+
+        self.assertEqual(page_ids(first) + page_ids(second) + page_ids(third), ids[::-1])
+        self.assertIsNone(first.data["previous"])
+        self.assertIsNone(third.data["next"])
+        self.assertEqual(page_ids(back), page_ids(second))
+
+        oldest = self.client.get(self.comments_url, {"page_size": 3})
+        self.assertEqual(page_ids(oldest), ids[:3])
+        self.assertEqual(page_ids(self.client.get(oldest.data["next"])), ids[3:])
+
+    def test_comment_since_cursor_returns_new_comments(self):
+        Comment.objects.create(task=self.task, author=self.member, content="seen")
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+        since = self.client.get(self.comments_url, {"page_size": 10, "order": "newest"}).data["since"]
+
+        nothing_new = self.client.get(since)
+        self.assertEqual(nothing_new.data["results"], [])
+        self.assertEqual(nothing_new.data["since"], since)
+
+        new = [Comment.objects.create(task=self.task, author=self.owner, content=f"new {i}") for i in range(2)]
+        response = self.client.get(since)
+        self.assertEqual([c["id"] for c in response.data["results"]], [c.pk for c in new])
+
+    def test_comment_list_query_count_is_constant(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+        Comment.objects.create(task=self.task, author=self.member, content="first")
+        self.client.get(self.comments_url)  # warm auth and membership caches
+        with CaptureQueriesContext(connection) as one:
+            self.client.get(self.comments_url, {"page_size": 50})
+        Comment.objects.bulk_create(
+            Comment(task=self.task, author=author, content="more") for author in [self.owner, self.member] * 10
+        )
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(self.comments_url, {"page_size": 50})
+
+        self.assertEqual(len(response.data["results"]), 21)
+        self.assertEqual(len(one), len(many))
+        self.assertEqual(len(many), 2)
+
+    def test_invalid_comment_cursor(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+
+        response = self.client.get(self.comments_url, {"cursor": "garbage"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # --------------------
+    # POST /api/tasks/bulk/
+    # --------------------
+    def test_bulk_create_update_delete(self):
+        doomed = Task.objects.create(
+            board=self.board, title="Old", status="to-do", priority="low", created_by=self.owner
+        )
+        operations = [
+            {
+                "op": "create",
+                "data": {
+                    "board": self.board.id,
+                    "title": f"Bulk {i}",
+                    "status": "to-do",
+                    "priority": "high",
+                    "assignee_id": self.member.id,
+                },
+            }
+            for i in range(10)
+        ]
+        operations.append({"op": "update", "id": self.task.id, "data": {"status": "done", "reviewer_id": None}})
+        operations.append({"op": "delete", "id": doomed.id})
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.owner_token.key)
+
+        response = self.client.post(self.tasks_url + "bulk/", operations, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["status"] for r in response.data], [201] * 10 + [200, 204])
+        self.assertEqual(response.data[0]["task"]["assignee"]["id"], self.member.id)
+        self.assertEqual(response.data[10]["task"]["status"], "done")
+        self.assertIsNone(response.data[10]["task"]["reviewer"])
+        self.assertFalse(Task.objects.filter(id=doomed.id).exists())
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.ticket_count, 11)
+        self.assertEqual(self.board.tasks_high_prio_count, 11)
+        self.assertEqual(self.board.tasks_to_do_count, 10)
+
+    def test_bulk_query_count_does_not_grow_with_operations(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.owner_token.key)
+        def create_ops(count):
+            return [
+                {"op": "create", "data": {
+                    "board": self.board.id, "title": "T", "status": "review",
+                    "priority": "low", "assignee_id": self.member.id, "reviewer_id": self.owner.id,
+                }}
+                for _ in range(count)
+            ]
+        self.client.post(self.tasks_url + "bulk/", [], format="json")  # warm auth caches
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(self.tasks_url + "bulk/", create_ops(2), format="json")
+        with CaptureQueriesContext(connection) as many:
+            self.client.post(self.tasks_url + "bulk/", create_ops(50), format="json")
+
+        self.assertEqual(len(few), len(many))
+
+    def test_bulk_is_all_or_nothing(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.member_token.key)
+        operations = [
+            {"op": "create", "data": {"board": self.board.id, "title": "Ok", "status": "to-do", "priority": "low"}},
+            {"op": "create", "data": {
+                "board": self.board.id, "title": "Bad", "status": "to-do",
+                "priority": "low", "assignee_id": self.other.id,
+            }},
+            {"op": "delete", "id": self.task.id},
+        ]
+
+        response = self.client.post(self.tasks_url + "bulk/", operations, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([r["status"] for r in response.data], [424, 400, 403])
+        self.assertIn("assignee_id", response.data[1]["errors"])
+        self.assertFalse(Task.objects.filter(title="Ok").exists())
+
+    # --------------------
+    # GET /api/tasks/search/
+    # --------------------
+    def search(self, q, token=None):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + (token or self.member_token).key)
+        return self.client.get(self.search_url, {"q": q})
+
+    def test_search_ranks_title_matches_first(self):
+        in_comment = Task.objects.create(
+            board=self.board, title="Cleanup", status="to-do", priority="low", created_by=self.owner
+        )
+        Comment.objects.create(task=in_comment, author=self.owner, content="Deploying needs a cleanup first")
+        in_title = Task.objects.create(
+            board=self.board, title="Deploy release", status="to-do", priority="low", created_by=self.owner
+        )
+
+        response = self.search("deploy")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([task["id"] for task in response.data], [in_title.id, in_comment.id])
+
+    def test_search_requires_all_words(self):
+        Task.objects.create(
+            board=self.board, title="Login form", description="broken on mobile",
+            status="to-do", priority="low", created_by=self.owner,
+        )
+        Task.objects.create(board=self.board, title="Login", status="to-do", priority="low", created_by=self.owner)
+
+        self.assertEqual([task["title"] for task in self.search("mobile login!").data], ["Login form"])
+
+    def test_search_only_covers_own_boards(self):
+        other_board = Board.objects.create(title="Private", owner=self.other)
+        Task.objects.create(board=other_board, title="Secret roadmap", status="to-do", priority="low", created_by=self.other)
+
+        self.assertEqual(self.search("roadmap").data, [])
+        self.assertEqual(len(self.search("roadmap", self.other_token).data), 1)
+
+    def test_search_index_follows_writes(self):
+        comment = Comment.objects.create(task=self.task, author=self.owner, content="Waiting for approval")
+        self.assertEqual(len(self.search("approval").data), 1)
+
+        comment.delete()
+        self.task.title = "Renamed"
+        self.task.save()
+
+        self.assertEqual(self.search("approval").data, [])
+        self.assertEqual(self.search("task").data, [])
+        self.assertEqual(len(self.search("renamed").data), 1)
+
+        other_board = Board.objects.create(title="Other", owner=self.owner)
+        self.task.board = other_board
+        self.task.save()
+        self.assertEqual(self.search("renamed").data, [])
+        self.task.delete()
+        self.assertEqual(self.search("renamed", self.owner_token).data, [])
+
+    def test_search_requires_a_word(self):
+        response = self.search(" *:- ")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def fts_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name GLOB 'tasks_app_*_fts_*'")
+            return sorted(name for name, in cursor.fetchall())
+
+    def test_migrations_leave_all_search_triggers(self):
+        # 0004 creates seven; a table rebuild in a later migration must not lose any
+        self.assertEqual(len(self.fts_triggers()), 7)
+
+    def test_migrations_of_search_tables_drop_and_restore_triggers(self):
+        add_field = migrations.Migration("0099_add_field", "tasks_app")
+        add_field.operations = [migrations.AddField("task", "estimate", models.IntegerField(null=True))]
+        other_model = migrations.Migration("0099_other", "boards_app")
+        other_model.operations = [migrations.AddField("board", "color", models.CharField(max_length=7, default=""))]
+        search.wrap_search_table_migrations(plan=[(add_field, False), (other_model, False)])
+        search.wrap_search_table_migrations(plan=[(add_field, False)])  # a second migrate run
+
+        self.assertEqual(len(other_model.operations), 1)
+        drop, _, restore = add_field.operations
+        editor = SimpleNamespace(connection=connection)
+        triggers = self.fts_triggers()
+        drop.code(None, editor)
+        self.assertEqual(self.fts_triggers(), [])
+        # written while the triggers are gone: a data step of the migration
+        task = Task.objects.create(board=self.board, title="Zebra", status="to-do", priority="low", created_by=self.owner)
+        Comment.objects.create(task=task, author=self.owner, content="Okapi")
+        Task.objects.filter(pk=self.task.pk).update(title="Giraffe")
+
+        restore.code(None, editor)
+        self.assertEqual(self.fts_triggers(), triggers)
+        self.assertEqual(len(self.search("zebra").data), 1)
+        self.assertEqual(len(self.search("okapi").data), 1)
+        self.assertEqual(self.search("giraffe").data[0]["id"], self.task.id)
+        self.task.refresh_from_db()
+        self.task.title = "Renamed"
+        self.task.save()  # the update trigger deletes what the rebuild indexed
+        self.assertEqual(self.search("giraffe").data, [])
+        self.assertEqual(len(self.search("renamed").data), 1)
+
+    def test_rebuilt_search_index_matches_triggers(self):
+        Comment.objects.create(task=self.task, author=self.owner, content="Needs review")
+        before = self.search("review").data
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(self.search("review").data, before)
+
+    # --------------------
+    # positions and POST /api/tasks/{id}/move/
+    # --------------------
+    def column(self, status_value):
+        return list(Task.objects.filter(board=self.board, status=status_value).in_column_order().values_list("title", flat=True))
+
+    def card(self, title, status_value="review"):
+        return Task.objects.create(board=self.board, title=title, status=status_value, priority="low", created_by=self.owner)
+
+    def move(self, task, token=None, **data):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + (token or self.owner_token).key)
+        return self.client.post(f"/api/tasks/{task.id}/move/", data, format="json")
+
+    def test_ranks_stay_ordered(self):
+        keys = [rank_between()]
+        for _ in range(200):
+            keys.insert(1, rank_between(keys[0], keys[1] if len(keys) > 1 else None))  # always below the top card
+        keys.append(rank_between(keys[-1], None))
+        keys.insert(0, rank_between(None, keys[0]))
+        self.assertEqual(keys, sorted(set(keys)))
+        self.assertTrue(all(is_rank(key) for key in keys))
+
+        spread = ranks_between(None, None, 1000)
+        self.assertEqual(spread, sorted(set(spread)))
+        self.assertLessEqual(max(map(len, spread)), 3)
+        with self.assertRaises(ValueError):
+            rank_between("b", "a")
+        with self.assertRaises(ValueError):
+            rank_between("a0", None)
+
+        appended = [rank_after(None)]
+        for _ in range(100):
+            appended.append(rank_after(appended[-1]))
+        self.assertEqual(appended, sorted(set(appended)))
+        self.assertLessEqual(max(map(len, appended)), APPEND_DIGITS)
+        self.assertEqual((rank_after("hzzz"), rank_after("zzzz")), ("i", "zzzzi"))
+
+    def test_new_and_moved_tasks_go_to_the_column_end(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.owner_token.key)
+        response = self.client.post(self.tasks_url, {
+            "board": self.board.id, "title": "Task 2", "status": "to-do", "priority": "low",
+        }, format="json")
+        self.assertGreater(response.data["position"], self.task.position)
+
+        self.card("A")
+        self.client.patch(self.task_detail_url, {"status": "review"}, format="json")
+        self.assertEqual(self.column("review"), ["A", "Task 1"])
+        self.assertEqual(self.column("to-do"), ["Task 2"])
+
+    def test_move_writes_only_the_moved_task(self):
+        for title in ("A", "B", "C"):
+            self.card(title)
+
+        after = Task.objects.get(title="A")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.move(self.task, status="review", after=after.id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "review")
+        task_updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "tasks_app_task"')]
+        self.assertEqual(len(task_updates), 1)
+
+        self.assertEqual(self.column("review"), ["A", "Task 1", "B", "C"])
+        self.assertEqual(self.column("to-do"), [])
+        self.board.refresh_from_db()
+        self.assertEqual((self.board.tasks_to_do_count, self.board.ticket_count), (0, 4))
+
+        self.move(self.task, before=after.id)
+        self.assertEqual(self.column("review"), ["Task 1", "A", "B", "C"])
+        self.move(self.task)
+        self.assertEqual(self.column("review"), ["A", "B", "C", "Task 1"])
+
+        board = self.client.get(f"/api/boards/{self.board.id}/").data
+        self.assertEqual([task["title"] for task in board["tasks"]], ["A", "B", "C", "Task 1"])
+
+    def test_move_validation_and_permissions(self):
+        a, b = self.card("A"), self.card("B")
+        other_column = self.card("D", "done")
+
+        self.assertEqual(self.move(self.task, status="review", after=other_column.id).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.move(self.task, status="review", after=b.id, before=a.id).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.move(self.task, status="later").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.move(self.task, self.other_token, status="review").status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.column("to-do"), ["Task 1"])
+
+        self.assertEqual(self.move(self.task, self.member_token, status="review", after=a.id, before=b.id).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.column("review"), ["A", "Task 1", "B"])
+
+    def test_move_between_cards_sharing_a_position(self):
+        a, b = self.card("A"), self.card("B")
+        Task.objects.filter(pk__in=[a.pk, b.pk]).update(position="i")
+
+        self.assertEqual(self.move(self.task, status="review", after=a.id).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.column("review"), ["A", "Task 1", "B"])
+        positions = list(Task.objects.filter(status="review").values_list("position", flat=True))
+        self.assertEqual(len(set(positions)), 3)
+
+    @override_settings(TASK_POSITION_REBALANCE_LENGTH=3, TASK_POSITION_REBALANCE_WORKERS=0)
+    def test_long_positions_are_rebalanced_after_commit(self):
+        top, bottom = self.card("Top"), self.card("Bottom")
+        cards = [self.card(f"Card {number}", "to-do") for number in range(12)]
+        with self.captureOnCommitCallbacks(execute=True):
+            for card in cards:
+                # every card lands directly below "Top"
+                self.assertEqual(self.move(card, status="review", after=top.id).status_code, status.HTTP_200_OK)
+
+        expected = ["Top"] + [card.title for card in reversed(cards)] + ["Bottom"]
+        self.assertEqual(self.column("review"), expected)
+        positions = Task.objects.filter(status="review").values_list("position", flat=True)
+        self.assertLessEqual(max(map(len, positions)), 3)
+
+    @override_settings(TASK_POSITION_REBALANCE_WORKERS=0)
+    def test_appends_keep_positions_short(self):
+        for number in range(300):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.card(f"Card {number}")
+        positions = Task.objects.filter(status="review").values_list("position", flat=True)
+        self.assertLessEqual(max(map(len, positions)), settings.TASK_POSITION_REBALANCE_LENGTH)
+        self.assertEqual(self.column("review"), [f"Card {number}" for number in range(300)])
+
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.owner_token.key)
+        operations = [
+            {"op": "create", "data": {"board": self.board.id, "title": "Bulk", "status": "review", "priority": "low"}}
+            for _ in range(200)
+        ]
+        for _ in range(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.client.post(self.tasks_url + "bulk/", operations, format="json").status_code,
+                                 status.HTTP_200_OK)
+        positions = Task.objects.filter(status="review").values_list("position", flat=True)
+        self.assertLessEqual(max(map(len, positions)), settings.TASK_POSITION_REBALANCE_LENGTH)
+
+    def test_appends_never_exceed_the_position_length(self):
+        # no commit, so no background rebalance: the column is rebalanced before overflowing
+        self.card("Card 0")
+        Task.objects.filter(title="Card 0").update(position="z" * 63)
+        for number in range(1, 4):
+            self.card(f"Card {number}")
+        positions = Task.objects.filter(status="review").values_list("position", flat=True)
+        self.assertLessEqual(max(map(len, positions)), Task._meta.get_field("position").max_length)
+        self.assertEqual(self.column("review"), [f"Card {number}" for number in range(4)])
+
+    @override_settings(TASK_POSITION_REBALANCE_WORKERS=0)
+    def test_appends_to_a_large_column_rewrite_no_other_rows(self):
+        Task.objects.bulk_create([
+            Task(board=self.board, title="Old", status="done", priority="low", created_by=self.owner)
+            for _ in range(5000)
+        ])
+        self.assertEqual(rebalance_column(self.board.id, "done"), 5000)
+        self.assertLess(Task.objects.column_end(self.board.id, "done"), SPREAD_END)
+        rewritten = []
+        def record(sender, task_ids, **kwargs):
+            rewritten.extend(task_ids)
+        tasks_bulk_written.connect(record)
+        self.addCleanup(tasks_bulk_written.disconnect, record)
+
+        for number in range(300):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.card(f"New {number}", "done")
+        self.assertEqual(rewritten, [])
+        positions = Task.objects.filter(status="done").values_list("position", flat=True)
+        self.assertLessEqual(max(map(len, positions)), APPEND_DIGITS)
+        self.assertEqual(self.column("done")[-300:], [f"New {number}" for number in range(300)])
+
+    def test_failed_background_rebalance_is_logged(self):
+        with mock.patch("tasks_app.positions.rebalance_column", side_effect=DatabaseError("database is locked")), \
+                self.assertLogs("tasks_app.positions", "ERROR") as logs:
+            _rebalance((self.board.id, "review"), True)
+        self.assertIn(f"column review of board {self.board.id} failed", logs.output[0])
+        self.assertIn("database is locked", logs.output[0])
+
+    def test_rebalance_task_positions_command(self):
+        for title in ("A", "B", "C"):
+            self.card(title)
+        Task.objects.filter(title="B").update(position="zzzzzzzzzzzzzzzzzzz")
+        Task.objects.filter(title="C").update(position="")
+
+        out = StringIO()
+        call_command("rebalance_task_positions", stdout=out)
+        self.assertIn("Rebalanced 1 column(s)", out.getvalue())
+        self.assertEqual(self.column("review"), ["C", "A", "B"])
+        self.assertLessEqual(max(len(p) for p in Task.objects.values_list("position", flat=True)), 2)
+
+        out = StringIO()
+        call_command("rebalance_task_positions", stdout=out)
+        self.assertIn("Rebalanced 0 column(s)", out.getvalue())